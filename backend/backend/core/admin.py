@@ -1,4 +1,22 @@
 from django.contrib import admin
-from .models import AuditLog
+from .models import AuditLog, AuditCheckpoint, ReportSchedule
 
-admin.site.register(AuditLog) 
\ No newline at end of file
+class AuditLogAdmin(admin.ModelAdmin):
+    """Audit entries are append-only, so the admin is read-only."""
+    list_display = ['created_at', 'action', 'object_type', 'object_id', 'user', 'chain_seq']
+    list_filter = ['action', 'object_type']
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+admin.site.register(AuditLog, AuditLogAdmin)
+admin.site.register(AuditCheckpoint)
+
+class ReportScheduleAdmin(admin.ModelAdmin):
+    list_display = ['name', 'report', 'format', 'cadence', 'is_active', 'next_run_at', 'last_status']
+    list_filter = ['report', 'format', 'cadence', 'is_active']
+
+admin.site.register(ReportSchedule, ReportScheduleAdmin)
@@ -0,0 +1,120 @@
+"""
+Archival of closed audit log months to gzip-compressed JSON Lines files.
+
+Each archived month is written to AUDIT_LOG_ARCHIVE_DIR, recorded as an
+AuditLogArchive row and then removed from the live table (by dropping its
+partition on PostgreSQL). Archived rows stay readable through
+iter_archived_rows, which backs the /api/audit-logs/archived/ endpoint.
+"""
+import gzip
+import json
+import os
+from datetime import datetime, time, timezone as dt_timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import partitions
+from .models import AuditLog, AuditLogArchive
+
+
+def archive_dir():
+    return Path(getattr(settings, 'AUDIT_LOG_ARCHIVE_DIR', Path(settings.MEDIA_ROOT) / 'audit_archive'))
+
+
+def month_bounds(month):
+    """
+    First instant of ``month`` and of the next month, in UTC like the
+    partition bounds.
+    """
+    start = datetime.combine(month, time.min, tzinfo=dt_timezone.utc)
+    end = datetime.combine(partitions.add_months(month, 1), time.min, tzinfo=dt_timezone.utc)
+    return start, end
+
+
+def utc_month(value):
+    return partitions.month_start(value.astimezone(dt_timezone.utc))
+
+
+def archive_fields():
+    return [field.attname for field in AuditLog._meta.concrete_fields]
+
+
+def archivable_months(retention_months):
+    """Months with live rows that ended more than ``retention_months`` ago."""
+    cutoff = partitions.add_months(utc_month(timezone.now()), -retention_months)
+    oldest = AuditLog.objects.order_by('created_at').values_list('created_at', flat=True).first()
+    if oldest is None:
+        return []
+    months = []
+    month = utc_month(oldest)
+    while month < cutoff:
+        months.append(month)
+        month = partitions.add_months(month, 1)
+    return months
+
+
+def archive_month(month, chunk_size=5000):
+    """
+    Write one month of audit logs to a compressed file and remove it from the
+    live table. Returns the AuditLogArchive record, or None if the month is empty.
+    """
+    start, end = month_bounds(month)
+    rows = (
+        AuditLog.objects.filter(created_at__gte=start, created_at__lt=end)
+        .order_by('id')
+        .values(*archive_fields())
+    )
+    directory = archive_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    part = AuditLogArchive.objects.filter(month=month).count()
+    name = f'auditlog-{month:%Y-%m}' + (f'-{part + 1}' if part else '') + '.jsonl.gz'
+    temp_path = directory / f'{name}.tmp'
+
+    row_count, first_id, last_id = 0, None, None
+    with gzip.open(temp_path, 'wt', encoding='utf-8') as out:
+        for row in rows.iterator(chunk_size=chunk_size):
+            out.write(json.dumps(row, cls=DjangoJSONEncoder) + '\n')
+            row_count += 1
+            first_id = row['id'] if first_id is None else first_id
+            last_id = row['id']
+    if not row_count:
+        temp_path.unlink()
+        return None
+    os.replace(temp_path, directory / name)
+
+    with transaction.atomic():
+        archive = AuditLogArchive.objects.create(
+            month=month, path=name, row_count=row_count, first_id=first_id, last_id=last_id,
+        )
+        if not (partitions.is_partitioned(connection) and partitions.drop_partition(connection, month)):
+            AuditLog.objects.filter(created_at__gte=start, created_at__lt=end, id__lte=last_id).delete()
+    return archive
+
+
+def iter_archived_rows(start=None, end=None):
+    """
+    Yield archived audit log rows as dicts, oldest first, optionally limited
+    to ``start <= created_at < end``. Only files for overlapping months are read.
+    """
+    archives = AuditLogArchive.objects.all()
+    if start is not None:
+        archives = archives.filter(month__gte=utc_month(start))
+    if end is not None:
+        archives = archives.filter(month__lte=utc_month(end))
+    directory = archive_dir()
+    for archive in archives:
+        with gzip.open(directory / archive.path, 'rt', encoding='utf-8') as source:
+            for line in source:
+                row = json.loads(line)
+                created_at = parse_datetime(row['created_at'])
+                if start is not None and created_at < start:
+                    continue
+                if end is not None and created_at >= end:
+                    continue
+                row['created_at'] = created_at
+                yield row
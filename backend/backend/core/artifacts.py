@@ -0,0 +1,135 @@
+"""
+Cache of rendered export files (PDF reports and CSV exports).
+
+An artifact is stored under REPORT_CACHE_DIR with a name derived from what
+went into it: the export, its parameters (such as the time zone dates are
+shown in) and the version of the data it lists. The data version of a model
+is its row count and latest updated_at, which every write path keeps
+current, so any insert, update or delete gives the export a new name and the
+old file is simply never asked for again. Files are served with
+FileResponse (see reports.download), which the WSGI server can send with
+sendfile().
+
+The directory is kept under REPORT_CACHE_MAX_BYTES by deleting the least
+recently used files (a cache hit refreshes the file's modification time)
+whenever a new artifact is written. Files emailed as scheduled reports are
+pinned: linked into the pinned/ subdirectory, which eviction does not touch,
+until their download links expire.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from contextlib import suppress
+from pathlib import Path
+
+from django.conf import settings
+from django.db.models import Count, Max
+
+# Bump when the layout of an export changes, so files rendered by the old code are not served.
+FORMAT = 1
+
+
+def cache_dir():
+    return Path(getattr(settings, 'REPORT_CACHE_DIR', Path(settings.MEDIA_ROOT) / 'report_cache'))
+
+
+def pinned_dir():
+    return cache_dir() / 'pinned'
+
+
+def data_version(models):
+    """Row count and latest updated_at of each model, one query per model."""
+    version = []
+    for model in models:
+        stats = model._default_manager.aggregate(rows=Count('pk'), last=Max('updated_at'))
+        version.append([model._meta.label, stats['rows'], stats['last'].isoformat() if stats['last'] else None])
+    return version
+
+
+def artifact_key(name, params, version):
+    payload = json.dumps([FORMAT, name, params, version], sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def evict(directory, max_bytes):
+    """Delete the least recently used artifacts until the rest fit in ``max_bytes``."""
+    entries = []
+    for entry in os.scandir(directory):
+        # Dot files are artifacts still being written.
+        if entry.is_file() and not entry.name.startswith('.'):
+            with suppress(FileNotFoundError):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        with suppress(FileNotFoundError):
+            os.remove(path)
+        total -= size
+
+
+def pin(path):
+    """Keep the artifact at ``path`` out of reach of eviction. Returns the pinned file's name."""
+    directory = pinned_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    target = directory / Path(path).name
+    if not target.exists():
+        descriptor, partial = tempfile.mkstemp(dir=directory, prefix='.', suffix=target.suffix)
+        os.close(descriptor)
+        os.remove(partial)
+        try:
+            os.link(path, partial)
+        except OSError:
+            shutil.copyfile(path, partial)
+        os.replace(partial, target)
+    # The pin lasts from the latest time it was asked for.
+    os.utime(target)
+    return target.name
+
+
+def unpin_older_than(max_age):
+    """Delete the pinned artifacts last pinned more than ``max_age`` seconds ago."""
+    directory = pinned_dir()
+    if not directory.is_dir():
+        return
+    cutoff = time.time() - max_age
+    for entry in os.scandir(directory):
+        with suppress(FileNotFoundError):
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+
+
+def open_artifact(name, models, render, params=None):
+    """
+    The cached artifact ``name`` for the current data, opened for reading.
+    On a miss ``render(path)`` writes it first.
+    """
+    directory = cache_dir()
+    path = directory / f'{artifact_key(name, params, data_version(models))}{Path(name).suffix}'
+    try:
+        artifact = open(path, 'rb')
+    except FileNotFoundError:
+        pass
+    else:
+        with suppress(FileNotFoundError):
+            os.utime(path)
+        return artifact
+
+    directory.mkdir(parents=True, exist_ok=True)
+    descriptor, partial = tempfile.mkstemp(dir=directory, prefix='.', suffix=path.suffix)
+    os.close(descriptor)
+    try:
+        render(partial)
+        os.replace(partial, path)
+    except BaseException:
+        with suppress(FileNotFoundError):
+            os.remove(partial)
+        raise
+    # Open before evicting: a file removed while open can still be read.
+    artifact = open(path, 'rb')
+    evict(directory, getattr(settings, 'REPORT_CACHE_MAX_BYTES', 500 * 1024 * 1024))
+    return artifact
@@ -0,0 +1,191 @@
+"""
+Automatic audit logging for IPMS.
+
+Model signals capture create/update/delete events for the audited apps into a
+per-request buffer. AuditLogMiddleware flushes the buffer with a single
+bulk_create once the response is ready, so auditing costs at most one query
+per request. Events raised outside a request (management commands, shell) are
+written immediately.
+"""
+import contextvars
+import logging
+import queue
+import threading
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models.signals import post_delete, post_save
+
+logger = logging.getLogger(__name__)
+
+# Models whose changes are recorded automatically.
+AUDITED_MODELS = [
+    'inventory.InventoryItem',
+    'orders.PurchaseOrder',
+    'suppliers.Supplier',
+    'payments.PaymentRequest',
+    'payments.PaymentTransaction',
+    'payments.PaymentSettings',
+    'users.User',
+]
+
+# Saves that only touch these fields are bookkeeping, not user changes.
+IGNORED_UPDATE_FIELDS = {'last_login'}
+
+_buffer = contextvars.ContextVar('audit_buffer', default=None)
+
+
+class AuditBuffer:
+    """Audit entries collected during a single request."""
+
+    def __init__(self, request=None):
+        self.request = request
+        self.entries = []
+        self.flushed = False
+
+    def resolve_user(self):
+        user = getattr(self.request, 'user', None)
+        if user is not None and user.is_authenticated:
+            return user
+        return None
+
+
+def begin(request=None):
+    """Start buffering audit entries for the current request."""
+    return _buffer.set(AuditBuffer(request))
+
+
+def end(token):
+    """Stop buffering and return the collected buffer."""
+    buffer = _buffer.get()
+    _buffer.reset(token)
+    return buffer
+
+
+def object_type_for(model):
+    return model._meta.verbose_name.title()
+
+
+def tag(instance, action, message=''):
+    """
+    Record the next save of ``instance`` as a workflow action (APPROVE,
+    STOCK_IN, ...) instead of a generic UPDATE.
+    """
+    instance._audit_action = (action, message)
+
+
+def record(action, instance=None, object_type='', object_id='', message='', user=None):
+    """
+    Queue an audit entry. Entries are buffered for the current request, or
+    written straight away when no request is active.
+    """
+    from .models import AuditLog
+
+    if instance is not None:
+        object_type = object_type or object_type_for(type(instance))
+        object_id = object_id or str(instance.pk)
+    entry = AuditLog(
+        user=user, action=action, object_type=object_type,
+        object_id=object_id, message=message,
+    )
+    buffer = _buffer.get()
+
+    def enqueue():
+        if buffer is not None and not buffer.flushed:
+            buffer.entries.append(entry)
+        else:
+            write([entry])
+
+    # Changes rolled back with their transaction are never audited.
+    transaction.on_commit(enqueue)
+
+
+def flush(buffer):
+    """Persist a request's buffered entries with one bulk insert."""
+    if buffer is None:
+        return
+    buffer.flushed = True
+    if not buffer.entries:
+        return
+    user = buffer.resolve_user()
+    for entry in buffer.entries:
+        if entry.user_id is None and user is not None:
+            entry.user = user
+    if getattr(settings, 'AUDIT_LOG_ASYNC', False):
+        _writer().put(buffer.entries)
+    else:
+        write(buffer.entries)
+
+
+def write(entries):
+    from .models import AuditLog
+
+    try:
+        AuditLog.objects.bulk_create(entries)
+    except Exception as e:
+        logger.error(f"Failed to write {len(entries)} audit log entries: {str(e)}")
+
+
+class AuditWriter(threading.Thread):
+    """Background thread that writes audit batches off the request path."""
+
+    def __init__(self):
+        super().__init__(name='audit-log-writer', daemon=True)
+        self.queue = queue.Queue()
+
+    def put(self, entries):
+        self.queue.put(entries)
+
+    def run(self):
+        while True:
+            entries = self.queue.get()
+            # Drain whatever else is waiting so bursts share one insert.
+            while True:
+                try:
+                    entries.extend(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            write(entries)
+            connection.close()
+
+
+_writer_lock = threading.Lock()
+_writer_thread = None
+
+
+def _writer():
+    global _writer_thread
+    with _writer_lock:
+        if _writer_thread is None or not _writer_thread.is_alive():
+            _writer_thread = AuditWriter()
+            _writer_thread.start()
+    return _writer_thread
+
+
+def handle_post_save(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if update_fields and set(update_fields) <= IGNORED_UPDATE_FIELDS:
+        return
+    object_type = object_type_for(sender)
+    action, message = getattr(instance, '_audit_action', None) or (None, '')
+    instance._audit_action = None
+    if action is None:
+        action = 'CREATE' if created else 'UPDATE'
+        verb = 'Created' if created else 'Updated'
+        message = f'{verb} {object_type.lower()}: {instance}'
+    record(action, instance, object_type=object_type, message=message)
+
+
+def handle_post_delete(sender, instance, **kwargs):
+    object_type = object_type_for(sender)
+    record('DELETE', instance, object_type=object_type,
+           message=f'Deleted {object_type.lower()}: {instance}')
+
+
+def connect_signals():
+    for label in AUDITED_MODELS:
+        model = apps.get_model(label)
+        post_save.connect(handle_post_save, sender=model, dispatch_uid=f'audit-save-{label}')
+        post_delete.connect(handle_post_delete, sender=model, dispatch_uid=f'audit-delete-{label}')
@@ -0,0 +1,82 @@
+"""
+Deployment bootstrap: seed data and the admin account.
+
+manage.py bootstrap replaces the post_migrate hook that reloaded
+local_data.json and reset the admin password on every migrate. It records
+the SHA-256 of the fixture it loaded (FixtureLoad), so a release with an
+unchanged fixture only hashes the file and checks that the admin exists.
+
+A changed fixture is loaded in one transaction by the streaming bulk loader
+(core/fixtures.py): rows whose primary key is new are inserted, the others
+updated. The loader skips the post_save bookkeeping, so the order rollups
+and supplier scorecards are rebuilt afterwards.
+"""
+import hashlib
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from .fixtures import FixtureLoader
+from .models import FixtureLoad
+
+BOOTSTRAP_LOCK_ID = 0x424f4f54  # pg_advisory_xact_lock key for bootstrapping
+
+
+def fixture_path():
+    return Path(getattr(settings, 'BOOTSTRAP_FIXTURE', Path(settings.BASE_DIR) / 'local_data.json'))
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as stream:
+        while chunk := stream.read(1024 * 1024):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def ensure_admin():
+    """Create the default admin account if it does not exist. Returns whether it was created."""
+    User = get_user_model()
+    if User.objects.filter(username='admin').exists():
+        return False
+    User.objects.create_superuser(
+        'admin', 'admin@example.com', getattr(settings, 'BOOTSTRAP_ADMIN_PASSWORD', 'admin123'),
+        role=User.Roles.ADMIN,
+    )
+    return True
+
+
+def rebuild_derived_data():
+    """Rebuild what post_save handlers maintain and the fixture loader skips."""
+    call_command('rebuild_order_rollups', verbosity=0)
+    call_command('rebuild_supplier_scorecards', verbosity=0)
+
+
+def bootstrap(path=None, force=False, progress=None):
+    """
+    Load the fixture at ``path`` unless the same content was loaded before
+    (or ``force``), then make sure the admin account exists. Returns a dict
+    with the fixture name, the objects loaded per model (None if skipped)
+    and whether the admin was created. ``progress`` is passed to the loader.
+    """
+    path = Path(path) if path else fixture_path()
+    result = {'fixture': path.name, 'loaded': None, 'admin_created': False}
+    with transaction.atomic():
+        connection = connections[DEFAULT_DB_ALIAS]
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT pg_advisory_xact_lock(%s)', [BOOTSTRAP_LOCK_ID])
+        if path.exists():
+            digest = file_hash(path)
+            record = FixtureLoad.objects.filter(name=path.name).first()
+            if force or record is None or record.content_hash != digest:
+                result['loaded'] = FixtureLoader(progress=progress).load(path)
+                rebuild_derived_data()
+                FixtureLoad.objects.update_or_create(name=path.name, defaults={
+                    'content_hash': digest, 'object_count': sum(result['loaded'].values()),
+                })
+        result['admin_created'] = ensure_admin()
+    return result
@@ -0,0 +1,216 @@
+"""
+Streaming bulk loader for JSON fixtures (manage.py fast_load, and
+manage.py bootstrap through core/bootstrap.py).
+
+loaddata reads the whole fixture into memory and saves it object by object.
+Here the JSON array is parsed incrementally (read_objects), Django's Python
+deserializer turns each object into an unsaved instance, and instances are
+buffered per model and written a batch at a time, so memory is bounded by
+the batch size times the number of models whatever the fixture's size.
+
+A batch inserts the objects whose primary key is new and updates the others.
+Inserts are raw, like loaddata, so auto_now fields keep the fixture's
+values; on PostgreSQL they are streamed with COPY. Audit log entries are
+append-only and never updated. As in loaddata, pre_save signals are sent
+with raw=True (suppliers get their name keys) and post_save bookkeeping is
+left to the caller. Foreign keys are checked when the loader finishes, so
+batches can be written in fixture order; the buffers left at the end are
+flushed parents first.
+"""
+import io
+import json
+from collections import defaultdict
+from datetime import timedelta
+
+from django.core.management.color import no_style
+from django.core.serializers.base import DeserializationError
+from django.core.serializers.python import Deserializer as PythonDeserializer
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models.signals import pre_save
+
+APPEND_ONLY = {'core.auditlog'}
+CHUNK_SIZE = 1024 * 1024
+COPY_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+
+
+def read_objects(stream, chunk_size=CHUNK_SIZE):
+    """Yield the elements of the JSON array in the text ``stream`` one at a time."""
+    decoder = json.JSONDecoder()
+    buffer, position, eof = '', 0, False
+
+    def fill():
+        nonlocal buffer, position, eof
+        chunk = stream.read(chunk_size)
+        eof = not chunk
+        buffer, position = buffer[position:] + chunk, 0
+
+    def next_char():
+        nonlocal position
+        while True:
+            while position < len(buffer) and buffer[position].isspace():
+                position += 1
+            if position < len(buffer) or eof:
+                return buffer[position] if position < len(buffer) else ''
+            fill()
+
+    if next_char() != '[':
+        raise DeserializationError('A fixture must be a JSON array')
+    position += 1
+    if next_char() == ']':
+        return
+    while True:
+        try:
+            value, end = decoder.raw_decode(buffer, position)
+            # A number cut off at the end of the buffer would still decode.
+            complete = end < len(buffer) or eof
+        except json.JSONDecodeError as exc:
+            if eof:
+                raise DeserializationError(f'Invalid JSON in fixture: {exc}') from exc
+            complete = False
+        if not complete:
+            fill()
+            continue
+        position = end
+        yield value
+        separator = next_char()
+        position += 1
+        if separator == ']':
+            return
+        if separator != ',':
+            raise DeserializationError(f'Expected "," or "]" in fixture, found {separator!r}')
+        next_char()
+
+
+def dependency_order(models):
+    """``models`` ordered so that the models a foreign key points to come first."""
+    models = list(models)
+    ordered, visiting = [], set()
+
+    def visit(model):
+        if model in ordered or model in visiting:
+            return
+        visiting.add(model)
+        for field in model._meta.concrete_fields:
+            if field.is_relation and field.related_model in models:
+                visit(field.related_model)
+        visiting.discard(model)
+        ordered.append(model)
+
+    for model in models:
+        visit(model)
+    return ordered
+
+
+def copy_value(value):
+    """``value``, prepared by the field for the database, in COPY text format."""
+    kind = type(value)
+    if kind is str:
+        return value.translate(COPY_ESCAPES)
+    if kind is int:
+        return str(value)
+    if value is None:
+        return '\\N'
+    if kind is bool:
+        return 't' if value else 'f'
+    if hasattr(value, 'adapted') and hasattr(value, 'dumps'):
+        value = value.dumps(value.adapted)  # psycopg2 Json
+    elif isinstance(value, timedelta):
+        value = f'{value.days} days {value.seconds} seconds {value.microseconds} microseconds'
+    elif hasattr(value, 'isoformat'):
+        value = value.isoformat()
+    elif isinstance(value, (bytes, memoryview)):
+        value = '\\x' + bytes(value).hex()
+    return str(value).translate(COPY_ESCAPES)
+
+
+class FixtureLoader:
+    """
+    Loads fixtures into the ``using`` database. Must run inside a
+    transaction; ``progress(objects)`` is called with the running total after
+    every batch written.
+    """
+
+    def __init__(self, using=DEFAULT_DB_ALIAS, batch_size=2000, use_copy=True, progress=None):
+        self.using = using
+        self.connection = connections[using]
+        self.batch_size = batch_size
+        self.use_copy = use_copy and self.connection.vendor == 'postgresql'
+        self.progress = progress
+        self.counts = defaultdict(int)
+
+    def load(self, path):
+        """Load the fixture at ``path``. Returns the number of objects per model label."""
+        buffers = defaultdict(list)
+        with self.connection.constraint_checks_disabled():
+            with open(path, encoding='utf-8') as stream:
+                objects = PythonDeserializer(read_objects(stream), using=self.using, ignorenonexistent=True)
+                for item in objects:
+                    model = type(item.object)
+                    buffers[model].append(item)
+                    if len(buffers[model]) >= self.batch_size:
+                        self.write(model, buffers.pop(model))
+            for model in dependency_order(buffers):
+                self.write(model, buffers[model])
+        models = list(self.counts)
+        self.connection.check_constraints(table_names=[model._meta.db_table for model in models])
+        self.reset_sequences(models)
+        return {model._meta.label: count for model, count in self.counts.items()}
+
+    def write(self, model, items):
+        objects = [item.object for item in items]
+        for obj in objects:
+            pre_save.send(sender=model, instance=obj, raw=True, using=self.using, update_fields=None)
+        manager = model._base_manager.db_manager(self.using)
+        fields = [field for field in model._meta.local_concrete_fields if not field.generated]
+        existing = set(manager.filter(pk__in=[obj.pk for obj in objects]).values_list('pk', flat=True))
+        new = [obj for obj in objects if obj.pk not in existing]
+        if new and self.use_copy:
+            self.copy(model, fields, new)
+        elif new:
+            # Within the backend's limit on query parameters, as bulk_create does.
+            size = max(self.connection.ops.bulk_batch_size(fields, new), 1)
+            for start in range(0, len(new), size):
+                manager._insert(new[start:start + size], fields=fields, raw=True, using=self.using)
+        if existing and model._meta.label_lower not in APPEND_ONLY:
+            manager.bulk_update(
+                [obj for obj in objects if obj.pk in existing], [field.name for field in fields if not field.primary_key],
+            )
+        self.write_many_to_many(model, items)
+        self.counts[model] += len(objects)
+        if self.progress:
+            self.progress(sum(self.counts.values()))
+
+    def copy(self, model, fields, objects):
+        quote = self.connection.ops.quote_name
+        data = io.StringIO()
+        for obj in objects:
+            data.write('\t'.join(
+                copy_value(field.get_db_prep_save(getattr(obj, field.attname), self.connection)) for field in fields
+            ))
+            data.write('\n')
+        data.seek(0)
+        columns = ', '.join(quote(field.column) for field in fields)
+        with self.connection.cursor() as cursor:
+            cursor.copy_expert(f'COPY {quote(model._meta.db_table)} ({columns}) FROM STDIN', data)
+
+    def write_many_to_many(self, model, items):
+        """Replace the many-to-many links the fixture lists for these objects."""
+        for field in model._meta.many_to_many:
+            links = {item.object.pk: item.m2m_data[field.name] for item in items if field.name in item.m2m_data}
+            if not links:
+                continue
+            through = field.remote_field.through._base_manager.db_manager(self.using)
+            source, target = field.m2m_field_name(), field.m2m_reverse_field_name()
+            through.filter(**{f'{source}__in': list(links)}).delete()
+            through.bulk_create([
+                through.model(**{f'{source}_id': pk, f'{target}_id': other})
+                for pk, others in links.items() for other in others
+            ], batch_size=self.batch_size)
+
+    def reset_sequences(self, models):
+        """Move id sequences past the fixture's primary keys, as loaddata does."""
+        statements = self.connection.ops.sequence_reset_sql(no_style(), models)
+        if statements:
+            with self.connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
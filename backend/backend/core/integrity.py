@@ -0,0 +1,232 @@
+"""
+Tamper evidence for the audit log.
+
+Every entry stores a SHA-256 digest of its own content, computed when it is
+written, so inserts never coordinate with each other. The digest covers the
+username recorded with the entry, not user_id, so deleting a user (which
+sets user_id to NULL) does not read as tampering. seal() later gives
+pending entries consecutive chain positions (chain_seq) and chained digests,
+sha256(previous chain digest + entry digest), and writes an HMAC-signed
+AuditCheckpoint after every ``interval`` entries. A checkpoint pins the chain
+digest at its position, so the chain can be verified from the latest trusted
+checkpoint or split into independent segments across processes.
+"""
+import hashlib
+import hmac
+import json
+import multiprocessing
+from datetime import timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import connection, connections, transaction
+from django.utils import timezone
+
+GENESIS = ''
+SEAL_LOCK_ID = 0x41554449  # pg_advisory_xact_lock key for sealing
+
+
+def content_digest(username, action, object_type, object_id, message, created_at):
+    created = created_at.astimezone(dt_timezone.utc).isoformat() if created_at else ''
+    payload = json.dumps(
+        [username, action, object_type, object_id, message, created],
+        separators=(',', ':'), ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def chain(previous, digest):
+    return hashlib.sha256((previous + digest).encode('ascii')).hexdigest()
+
+
+def signing_key():
+    key = getattr(settings, 'AUDIT_LOG_SIGNING_KEY', None) or settings.SECRET_KEY
+    return key.encode('utf-8')
+
+
+def sign(last_seq, chain_digest, row_count, previous_signature):
+    message = f'{last_seq}:{chain_digest}:{row_count}:{previous_signature}'.encode('utf-8')
+    return hmac.new(signing_key(), message, hashlib.sha256).hexdigest()
+
+
+CONTENT_FIELDS = ('username', 'action', 'object_type', 'object_id', 'message', 'created_at')
+
+
+class Segment:
+    """Chain entries after start_seq up to and including checkpoint ``end``."""
+
+    def __init__(self, start_seq, start_digest, end):
+        self.start_seq = start_seq
+        self.start_digest = start_digest
+        self.end = end
+
+    def was_archived(self):
+        """Whether archive_audit_logs has moved out a month this segment spans."""
+        from .archive import utc_month
+        from .models import AuditLogArchive
+
+        return AuditLogArchive.objects.filter(
+            month__gte=utc_month(self.end.first_created_at),
+            month__lte=utc_month(self.end.last_created_at),
+        ).exists()
+
+
+def checkpoint_segments(checkpoints):
+    """Split the chain into segments, each anchored at the checkpoint before it."""
+    segments = []
+    start_seq, start_digest = 0, GENESIS
+    for checkpoint in checkpoints:
+        segments.append(Segment(start_seq, start_digest, checkpoint))
+        start_seq, start_digest = checkpoint.last_seq, checkpoint.chain_digest
+    return segments
+
+
+def verify_checkpoint_signatures(checkpoints):
+    """Return errors for checkpoints whose signature does not match."""
+    errors = []
+    previous_signature = GENESIS
+    for checkpoint in checkpoints:
+        expected = sign(checkpoint.last_seq, checkpoint.chain_digest, checkpoint.row_count, previous_signature)
+        if not hmac.compare_digest(expected, checkpoint.signature):
+            errors.append(f'Checkpoint at #{checkpoint.last_seq} has an invalid signature')
+        previous_signature = checkpoint.signature
+    return errors
+
+
+def verify_segment(segment, chunk_size=5000):
+    """
+    Stream a segment's entries in chain order, recomputing content and chain
+    digests, and check the result against the closing checkpoint.
+    Returns (rows_checked, errors).
+
+    If the start of the segment has been archived, verification resumes from
+    the first entry still in the database.
+    """
+    from .models import AuditLog
+
+    end_seq = segment.end.last_seq
+    rows = (
+        AuditLog.objects.filter(chain_seq__gt=segment.start_seq, chain_seq__lte=end_seq)
+        .order_by('chain_seq')
+        .values_list('id', 'chain_seq', 'digest', 'chain_digest', *CONTENT_FIELDS)
+    )
+
+    errors = []
+    expected_seq, current, checked = segment.start_seq, segment.start_digest, 0
+    for log_id, seq, digest, chain_digest, *content in rows.iterator(chunk_size=chunk_size):
+        if seq != expected_seq + 1:
+            if checked == 0 and segment.was_archived():
+                current = None
+            else:
+                errors.append(f'Entries #{expected_seq + 1}-#{seq - 1} are missing')
+        if content_digest(*content) != digest:
+            errors.append(f'Audit log {log_id} (#{seq}) content does not match its digest')
+        if current is None:
+            current = chain_digest
+        else:
+            current = chain(current, digest)
+            if current != chain_digest:
+                errors.append(f'Audit log {log_id} (#{seq}) breaks the hash chain')
+                current = chain_digest
+        expected_seq, checked = seq, checked + 1
+
+    if checked == 0:
+        if not segment.was_archived():
+            errors.append(f'Entries #{segment.start_seq + 1}-#{end_seq} are missing')
+    elif expected_seq != end_seq:
+        errors.append(f'Entries #{expected_seq + 1}-#{end_seq} are missing')
+    elif current != segment.end.chain_digest:
+        errors.append(f'Chain digest at #{end_seq} does not match its checkpoint')
+    return checked, errors
+
+
+def _verify_segment_worker(args):
+    start_seq, start_digest, checkpoint_pk, chunk_size = args
+    from .models import AuditCheckpoint
+
+    try:
+        end = AuditCheckpoint.objects.get(pk=checkpoint_pk)
+        return verify_segment(Segment(start_seq, start_digest, end), chunk_size)
+    finally:
+        connection.close()
+
+
+def verify_segments(segments, workers=1, chunk_size=5000):
+    """Verify segments inline or across a pool of forked processes."""
+    if workers <= 1 or len(segments) <= 1:
+        results = [verify_segment(segment, chunk_size) for segment in segments]
+    else:
+        tasks = [
+            (segment.start_seq, segment.start_digest, segment.end.pk, chunk_size)
+            for segment in segments
+        ]
+        # Children must open their own database connections.
+        connections.close_all()
+        with multiprocessing.get_context('fork').Pool(workers) as pool:
+            results = pool.map(_verify_segment_worker, tasks)
+    checked = sum(count for count, _ in results)
+    errors = [error for _, segment_errors in results for error in segment_errors]
+    return checked, errors
+
+
+def seal(interval=10000, delay=None, batch_size=5000):
+    """
+    Assign chain positions and digests to pending entries, oldest id first,
+    writing a signed checkpoint every ``interval`` entries and at the end.
+    Entries younger than ``delay`` are left for the next run so transactions
+    still in flight are not skipped. Returns the number of entries sealed.
+    """
+    from .models import AuditCheckpoint, AuditLog
+
+    if delay is None:
+        delay = timedelta(seconds=getattr(settings, 'AUDIT_LOG_SEAL_DELAY', 60))
+    cutoff = timezone.now() - delay
+    sealed = 0
+    with transaction.atomic():
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT pg_advisory_xact_lock(%s)', [SEAL_LOCK_ID])
+        last = AuditCheckpoint.objects.order_by('-last_seq').first()
+        seq = last.last_seq if last else 0
+        current = last.chain_digest if last else GENESIS
+        signature = last.signature if last else GENESIS
+        pending_since_checkpoint, first_created, last_created = 0, None, None
+
+        while True:
+            batch = list(
+                AuditLog.objects.filter(chain_seq__isnull=True, created_at__lt=cutoff)
+                .order_by('id')[:batch_size]
+            )
+            if not batch:
+                break
+            for entry in batch:
+                if not entry.digest:
+                    # Entries inserted raw (fixtures) have neither.
+                    entry.set_username()
+                    entry.digest = entry.compute_digest()
+                seq += 1
+                current = chain(current, entry.digest)
+                entry.chain_seq, entry.chain_digest = seq, current
+                first_created = first_created or entry.created_at
+                last_created = max(last_created or entry.created_at, entry.created_at)
+                pending_since_checkpoint += 1
+                if pending_since_checkpoint >= interval:
+                    signature = _write_checkpoint(seq, current, pending_since_checkpoint,
+                                                  first_created, last_created, signature)
+                    pending_since_checkpoint, first_created, last_created = 0, None, None
+            AuditLog.objects.bulk_update(batch, ['username', 'digest', 'chain_seq', 'chain_digest'])
+            sealed += len(batch)
+        if pending_since_checkpoint:
+            _write_checkpoint(seq, current, pending_since_checkpoint, first_created, last_created, signature)
+    return sealed
+
+
+def _write_checkpoint(seq, chain_digest, row_count, first_created, last_created, previous_signature):
+    from .models import AuditCheckpoint
+
+    signature = sign(seq, chain_digest, row_count, previous_signature)
+    AuditCheckpoint.objects.create(
+        last_seq=seq, chain_digest=chain_digest, row_count=row_count,
+        first_created_at=first_created, last_created_at=last_created,
+        signature=signature,
+    )
+    return signature
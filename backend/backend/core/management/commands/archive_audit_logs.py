@@ -0,0 +1,41 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+from core import archive, integrity, partitions
+
+
+class Command(BaseCommand):
+    help = 'Move closed months of audit logs to compressed JSON Lines files'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--retention-months', type=int,
+            default=getattr(settings, 'AUDIT_LOG_RETENTION_MONTHS', 6),
+            help='Number of closed months to keep in the database',
+        )
+        parser.add_argument('--dry-run', action='store_true', help='List the months that would be archived')
+
+    def handle(self, *args, **options):
+        if not options['dry_run']:
+            # Archived entries must already be part of the hash chain.
+            integrity.seal()
+        months = archive.archivable_months(options['retention_months'])
+        if not months:
+            self.stdout.write('No audit log months to archive.')
+        for month in months:
+            if options['dry_run']:
+                self.stdout.write(f'Would archive {month:%Y-%m}')
+                continue
+            record = archive.archive_month(month)
+            if record:
+                self.stdout.write(self.style.SUCCESS(
+                    f'✅ Archived {record.row_count} audit logs for {month:%Y-%m} to {record.path}'
+                ))
+
+        if not options['dry_run']:
+            # Keep partitions ready for the coming months.
+            through = partitions.add_months(archive.utc_month(timezone.now()), 3)
+            for name in partitions.ensure_partitions(connection, through, since=archive.utc_month(timezone.now())):
+                self.stdout.write(f'Created partition {name}')
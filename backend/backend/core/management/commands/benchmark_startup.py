@@ -0,0 +1,71 @@
+import json
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# What a web worker does before serving its first request: load the WSGI
+# application and the URLconf, which imports every app's views.
+STARTUP = '''
+import json, resource, sys, time
+start = time.perf_counter()
+from core.wsgi import application
+from django.urls import get_resolver
+get_resolver().url_patterns
+if {render}:
+    import core.pdf
+print(json.dumps({{
+    'seconds': time.perf_counter() - start,
+    'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    'modules': len(sys.modules),
+    'pdf_libraries': sorted({{'reportlab', 'pypdf', 'PIL'}} & {{name.split('.')[0] for name in sys.modules}}),
+}}))
+'''
+
+
+def top_level_import_times(stderr):
+    """Microseconds spent importing each top-level package, from ``python -X importtime`` output."""
+    totals = defaultdict(int)
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        totals[name.strip().split('.')[0]] += int(self_us)
+    return totals
+
+
+class Command(BaseCommand):
+    help = 'Measure web worker cold start (import time and memory) in fresh interpreters'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5, help='Fresh interpreters to time')
+        parser.add_argument('--top', type=int, default=10, help='Packages to list by import time')
+        parser.add_argument(
+            '--with-pdf', action='store_true', help='Also import the PDF renderer, as the first PDF export does',
+        )
+
+    def start(self, options, *flags):
+        result = subprocess.run(
+            [sys.executable, *flags, '-c', STARTUP.format(render=options['with_pdf'])],
+            capture_output=True, text=True, check=True, cwd=settings.BASE_DIR,
+        )
+        return json.loads(result.stdout), result.stderr
+
+    def handle(self, *args, **options):
+        samples = [self.start(options)[0] for _ in range(options['runs'])]
+        sample, importtime = self.start(options, '-X', 'importtime')
+
+        self.stdout.write(
+            f"Startup: median {statistics.median(s['seconds'] for s in samples) * 1000:.0f} ms, "
+            f"max RSS {max(s['max_rss_kb'] for s in samples) / 1024:.1f} MB, "
+            f"{sample['modules']} modules over {options['runs']} runs"
+        )
+        self.stdout.write(f"PDF libraries loaded: {', '.join(sample['pdf_libraries']) or 'none'}")
+        self.stdout.write('Slowest packages to import (self time, -X importtime):')
+        totals = top_level_import_times(importtime)
+        for name, micros in sorted(totals.items(), key=lambda item: -item[1])[:options['top']]:
+            self.stdout.write(f'  {micros / 1000:8.1f} ms  {name}')
+        self.stdout.write(self.style.SUCCESS('✅ Startup benchmark complete'))
@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core import bootstrap
+
+
+class Command(BaseCommand):
+    help = 'Load the seed fixture if its content changed and create the admin user if missing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fixture', help='Fixture to load (default: BOOTSTRAP_FIXTURE)')
+        parser.add_argument('--force', action='store_true', help='Load the fixture even if it is unchanged')
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        result = bootstrap.bootstrap(options['fixture'], force=options['force'])
+        if result['loaded'] is None:
+            self.stdout.write(f"⏭️ {result['fixture']} unchanged (or missing), not loaded")
+        else:
+            for label, count in result['loaded'].items():
+                self.stdout.write(f'  {label}: {count}')
+            self.stdout.write(self.style.SUCCESS(
+                f"✅ Loaded {sum(result['loaded'].values())} objects from {result['fixture']}"
+            ))
+        if result['admin_created']:
+            self.stdout.write(self.style.SUCCESS('✅ Admin user created'))
+        self.stdout.write(self.style.SUCCESS(f'✅ Bootstrap complete in {time.perf_counter() - start:.2f}s'))
@@ -0,0 +1,46 @@
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from core import bootstrap
+from core.fixtures import FixtureLoader
+
+
+class Command(BaseCommand):
+    help = 'Stream a JSON fixture into the database with batched bulk writes (COPY on PostgreSQL)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('fixture', nargs='?', help='Fixture to load (default: BOOTSTRAP_FIXTURE)')
+        parser.add_argument('--batch-size', type=int, default=2000, help='Objects written per statement')
+        parser.add_argument('--no-copy', action='store_true', help='Insert with INSERT statements on PostgreSQL too')
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help='Database to load into')
+
+    def handle(self, *args, **options):
+        path = Path(options['fixture']) if options['fixture'] else bootstrap.fixture_path()
+        if not path.exists():
+            raise CommandError(f'Fixture not found: {path}')
+        self.stdout.write(f'🚀 Loading {path.name}...')
+        start = last = time.perf_counter()
+
+        def progress(objects):
+            nonlocal last
+            now = time.perf_counter()
+            if now - last >= 2:
+                self.stdout.write(f'  {objects:,} objects ({objects / (now - start):,.0f}/s)')
+                last = now
+
+        loader = FixtureLoader(
+            options['database'], batch_size=options['batch_size'], use_copy=not options['no_copy'],
+            progress=progress,
+        )
+        with transaction.atomic(using=options['database']):
+            counts = loader.load(path)
+            bootstrap.rebuild_derived_data()
+        for label, count in counts.items():
+            self.stdout.write(f'  {label}: {count:,}')
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Loaded {sum(counts.values()):,} objects from {path.name} in {elapsed:.1f}s'
+        ))
@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from core import schedules
+from core.models import ReportSchedule
+
+
+class Command(BaseCommand):
+    help = 'Generate and email the scheduled reports that are due, during the off-peak window'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Keep running, checking for due schedules')
+        parser.add_argument('--interval', type=int, default=60, help='Seconds between checks with --loop')
+        parser.add_argument(
+            '--now', action='store_true', help='Run due schedules even outside the off-peak window',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            for schedule in schedules.run_due(force=options['now']):
+                if schedule.last_status == ReportSchedule.Statuses.SENT:
+                    self.stdout.write(self.style.SUCCESS(
+                        f'✅ Sent {schedule.name} to {len(schedule.recipient_list())} recipients'
+                    ))
+                else:
+                    self.stdout.write(self.style.ERROR(f'❌ {schedule.name} failed: {schedule.last_error}'))
+            if not options['loop']:
+                break
+            close_old_connections()
+            time.sleep(options['interval'])
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core import integrity
+from core.models import AuditCheckpoint
+
+
+class Command(BaseCommand):
+    help = 'Seal new audit log entries into the hash chain and verify it'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true',
+                            help='Verify the whole chain instead of only entries since the last verified checkpoint')
+        parser.add_argument('--workers', type=int, default=1,
+                            help='Number of processes to split verification across')
+        parser.add_argument('--no-seal', action='store_true', help='Do not seal pending entries first')
+        parser.add_argument('--interval', type=int, default=10000, help='Entries between checkpoints when sealing')
+        parser.add_argument('--chunk-size', type=int, default=5000, help='Rows fetched per database round trip')
+
+    def handle(self, *args, **options):
+        if not options['no_seal']:
+            sealed = integrity.seal(interval=options['interval'])
+            self.stdout.write(f'Sealed {sealed} new audit log entries.')
+
+        checkpoints = list(AuditCheckpoint.objects.order_by('last_seq'))
+        errors = integrity.verify_checkpoint_signatures(checkpoints)
+        segments = integrity.checkpoint_segments(checkpoints)
+        if not options['full']:
+            segments = [segment for segment in segments if segment.end.verified_at is None]
+
+        checked, segment_errors = integrity.verify_segments(
+            segments, workers=options['workers'], chunk_size=options['chunk_size']
+        )
+        errors.extend(segment_errors)
+        if errors:
+            for error in errors:
+                self.stderr.write(self.style.ERROR(f'❌ {error}'))
+            raise CommandError(f'Audit log verification failed with {len(errors)} error(s).')
+
+        AuditCheckpoint.objects.filter(pk__in=[segment.end.pk for segment in segments]).update(
+            verified_at=timezone.now()
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Verified {checked} audit log entries across {len(segments)} checkpoint segment(s).'
+        ))
@@ -0,0 +1,20 @@
+from . import audit
+
+
+class AuditLogMiddleware:
+    """
+    Buffer audit entries raised while handling a request and write them with a
+    single bulk insert once the response is ready.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = audit.begin(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            buffer = audit.end(token)
+            audit.flush(buffer)
+        return response
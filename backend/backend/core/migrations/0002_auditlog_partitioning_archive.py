@@ -0,0 +1,41 @@
+# Generated by Django 5.2.4 on 2026-10-19 13:09
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def partition_auditlog(apps, schema_editor):
+    from core.partitions import convert_to_partitioned
+    if schema_editor.connection.vendor == 'postgresql':
+        convert_to_partitioned(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_auditlog, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name='AuditLogArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='First day of the archived month')),
+                ('path', models.CharField(help_text='File name relative to AUDIT_LOG_ARCHIVE_DIR', max_length=500)),
+                ('row_count', models.PositiveIntegerField(default=0)),
+                ('first_id', models.BigIntegerField(blank=True, null=True)),
+                ('last_id', models.BigIntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['month', 'id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['created_at'], name='core_audit_created_idx'),
+        ),
+    ]
@@ -0,0 +1,84 @@
+# Generated by Django 5.2.4 on 2026-10-19 13:12
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_digests(apps, schema_editor):
+    from core.integrity import content_digest
+    AuditLog = apps.get_model('core', 'AuditLog')
+    batch = []
+    entries = AuditLog.objects.filter(digest='').select_related('user').order_by('id')
+    for entry in entries.iterator(chunk_size=2000):
+        entry.username = entry.user.username if entry.user_id else ''
+        entry.digest = content_digest(
+            entry.username, entry.action, entry.object_type, entry.object_id, entry.message, entry.created_at
+        )
+        batch.append(entry)
+        if len(batch) >= 2000:
+            AuditLog.objects.bulk_update(batch, ['username', 'digest'])
+            batch = []
+    AuditLog.objects.bulk_update(batch, ['username', 'digest'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_auditlog_partitioning_archive'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuditCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_seq', models.BigIntegerField(unique=True)),
+                ('chain_digest', models.CharField(max_length=64)),
+                ('row_count', models.PositiveIntegerField(help_text='Entries sealed since the previous checkpoint')),
+                ('first_created_at', models.DateTimeField(blank=True, null=True)),
+                ('last_created_at', models.DateTimeField(blank=True, null=True)),
+                ('signature', models.CharField(max_length=64)),
+                ('verified_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['last_seq'],
+            },
+        ),
+        migrations.AddField(
+            model_name='auditlog',
+            name='chain_digest',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='auditlog',
+            name='chain_seq',
+            field=models.BigIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='auditlog',
+            name='digest',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='auditlog',
+            name='username',
+            field=models.CharField(blank=True, editable=False, max_length=150),
+        ),
+        migrations.AlterField(
+            model_name='auditlog',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['chain_seq'], name='core_audit_chain_seq_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(condition=models.Q(('chain_seq__isnull', True)), fields=['id'], name='core_audit_unsealed_idx'),
+        ),
+        migrations.RunPython(backfill_digests, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.4 on 2026-10-19 13:13
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_codes(apps, schema_editor):
+    from core.models import normalize_code
+    AuditLog = apps.get_model('core', 'AuditLog')
+    # Labels repeat heavily, so update once per distinct value instead of per row.
+    for field in ('action', 'object_type'):
+        for value in AuditLog.objects.order_by().values_list(field, flat=True).distinct():
+            AuditLog.objects.filter(**{field: value}).update(**{f'{field}_code': normalize_code(value)})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_auditlog_hash_chain'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='auditlog',
+            name='action_code',
+            field=models.CharField(blank=True, editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='auditlog',
+            name='object_type_code',
+            field=models.CharField(blank=True, editable=False, max_length=100),
+        ),
+        migrations.RunPython(backfill_codes, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['action_code', '-created_at'], name='core_audit_action_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['object_type_code', '-created_at'], name='core_audit_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['user', '-created_at'], name='core_audit_user_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['object_type_code', 'object_id'], name='core_audit_object_idx'),
+        ),
+    ]
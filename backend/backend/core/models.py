@@ -1,16 +1,177 @@
+import re
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+def normalize_code(value):
+    """Filter code for free-text labels: 'Inventory Item' -> 'INVENTORY_ITEM'."""
+    return re.sub(r'[^A-Z0-9]+', '_', (value or '').upper()).strip('_')[:100]
+
+class AuditLogQuerySet(models.QuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        for obj in objs:
+            obj.set_codes()
+            obj.set_username()
+            obj.digest = obj.digest or obj.compute_digest()
+        return super().bulk_create(objs, *args, **kwargs)
 
 class AuditLog(models.Model):
     """
     Model for tracking key system actions for auditability.
+    On PostgreSQL the table is partitioned by month of created_at (see core.partitions).
+    Entries are append-only: each carries a digest of its content and, once
+    sealed by verify_audit_log, its position and digest in the hash chain.
     """
     user = models.ForeignKey(get_user_model(), on_delete=models.SET_NULL, null=True, blank=True)
+    # The user's name when the entry was written. The digest covers it rather
+    # than user, which becomes NULL when the user is deleted.
+    username = models.CharField(max_length=150, blank=True, editable=False)
     action = models.CharField(max_length=100)
     object_type = models.CharField(max_length=100)
     object_id = models.CharField(max_length=100, blank=True)
     message = models.TextField(blank=True)
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+    digest = models.CharField(max_length=64, blank=True, editable=False)
+    chain_seq = models.BigIntegerField(null=True, blank=True, editable=False)
+    chain_digest = models.CharField(max_length=64, blank=True, editable=False)
+    # Normalized copies of action and object_type for exact, indexed filtering
+    action_code = models.CharField(max_length=100, blank=True, editable=False)
+    object_type_code = models.CharField(max_length=100, blank=True, editable=False)
+
+    objects = AuditLogQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at'], name='core_audit_created_idx'),
+            models.Index(fields=['chain_seq'], name='core_audit_chain_seq_idx'),
+            models.Index(fields=['id'], condition=models.Q(chain_seq__isnull=True), name='core_audit_unsealed_idx'),
+            # Match the list view's filter combinations, newest first
+            models.Index(fields=['action_code', '-created_at'], name='core_audit_action_idx'),
+            models.Index(fields=['object_type_code', '-created_at'], name='core_audit_type_idx'),
+            models.Index(fields=['user', '-created_at'], name='core_audit_user_idx'),
+            models.Index(fields=['object_type_code', 'object_id'], name='core_audit_object_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.action} on {self.object_type} ({self.object_id}) by {self.user or 'system'}"
+
+    def set_codes(self):
+        self.action_code = normalize_code(self.action)
+        self.object_type_code = normalize_code(self.object_type)
+
+    def set_username(self):
+        if not self.username and self.user_id:
+            self.username = self.user.username
+
+    def compute_digest(self):
+        from .integrity import content_digest
+        return content_digest(
+            self.username, self.action, self.object_type, self.object_id, self.message, self.created_at
+        )
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError('Audit log entries are append-only.')
+        self.set_codes()
+        self.set_username()
+        self.digest = self.compute_digest()
+        super().save(*args, **kwargs)
+
+class AuditLogArchive(models.Model):
+    """
+    A closed month of audit logs moved out of the database into a compressed
+    JSON Lines file by the archive_audit_logs command.
+    """
+    month = models.DateField(help_text='First day of the archived month')
+    path = models.CharField(max_length=500, help_text='File name relative to AUDIT_LOG_ARCHIVE_DIR')
+    row_count = models.PositiveIntegerField(default=0)
+    first_id = models.BigIntegerField(null=True, blank=True)
+    last_id = models.BigIntegerField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        ordering = ['month', 'id']
+
+    def __str__(self):
+        return f"Audit log archive {self.month:%Y-%m} ({self.row_count} rows)"
+
+class AuditCheckpoint(models.Model):
+    """
+    Signed snapshot of the audit hash chain after the entry at last_seq.
+    Each signature also covers the previous checkpoint's, so checkpoints form
+    their own chain and any segment between two of them can be verified alone.
+    """
+    last_seq = models.BigIntegerField(unique=True)
+    chain_digest = models.CharField(max_length=64)
+    row_count = models.PositiveIntegerField(help_text='Entries sealed since the previous checkpoint')
+    first_created_at = models.DateTimeField(null=True, blank=True)
+    last_created_at = models.DateTimeField(null=True, blank=True)
+    signature = models.CharField(max_length=64)
+    verified_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['last_seq']
+
+    def __str__(self):
+        return f"Audit checkpoint at #{self.last_seq}"
+
+class ReportSchedule(models.Model):
+    """
+    A report export generated on a cadence during the off-peak window and
+    emailed to its recipients as a download link (see core/schedules.py).
+    """
+    class Reports(models.TextChoices):
+        INVENTORY = 'inventory', 'Inventory'
+        ORDERS = 'orders', 'Orders'
+        SUPPLIERS = 'suppliers', 'Suppliers'
+
+    class Formats(models.TextChoices):
+        PDF = 'pdf', 'PDF'
+        CSV = 'csv', 'CSV'
+
+    class Cadences(models.TextChoices):
+        DAILY = 'DAILY', 'Daily'
+        WEEKLY = 'WEEKLY', 'Weekly'
+        MONTHLY = 'MONTHLY', 'Monthly'
+
+    class Statuses(models.TextChoices):
+        SENT = 'SENT', 'Sent'
+        FAILED = 'FAILED', 'Failed'
+
+    name = models.CharField(max_length=100)
+    report = models.CharField(max_length=20, choices=Reports.choices)
+    format = models.CharField(max_length=3, choices=Formats.choices, default=Formats.PDF)
+    cadence = models.CharField(max_length=10, choices=Cadences.choices, default=Cadences.DAILY)
+    recipients = models.TextField(help_text='Email addresses, separated by commas or new lines')
+    is_active = models.BooleanField(default=True)
+    next_run_at = models.DateTimeField()
+    last_run_at = models.DateTimeField(null=True, blank=True)
+    last_status = models.CharField(max_length=10, choices=Statuses.choices, blank=True)
+    last_error = models.TextField(blank=True)
+    created_by = models.ForeignKey(get_user_model(), on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['next_run_at', 'id']
+
+    def __str__(self):
+        return f"{self.name} ({self.get_cadence_display()} {self.get_format_display()})"
+
+    def recipient_list(self):
+        return [email for email in re.split(r'[\s,;]+', self.recipients) if email]
+
+class FixtureLoad(models.Model):
+    """The content hash of a fixture manage.py bootstrap loaded (see core/bootstrap.py)."""
+    name = models.CharField(max_length=255, unique=True)
+    content_hash = models.CharField(max_length=64)
+    object_count = models.PositiveIntegerField()
+    loaded_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['name']
+
     def __str__(self):
-        return f"{self.action} on {self.object_type} ({self.object_id}) by {self.user or 'system'}" 
\ No newline at end of file
+        return f"{self.name} ({self.content_hash[:12]})"
@@ -0,0 +1,132 @@
+"""
+Monthly range partitioning of the audit log table on PostgreSQL.
+
+core_auditlog is declared PARTITION BY RANGE (created_at) with one child table
+per calendar month plus a default partition. Recent-date queries only touch
+the newest partitions, and archived months are removed by detaching and
+dropping their partition instead of deleting rows. Other databases keep a
+single table, bounded by archive_audit_logs.
+"""
+from datetime import date
+
+TABLE = 'core_auditlog'
+DEFAULT_PARTITION = f'{TABLE}_default'
+
+
+def is_partitioned(connection):
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+            "WHERE c.relname = %s AND c.relnamespace = 'public'::regnamespace",
+            [TABLE],
+        )
+        return cursor.fetchone() is not None
+
+
+def month_start(value):
+    return date(value.year, value.month, 1)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month):
+    return f'{TABLE}_y{month.year}m{month.month:02d}'
+
+
+def existing_partitions(connection):
+    """Names of the partitions currently attached to the audit log table."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent WHERE p.relname = %s",
+            [TABLE],
+        )
+        return {row[0] for row in cursor.fetchall()}
+
+
+def create_partition(connection, month):
+    """
+    Attach the partition for ``month``. Rows for that month already sitting
+    in the default partition are moved into it first, which ATTACH requires.
+    """
+    name = partition_name(month)
+    start, end = month.isoformat(), add_months(month, 1).isoformat()
+    with connection.cursor() as cursor:
+        cursor.execute(f'CREATE TABLE "{name}" (LIKE "{TABLE}" INCLUDING DEFAULTS)')
+        cursor.execute(
+            f'WITH moved AS (DELETE FROM "{DEFAULT_PARTITION}" '
+            f'WHERE created_at >= %s AND created_at < %s RETURNING *) '
+            f'INSERT INTO "{name}" SELECT * FROM moved',
+            [start, end],
+        )
+        cursor.execute(
+            f'ALTER TABLE "{TABLE}" ATTACH PARTITION "{name}" '
+            f"FOR VALUES FROM ('{start}') TO ('{end}')"
+        )
+
+
+def ensure_partitions(connection, through, since=None):
+    """Create any missing monthly partitions between ``since`` and ``through``."""
+    if not is_partitioned(connection):
+        return []
+    existing = existing_partitions(connection)
+    month = month_start(since or through)
+    last = month_start(through)
+    created = []
+    while month <= last:
+        if partition_name(month) not in existing:
+            create_partition(connection, month)
+            created.append(partition_name(month))
+        month = add_months(month, 1)
+    return created
+
+
+def drop_partition(connection, month):
+    """Detach and drop a month's partition. Returns False if there is none."""
+    name = partition_name(month)
+    if name not in existing_partitions(connection):
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(f'ALTER TABLE "{TABLE}" DETACH PARTITION "{name}"')
+        cursor.execute(f'DROP TABLE "{name}"')
+    return True
+
+
+def convert_to_partitioned(connection, months_ahead=3):
+    """
+    Rebuild core_auditlog as a partitioned table, copying existing rows.
+    The primary key becomes (id, created_at) because PostgreSQL requires the
+    partition key in every unique constraint; ids still come from one sequence.
+    """
+    from django.utils import timezone
+
+    legacy = f'{TABLE}_legacy'
+    sequence = f'{TABLE}_partitioned_id_seq'
+    with connection.cursor() as cursor:
+        cursor.execute(f'ALTER TABLE "{TABLE}" RENAME TO "{legacy}"')
+        cursor.execute(
+            f'CREATE TABLE "{TABLE}" (LIKE "{legacy}" INCLUDING DEFAULTS) '
+            f'PARTITION BY RANGE (created_at)'
+        )
+        cursor.execute(f'CREATE SEQUENCE "{sequence}" OWNED BY "{TABLE}".id')
+        cursor.execute(f'ALTER TABLE "{TABLE}" ALTER COLUMN id SET DEFAULT nextval(\'"{sequence}"\')')
+        cursor.execute(f'ALTER TABLE "{TABLE}" ADD PRIMARY KEY (id, created_at)')
+        cursor.execute(
+            f'ALTER TABLE "{TABLE}" ADD CONSTRAINT "{TABLE}_user_id_fk_users_user_id" '
+            f'FOREIGN KEY (user_id) REFERENCES users_user (id) DEFERRABLE INITIALLY DEFERRED'
+        )
+        cursor.execute(f'CREATE INDEX "{TABLE}_user_id_idx" ON "{TABLE}" (user_id)')
+        cursor.execute(f'CREATE TABLE "{DEFAULT_PARTITION}" PARTITION OF "{TABLE}" DEFAULT')
+        cursor.execute(f'INSERT INTO "{TABLE}" SELECT * FROM "{legacy}"')
+        cursor.execute(f'SELECT min(created_at) FROM "{TABLE}"')
+        oldest = cursor.fetchone()[0]
+        cursor.execute(f'SELECT setval(\'"{sequence}"\', coalesce((SELECT max(id) FROM "{TABLE}"), 0) + 1, false)')
+        cursor.execute(f'DROP TABLE "{legacy}"')
+    now = timezone.now()
+    ensure_partitions(connection, add_months(month_start(now), months_ahead), since=oldest or now)
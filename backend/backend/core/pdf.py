@@ -0,0 +1,315 @@
+"""
+PDF rendering of reports (see core/reports.py) with ReportLab platypus.
+
+ReportLab and pypdf are only needed once a PDF is rendered, so this module
+is imported on first use rather than with the views.
+
+The layout follows the HTML templates the exports used to go through
+xhtml2pdf: centred title, full-width table with a 1px grey grid, and a grey
+header row, which is repeated at the top of every page.
+
+Rows are read with QuerySet.iterator() and turned into small tables of
+ROWS_PER_TABLE rows only as the layout reaches them (StreamedStory), so the
+flowables for the whole report never exist at once. The column header is
+drawn by the page template rather than being part of the tables, so the
+chunks stack into what reads as one table.
+
+A report rendered in one process is written by ReportLab straight to the
+output. Its page numbers ("Page 3 of 120") are form XObjects that every page
+refers to and NumberedCanvas only draws when the document is saved and the
+total is known, so no page is kept or read back.
+
+Reports longer than REPORT_PDF_CHUNK_PAGES pages can be laid out in
+parallel: the rows, still read by one query, are cut into runs that fill
+exactly that many pages, each run is rendered in a forked worker process, and
+the parts are joined with pypdf, which stamps the page numbers on the joined
+document. Wrapped columns make the number of rows on a page depend on the
+text, so those reports render in one process.
+The pool forks the calling process, so only single-threaded callers (the
+report scheduler) ask for several workers; requests default to
+REPORT_PDF_WORKERS, which is 1.
+"""
+import multiprocessing
+import os
+import tempfile
+from collections import deque
+from itertools import chain, islice, repeat
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen.canvas import Canvas
+from reportlab.platypus import BaseDocTemplate, Frame, PageTemplate, Paragraph, Spacer, Table, TableStyle
+from pypdf import PdfWriter
+from pypdf.generic import ArrayObject, DictionaryObject, NameObject, StreamObject
+
+from .reports import REPORTS
+
+ROWS_PER_TABLE = 50
+FONT, BOLD, FONT_SIZE = 'Helvetica', 'Helvetica-Bold', 9
+TITLE_SIZE = 16
+PADDING_X, PADDING_Y = 7.5, 4.5
+HEADER_HEIGHT = FONT_SIZE + 2 * PADDING_Y + 2
+GRID_COLOR = colors.HexColor('#888888')
+HEADER_BACKGROUND = colors.HexColor('#f0f0f0')
+MARGIN = 36
+PAGE_NUMBER_SIZE = 8
+TABLE_STYLE = TableStyle([
+    ('FONT', (0, 0), (-1, -1), FONT, FONT_SIZE),
+    ('GRID', (0, 0), (-1, -1), 0.75, GRID_COLOR),
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ('LEFTPADDING', (0, 0), (-1, -1), PADDING_X),
+    ('RIGHTPADDING', (0, 0), (-1, -1), PADDING_X),
+    ('TOPPADDING', (0, 0), (-1, -1), PADDING_Y),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), PADDING_Y),
+])
+CELL_STYLE = ParagraphStyle('report-cell', fontName=FONT, fontSize=FONT_SIZE, leading=FONT_SIZE * 1.2)
+TITLE_STYLE = ParagraphStyle(
+    'report-title', fontName=BOLD, fontSize=TITLE_SIZE, leading=TITLE_SIZE * 1.2, alignment=TA_CENTER,
+)
+
+
+def page_size(report):
+    return landscape(A4) if report.landscape else A4
+
+
+def clip(text, width, font=FONT, size=FONT_SIZE):
+    """``text`` shortened with an ellipsis to fit ``width`` points."""
+    if stringWidth(text, font, size) <= width:
+        return text
+    text = text[:max(int(len(text) * width / stringWidth(text, font, size)), 1)]
+    while text and stringWidth(text + '…', font, size) > width:
+        text = text[:-1]
+    return text + '…'
+
+
+class StreamedStory(list):
+    """
+    A platypus story that pulls flowables from an iterator as the layout
+    consumes them, keeping only a few in memory.
+    """
+
+    def __init__(self, flowables, low_water=2):
+        super().__init__()
+        self.source = iter(flowables)
+        self.low_water = low_water
+
+    def __len__(self):
+        while self.source is not None and super().__len__() < self.low_water:
+            flowable = next(self.source, None)
+            if flowable is None:
+                self.source = None
+            else:
+                self.append(flowable)
+        return super().__len__()
+
+
+class NumberedCanvas(Canvas):
+    """
+    A canvas that puts "Page n of total" at the foot of every page. Each page
+    draws a form that is only defined on save, once the total is known.
+    """
+
+    def showPage(self):
+        self.doForm(f'pageNumber{self.getPageNumber()}')
+        super().showPage()
+
+    def save(self):
+        if self._code:
+            self.showPage()
+        total = self.getPageNumber() - 1
+        right, y = self._pagesize[0] - MARGIN, MARGIN / 2
+        for number in range(1, total + 1):
+            self.beginForm(f'pageNumber{number}')
+            self.setFillColor(colors.grey)
+            self.setFont(FONT, PAGE_NUMBER_SIZE)
+            self.drawRightString(right, y, f'Page {number} of {total}')
+            self.endForm()
+        super().save()
+
+
+class ReportDocument(BaseDocTemplate):
+    """
+    Pages with the report title (first page only) and column header. A
+    document for a later part of a parallel render has no title page.
+    """
+
+    def __init__(self, output, report, title_page=True, **kwargs):
+        super().__init__(
+            output, pagesize=page_size(report), leftMargin=MARGIN, rightMargin=MARGIN, topMargin=MARGIN, bottomMargin=MARGIN,
+            title=report.title, pageCompression=1, **kwargs,
+        )
+        self.report = report
+        total = sum(column.width for column in report.columns)
+        self.col_widths = [self.width * column.width / total for column in report.columns]
+        title_height = TITLE_SIZE * 1.2 + 20
+        later = PageTemplate('later', [self.frame(0)], onPage=self.decorate)
+        if title_page:
+            self.addPageTemplates([
+                PageTemplate('first', [self.frame(title_height)], onPage=self.decorate, autoNextPageTemplate='later'),
+                later,
+            ])
+        else:
+            self.addPageTemplates([later])
+
+    def frame(self, title_height):
+        height = self.height - title_height - HEADER_HEIGHT
+        return Frame(
+            self.leftMargin, self.bottomMargin, self.width, height,
+            leftPadding=0, rightPadding=0, topPadding=0, bottomPadding=0, showBoundary=0,
+        )
+
+    def decorate(self, canvas, doc):
+        canvas.saveState()
+        top = self.bottomMargin + self.height
+        if doc.pageTemplate.id == 'first':
+            title = Paragraph(escape(self.report.title), TITLE_STYLE)
+            title.wrapOn(canvas, self.width, TITLE_SIZE * 2)
+            title.drawOn(canvas, self.leftMargin, top - TITLE_SIZE * 1.2)
+            top -= TITLE_SIZE * 1.2 + 20
+        canvas.setFillColor(HEADER_BACKGROUND)
+        canvas.setStrokeColor(GRID_COLOR)
+        canvas.setLineWidth(0.75)
+        x = self.leftMargin
+        for column, width in zip(self.report.columns, self.col_widths):
+            canvas.rect(x, top - HEADER_HEIGHT, width, HEADER_HEIGHT, stroke=1, fill=1)
+            canvas.setFillColor(colors.black)
+            canvas.setFont(BOLD, FONT_SIZE)
+            canvas.drawCentredString(
+                x + width / 2, top - HEADER_HEIGHT + PADDING_Y + 2, clip(column.title, width - 2 * PADDING_X, BOLD),
+            )
+            canvas.setFillColor(HEADER_BACKGROUND)
+            x += width
+        canvas.restoreState()
+
+    def rows_per_page(self):
+        """
+        How many rows fill the first and each later page, or None when
+        wrapped columns make that depend on the text.
+        """
+        if any(column.wrap for column in self.report.columns):
+            return None
+        row = Table([cells(self.report, [''] * len(self.col_widths), self.col_widths)], colWidths=self.col_widths)
+        row.setStyle(TABLE_STYLE)
+        height = row.wrap(self.width, self.height)[1]
+        return [int(template.frames[0].height // height) for template in self.pageTemplates]
+
+
+def cells(report, row, col_widths):
+    return [
+        Paragraph(escape(text), CELL_STYLE) if column.wrap else clip(text, width - 2 * PADDING_X)
+        for column, text, width in zip(report.columns, row, col_widths)
+    ]
+
+
+def tables(report, rows, col_widths):
+    rows = iter(rows)
+    while batch := list(islice(rows, ROWS_PER_TABLE)):
+        table = Table([cells(report, row, col_widths) for row in batch], colWidths=col_widths)
+        table.setStyle(TABLE_STYLE)
+        yield table
+
+
+def render_part(report, output, rows, title_page=True, page_numbers=False):
+    """Lay out ``rows`` of ``report`` as a PDF, numbering its pages if ``page_numbers``."""
+    doc = ReportDocument(output, report, title_page=title_page)
+    # The spacer starts the first page even when there are no rows.
+    doc.build(
+        StreamedStory(chain([Spacer(0, 0)], tables(report, rows, doc.col_widths))),
+        canvasmaker=NumberedCanvas if page_numbers else Canvas,
+    )
+
+
+def _render_part_worker(args):
+    name, path, rows, title_page = args
+    render_part(REPORTS[name], path, rows, title_page)
+    return path
+
+
+def number_pages(writer, report):
+    """Stamp "Page n of total" at the foot of every page of ``writer``."""
+    font = writer._add_object(DictionaryObject({
+        NameObject('/Type'): NameObject('/Font'),
+        NameObject('/Subtype'): NameObject('/Type1'),
+        NameObject('/BaseFont'): NameObject(f'/{FONT}'),
+        NameObject('/Encoding'): NameObject('/WinAnsiEncoding'),
+    }))
+    # Wrap the existing content in q/Q so its graphics state cannot leak into the number.
+    save = StreamObject()
+    save.set_data(b'q\n')
+    save = writer._add_object(save)
+    right, y = page_size(report)[0] - MARGIN, MARGIN / 2
+    gray = colors.grey.red
+    total = len(writer.pages)
+    for number, page in enumerate(writer.pages, start=1):
+        label = f'Page {number} of {total}'
+        x = right - stringWidth(label, FONT, PAGE_NUMBER_SIZE)
+        stamp = StreamObject()
+        stamp.set_data(
+            f'Q q {gray:.3f} g BT /PageNumber {PAGE_NUMBER_SIZE} Tf {x:.2f} {y:.2f} Td ({label}) Tj ET Q\n'.encode()
+        )
+        resources = page['/Resources']
+        resources.setdefault(NameObject('/Font'), DictionaryObject()).get_object()[NameObject('/PageNumber')] = font
+        contents = page.raw_get('/Contents')
+        contents = list(contents) if isinstance(contents, ArrayObject) else [contents]
+        page[NameObject('/Contents')] = ArrayObject([save, *contents, writer._add_object(stamp)])
+
+
+def batches(rows, sizes):
+    """Consecutive lists of ``rows`` with the given sizes, until the rows run out."""
+    for size in sizes:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+def render_pdf(report, output, rows=None, workers=None, chunk_pages=None):
+    """
+    Write ``report`` as a PDF to ``output`` (a path or binary file), split
+    into parts of ``chunk_pages`` pages rendered by up to ``workers``
+    processes.
+    """
+    workers = getattr(settings, 'REPORT_PDF_WORKERS', 1) if workers is None else workers
+    chunk_pages = chunk_pages or getattr(settings, 'REPORT_PDF_CHUNK_PAGES', 100)
+    rows = iter(report.rows() if rows is None else rows)
+    per_page = ReportDocument(None, report).rows_per_page() if workers > 1 else None
+    if per_page is not None:
+        first_page, later_page = per_page
+        runs = batches(rows, chain(
+            [first_page + (chunk_pages - 1) * later_page], repeat(chunk_pages * later_page),
+        ))
+        first, second = next(runs, []), next(runs, None)
+        if second is not None:
+            with tempfile.TemporaryDirectory() as directory:
+                parts = render_parts(report, directory, chain([first, second], runs), workers)
+                writer = PdfWriter()
+                for part in parts:
+                    writer.append(part)
+                number_pages(writer, report)
+                writer.add_metadata({'/Title': report.title})
+                writer.write(output)
+            return
+        rows = first
+    render_part(report, output, rows, page_numbers=True)
+
+
+def render_parts(report, directory, batches, workers):
+    """
+    Render each batch of rows to its own file in a pool of forked processes,
+    keeping at most two batches per worker queued. Returns the file paths.
+    """
+    parts, pending = [], deque()
+    # The workers only lay out text and never use the parent's database connection.
+    with multiprocessing.get_context('fork').Pool(workers) as pool:
+        for index, batch in enumerate(batches):
+            if len(pending) >= 2 * workers:
+                parts.append(pending.popleft().get())
+            path = os.path.join(directory, f'{index}.pdf')
+            pending.append(pool.apply_async(_render_part_worker, ((report.name, path, batch, index == 0),)))
+        parts.extend(result.get() for result in pending)
+    return parts
@@ -0,0 +1,140 @@
+"""
+Report and export definitions.
+
+A Report declares a title, its columns and the queryset it lists, and is
+rendered to PDF by core/pdf.py, which is imported only when a PDF is first
+needed so the views (and every web worker) do not load ReportLab and pypdf
+up front. A CSVExport declares a header and a row function. Both are
+registered by name, looked up by the views and the report scheduler, and
+served from the artifact cache (core/artifacts.py).
+"""
+import csv
+from datetime import datetime
+
+from django.http import FileResponse
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+from . import artifacts
+
+REPORTS = {}
+CSV_EXPORTS = {}
+
+
+def format_datetime(value):
+    """Like the templates' date:'Y-m-d H:i', in the current time zone."""
+    return timezone.localtime(value).strftime('%Y-%m-%d %H:%M') if value else ''
+
+
+class Column:
+    """
+    A report column. ``value`` is an attribute name or a callable taking the
+    row object; ``width`` is relative to the other columns. Wrapped columns
+    break long text over several lines, the others are clipped to one.
+    """
+
+    def __init__(self, title, value, width=1, wrap=False):
+        self.title = title
+        self.value = value
+        self.width = width
+        self.wrap = wrap
+
+    def text(self, obj):
+        value = self.value(obj) if callable(self.value) else getattr(obj, self.value)
+        if value is None:
+            return ''
+        return format_datetime(value) if isinstance(value, datetime) else str(value)
+
+
+class Report:
+    """
+    A titled table of ``queryset()`` rows, downloadable as ``filename``.pdf,
+    on an A4 page, turned sideways for ``landscape`` reports. ``models``
+    lists every model whose data the rows show, for the artifact cache to
+    tell when the report is out of date.
+    """
+
+    content_type = 'application/pdf'
+    extension = 'pdf'
+
+    def __init__(self, name, title, columns, queryset, filename, models, landscape=False):
+        self.name = name
+        self.title = title
+        self.columns = columns
+        self.queryset = queryset
+        self.filename = filename
+        self.models = models
+        self.landscape = landscape
+
+    def rows(self, chunk_size=2000):
+        for obj in self.queryset().iterator(chunk_size=chunk_size):
+            yield [column.text(obj) for column in self.columns]
+
+    def open(self, workers=None):
+        """
+        The rendered PDF from the artifact cache, opened for reading. A miss
+        renders with up to ``workers`` processes (default REPORT_PDF_WORKERS).
+        """
+        return artifacts.open_artifact(
+            f'{self.name}.pdf', self.models, lambda path: render_pdf(self, path, workers=workers),
+            # Dates are shown in the current time zone.
+            params={'time_zone': timezone.get_current_timezone_name()},
+        )
+
+
+class CSVExport:
+    """
+    A CSV of the ``header`` row and ``row(obj)`` for each of ``queryset()``,
+    downloadable as ``filename``.csv. ``models`` is as for Report.
+    """
+    content_type = 'text/csv'
+    extension = 'csv'
+
+    def __init__(self, name, header, row, queryset, filename, models):
+        self.name = name
+        self.header = header
+        self.row = row
+        self.queryset = queryset
+        self.filename = filename
+        self.models = models
+
+    def write(self, path):
+        with open(path, 'w', newline='', encoding='utf-8') as output:
+            writer = csv.writer(output)
+            writer.writerow(self.header)
+            writer.writerows(self.row(obj) for obj in self.queryset().iterator())
+
+    def open(self):
+        """The CSV from the artifact cache, opened for reading."""
+        return artifacts.open_artifact(f'{self.name}.csv', self.models, self.write)
+
+
+def register(report):
+    REPORTS[report.name] = report
+    return report
+
+
+def register_csv(export):
+    CSV_EXPORTS[export.name] = export
+    return export
+
+
+def find(name, extension):
+    """The registered report ('pdf') or CSV export ('csv') called ``name``, or None."""
+    autodiscover_modules('reports')
+    return {'pdf': REPORTS, 'csv': CSV_EXPORTS}[extension].get(name)
+
+
+def render_pdf(report, output, **options):
+    """Write ``report`` as a PDF to ``output`` (see core/pdf.py for the options)."""
+    from . import pdf
+
+    pdf.render_pdf(report, output, **options)
+
+
+def download(export):
+    """``export`` as a download, rendered only if its data changed since the last one."""
+    return FileResponse(
+        export.open(), as_attachment=True, filename=f'{export.filename}.{export.extension}',
+        content_type=export.content_type,
+    )
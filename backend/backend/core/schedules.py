@@ -0,0 +1,151 @@
+"""
+Scheduled report generation.
+
+manage.py run_report_schedules (from cron, or as a long-running process with
+--loop) runs the ReportSchedules that are due, but only inside the off-peak
+window REPORT_SCHEDULE_WINDOW_START-REPORT_SCHEDULE_WINDOW_END (local hours):
+a schedule missed because the scheduler was down waits for the next window
+rather than rendering during business hours. Each run renders the export
+into the artifact cache (core/artifacts.py), where the on-demand exports find
+it while the data is unchanged, and emails every recipient a signed link to
+the file, valid for REPORT_LINK_MAX_AGE seconds. The emailed file is pinned
+so that cache eviction cannot remove it while the link is valid.
+
+Schedules are claimed by moving next_run_at forward with a conditional
+update, so several schedulers never run the same schedule twice.
+"""
+import calendar
+import logging
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core import signing
+from django.urls import reverse
+from django.utils import timezone
+
+from . import artifacts, reports
+from .email_service import EmailService
+from .models import ReportSchedule
+
+logger = logging.getLogger(__name__)
+
+LINK_SALT = 'core.schedules.download'
+Cadences = ReportSchedule.Cadences
+CADENCE_DAYS = {Cadences.DAILY: 1, Cadences.WEEKLY: 7}
+
+
+def link_max_age():
+    return getattr(settings, 'REPORT_LINK_MAX_AGE', 7 * 24 * 3600)
+
+
+def window():
+    return (
+        getattr(settings, 'REPORT_SCHEDULE_WINDOW_START', 1),
+        getattr(settings, 'REPORT_SCHEDULE_WINDOW_END', 5),
+    )
+
+
+def in_window(moment):
+    start, end = window()
+    hour = timezone.localtime(moment).hour
+    # A window such as 22-4 wraps around midnight.
+    return start <= hour < end if start < end else hour >= start or hour < end
+
+
+def window_start(moment):
+    """``moment`` if it is in the off-peak window, otherwise the window's next start."""
+    if in_window(moment):
+        return moment
+    local = timezone.localtime(moment)
+    start = local.replace(hour=window()[0], minute=0, second=0, microsecond=0)
+    return start if start > local else start + timedelta(days=1)
+
+
+def add_cadence(moment, cadence):
+    """One period of ``cadence`` after ``moment``, at the same local time of day."""
+    local = timezone.localtime(moment)
+    if cadence == Cadences.MONTHLY:
+        year, month = local.year + local.month // 12, local.month % 12 + 1
+        return local.replace(year=year, month=month, day=min(local.day, calendar.monthrange(year, month)[1]))
+    return local + timedelta(days=CADENCE_DAYS[cadence])
+
+
+def following_run(schedule, now):
+    """When ``schedule`` runs next after its current run, skipping periods already past."""
+    moment = add_cadence(schedule.next_run_at, schedule.cadence)
+    while moment <= now:
+        moment = add_cadence(moment, schedule.cadence)
+    return window_start(moment)
+
+
+def download_link(file_name, download_name):
+    token = signing.dumps({'file': file_name, 'name': download_name}, salt=LINK_SALT, compress=True)
+    return f"{settings.BACKEND_URL.rstrip('/')}{reverse('report-download', args=[token])}"
+
+
+def read_link(token):
+    """
+    The (file name, download name) a link token was made for. Raises
+    signing.SignatureExpired for old links and signing.BadSignature for
+    forged ones.
+    """
+    data = signing.loads(token, salt=LINK_SALT, max_age=link_max_age())
+    return data['file'], data['name']
+
+
+def run(schedule, now=None):
+    """Render ``schedule``'s export and email the link to its recipients."""
+    now = now or timezone.now()
+    export = reports.find(schedule.report, schedule.format)
+    status, error = ReportSchedule.Statuses.SENT, ''
+    try:
+        # The scheduler is single-threaded, so long PDFs can be rendered by a forked pool.
+        options = {'workers': getattr(settings, 'REPORT_PDF_SCHEDULED_WORKERS', 1)} if export.extension == 'pdf' else {}
+        with export.open(**options) as artifact:
+            file_name = artifacts.pin(artifact.name)
+        download_name = f'{export.filename}_{timezone.localdate(now):%Y-%m-%d}.{export.extension}'
+        link = download_link(file_name, download_name)
+        days = link_max_age() // (24 * 3600)
+        message = (
+            f'Your scheduled report "{schedule.name}" ({schedule.get_format_display()}) is ready. '
+            f'The download link is valid for {days} days.'
+        )
+        failed = [
+            email for email in schedule.recipient_list()
+            if not EmailService.send_notification_email(email, 'INFO', message, action_url=link)
+        ]
+        if failed:
+            status, error = ReportSchedule.Statuses.FAILED, f"Could not email {', '.join(failed)}"
+    except Exception as exc:
+        logger.exception('Scheduled report %s failed', schedule.pk)
+        status, error = ReportSchedule.Statuses.FAILED, str(exc)
+    schedule.last_run_at, schedule.last_status, schedule.last_error = now, status, error
+    schedule.save(update_fields=['last_run_at', 'last_status', 'last_error', 'updated_at'])
+    return schedule
+
+
+def run_due(now=None, force=False):
+    """
+    Run the active schedules that are due, if ``now`` is in the off-peak
+    window or ``force`` is set. Returns the schedules run.
+    """
+    now = now or timezone.now()
+    if not (force or in_window(now)):
+        return []
+    artifacts.unpin_older_than(link_max_age())
+    ran = []
+    for schedule in ReportSchedule.objects.filter(is_active=True, next_run_at__lte=now):
+        following = following_run(schedule, now)
+        claimed = ReportSchedule.objects.filter(pk=schedule.pk, next_run_at=schedule.next_run_at).update(
+            next_run_at=following, updated_at=now,
+        )
+        if claimed:
+            schedule.next_run_at = following
+            ran.append(run(schedule, now))
+    return ran
+
+
+def cache_path(file_name):
+    """Where the pinned artifact ``file_name`` from a download link is, if it is still kept."""
+    return artifacts.pinned_dir() / Path(file_name).name
@@ -1,5 +1,7 @@
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
 from rest_framework import serializers
-from .models import AuditLog
+from .models import AuditLog, ReportSchedule
 
 class AuditLogSerializer(serializers.ModelSerializer):
     """
@@ -7,4 +9,35 @@ class AuditLogSerializer(serializers.ModelSerializer):
     """
     class Meta:
         model = AuditLog
-        fields = ['id', 'user', 'action', 'object_type', 'object_id', 'message', 'created_at'] 
\ No newline at end of file
+        fields = ['id', 'user', 'action', 'object_type', 'object_id', 'message', 'created_at'] 
+
+class ReportScheduleSerializer(serializers.ModelSerializer):
+    """
+    A scheduled report. New schedules first run in the next off-peak window
+    (see core/schedules.py).
+    """
+    MAX_RECIPIENTS = 50
+
+    class Meta:
+        model = ReportSchedule
+        fields = [
+            'id', 'name', 'report', 'format', 'cadence', 'recipients', 'is_active',
+            'next_run_at', 'last_run_at', 'last_status', 'last_error', 'created_at',
+        ]
+        read_only_fields = ['next_run_at', 'last_run_at', 'last_status', 'last_error', 'created_at']
+
+    def validate_recipients(self, value):
+        emails = ReportSchedule(recipients=value).recipient_list()
+        if not emails:
+            raise serializers.ValidationError('Add at least one email address.')
+        if len(emails) > self.MAX_RECIPIENTS:
+            raise serializers.ValidationError(f'At most {self.MAX_RECIPIENTS} recipients are allowed.')
+        invalid = []
+        for email in emails:
+            try:
+                validate_email(email)
+            except ValidationError:
+                invalid.append(email)
+        if invalid:
+            raise serializers.ValidationError(f"Invalid email addresses: {', '.join(invalid)}.")
+        return ', '.join(emails)
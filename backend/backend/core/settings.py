@@ -60,6 +60,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.AuditLogMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -143,13 +144,52 @@ CORS_ALLOW_ALL_ORIGINS = True
 # Django REST Framework & JWT
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    # Token buckets for /api/token/ and registration (users/throttling.py)
+    'DEFAULT_THROTTLE_RATES': {
+        'login_ip': os.environ.get('LOGIN_THROTTLE_IP_RATE', '30/min'),
+        'login_username': os.environ.get('LOGIN_THROTTLE_USERNAME_RATE', '5/min'),
+    },
+    # Reverse proxies in front of the app (1 on Render). Client IPs are read
+    # from X-Forwarded-For only this many hops deep; with 0 it is ignored, as
+    # any client can set it.
+    'NUM_PROXIES': int(os.environ.get('NUM_PROXIES', '0')),
+}
+
+# The login throttle buckets and user auth versions must be shared by every
+# worker process, or each gunicorn worker grants the full login rate on its
+# own and keeps accepting tokens of changed accounts. The 'shared' cache uses
+# Redis if REDIS_URL is set (needs the redis package), otherwise a database
+# table created by manage.py createcachetable.
+CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'shared': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'shared_cache'},
+}
+if os.environ.get('REDIS_URL'):
+    CACHES['shared'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': os.environ['REDIS_URL'],
+    }
+
+SIMPLE_JWT = {
+    'TOKEN_OBTAIN_SERIALIZER': 'users.serializers.TokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'users.serializers.TokenRefreshSerializer',
 }
 
+# How long a user's auth_version stays in the shared cache. Account changes
+# delete it right away, so this only bounds how long idle entries are kept.
+AUTH_VERSION_CACHE_TIMEOUT = int(os.environ.get('AUTH_VERSION_CACHE_TIMEOUT', '300'))
+
+# How often each process pulls newly revoked tokens into its in-memory set.
+TOKEN_REVOCATION_SYNC_INTERVAL = int(os.environ.get('TOKEN_REVOCATION_SYNC_INTERVAL', '5'))
+
+# Audit logging: write each request's audit batch from a background thread
+# instead of before the response is returned.
+AUDIT_LOG_ASYNC = os.environ.get('AUDIT_LOG_ASYNC', 'False') == 'True'
+
 # Email backend (console for dev - change to smtp for production)
 # EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'  # For development
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'  # For production
@@ -183,6 +223,45 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'mediafiles'
 
+# Audit log archival (manage.py archive_audit_logs)
+AUDIT_LOG_ARCHIVE_DIR = MEDIA_ROOT / 'audit_archive'
+AUDIT_LOG_RETENTION_MONTHS = int(os.environ.get('AUDIT_LOG_RETENTION_MONTHS', '6'))
+
+# PDF reports longer than REPORT_PDF_CHUNK_PAGES pages are rendered in parts
+# by up to REPORT_PDF_WORKERS processes when exported from a request, and by
+# up to REPORT_PDF_SCHEDULED_WORKERS in the report scheduler. Forking from a
+# threaded web worker is not safe, so requests render in one process.
+REPORT_PDF_WORKERS = int(os.environ.get('REPORT_PDF_WORKERS', '1'))
+REPORT_PDF_SCHEDULED_WORKERS = int(
+    os.environ.get('REPORT_PDF_SCHEDULED_WORKERS', str(min(os.cpu_count() or 1, 4)))
+)
+REPORT_PDF_CHUNK_PAGES = int(os.environ.get('REPORT_PDF_CHUNK_PAGES', '100'))
+
+# Rendered PDF and CSV exports, reused until the data they list changes
+REPORT_CACHE_DIR = MEDIA_ROOT / 'report_cache'
+REPORT_CACHE_MAX_BYTES = int(os.environ.get('REPORT_CACHE_MAX_BYTES', str(500 * 1024 * 1024)))
+
+# Scheduled reports (manage.py run_report_schedules) run only in the off-peak
+# window, in local hours; emailed download links point at BACKEND_URL.
+REPORT_SCHEDULE_WINDOW_START = int(os.environ.get('REPORT_SCHEDULE_WINDOW_START', '1'))
+REPORT_SCHEDULE_WINDOW_END = int(os.environ.get('REPORT_SCHEDULE_WINDOW_END', '5'))
+REPORT_LINK_MAX_AGE = int(os.environ.get('REPORT_LINK_MAX_AGE', str(7 * 24 * 3600)))
+BACKEND_URL = os.environ.get('BACKEND_URL', 'http://localhost:8000')
+
+# Supplier CSV imports: uploads and error files; larger uploads run in the background
+SUPPLIER_IMPORT_DIR = MEDIA_ROOT / 'supplier_imports'
+SUPPLIER_IMPORT_INLINE_MAX_BYTES = int(os.environ.get('SUPPLIER_IMPORT_INLINE_MAX_BYTES', str(1024 * 1024)))
+
+# Audit log hash chain (manage.py verify_audit_log). Checkpoints are signed
+# with SECRET_KEY unless a dedicated key is provided.
+AUDIT_LOG_SIGNING_KEY = os.environ.get('AUDIT_LOG_SIGNING_KEY', '')
+AUDIT_LOG_SEAL_DELAY = int(os.environ.get('AUDIT_LOG_SEAL_DELAY', '60'))
+
+# Deployment bootstrap (manage.py bootstrap): the seed fixture, loaded again
+# only when its content changes, and the password of the admin it creates.
+BOOTSTRAP_FIXTURE = Path(os.environ.get('BOOTSTRAP_FIXTURE', BASE_DIR / 'local_data.json'))
+BOOTSTRAP_ADMIN_PASSWORD = os.environ.get('BOOTSTRAP_ADMIN_PASSWORD', 'admin123')
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
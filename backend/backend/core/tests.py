@@ -0,0 +1,682 @@
+import io
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+from pathlib import Path
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.core.serializers.base import DeserializationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase, APITransactionTestCase
+
+from pypdf import PdfReader
+
+from inventory.models import InventoryItem
+from orders.models import PurchaseOrder
+from suppliers.models import Supplier
+from . import artifacts, bootstrap, fixtures, integrity, pdf, reports, schedules
+from .models import AuditCheckpoint, AuditLog, AuditLogArchive, FixtureLoad, ReportSchedule
+
+User = get_user_model()
+
+
+class AutomaticAuditLogTests(APITransactionTestCase):
+    """
+    Runs outside a wrapping transaction so on_commit hooks fire as they do in
+    production, inside the request that raised them.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='auditor', email='auditor@example.com', password='Testpass123',
+            role=User.Roles.MANAGER,
+        )
+        self.client.force_authenticate(self.user)
+        AuditLog.objects.all().delete()
+
+    def audit_inserts(self, queries):
+        return [q for q in queries if q['sql'].startswith('INSERT INTO "core_auditlog"')]
+
+    def test_create_is_audited_with_request_user(self):
+        response = self.client.post(
+            reverse('inventory-list-create'),
+            {'name': 'Audit Drill', 'sku': 'AUD-1', 'quantity': 5, 'reorder_level': 1},
+        )
+        self.assertEqual(response.status_code, 201)
+        entry = AuditLog.objects.get()
+        self.assertEqual(entry.action, 'CREATE')
+        self.assertEqual(entry.object_type, 'Inventory Item')
+        self.assertEqual(entry.object_id, str(response.data['id']))
+        self.assertEqual(entry.user, self.user)
+
+    def test_workflow_action_replaces_generic_update(self):
+        order = PurchaseOrder.objects.create(legacy_supplier='Acme', legacy_item='Drill', quantity=2)
+        AuditLog.objects.all().delete()
+        self.client.post(reverse('order-approve-reject', args=[order.pk]), {'action': 'approve'})
+        self.assertEqual(list(AuditLog.objects.values_list('action', flat=True)), ['APPROVE'])
+
+    def test_request_mutations_are_written_in_one_insert(self):
+        items = [
+            InventoryItem.objects.create(name=f'Bulk {i}', sku=f'BLK-{i}', quantity=10)
+            for i in range(3)
+        ]
+        AuditLog.objects.all().delete()
+        with CaptureQueriesContext(connection) as ctx:
+            for item in items:
+                self.client.post(reverse('inventory-stock-in', args=[item.pk]), {'amount': 1})
+        self.assertEqual(len(self.audit_inserts(ctx.captured_queries)), 3)
+        self.assertEqual(AuditLog.objects.filter(action='STOCK_IN').count(), 3)
+
+        csv_file = 'name,sku,quantity,reorder_level\n' + '\n'.join(
+            f'Import {i},IMP-{i},1,0' for i in range(5)
+        )
+        upload = SimpleUploadedFile('items.csv', csv_file.encode('utf-8'), content_type='text/csv')
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.post(reverse('inventory-import-csv'), {'file': upload}, format='multipart')
+        self.assertEqual(len(self.audit_inserts(ctx.captured_queries)), 1)
+        self.assertEqual(AuditLog.objects.filter(action='CREATE').count(), 5)
+
+    def test_rolled_back_changes_are_not_audited(self):
+        try:
+            with transaction.atomic():
+                InventoryItem.objects.create(name='Ghost', sku='GHOST-1')
+                raise RuntimeError
+        except RuntimeError:
+            pass
+        self.assertFalse(AuditLog.objects.exists())
+
+
+class AuditLogArchiveTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='archivist', email='archivist@example.com', password='Testpass123'
+        )
+        self.client.force_authenticate(self.user)
+        AuditLog.objects.all().delete()
+        self.archive_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.archive_dir)
+
+    def create_log(self, created_at, action='CREATE'):
+        entry = AuditLog.objects.create(user=self.user, action=action, object_type='Supplier', object_id='1')
+        AuditLog.objects.filter(pk=entry.pk).update(created_at=created_at)
+        return entry
+
+    def test_date_range_filter_is_inclusive(self):
+        self.create_log(datetime(2026, 3, 9, 23, 59, tzinfo=dt_timezone.utc))
+        inside = self.create_log(datetime(2026, 3, 10, 0, 0, tzinfo=dt_timezone.utc))
+        last = self.create_log(datetime(2026, 3, 11, 23, 59, tzinfo=dt_timezone.utc))
+        self.create_log(datetime(2026, 3, 12, 0, 0, tzinfo=dt_timezone.utc))
+        response = self.client.get(reverse('auditlog-list'), {'start_date': '2026-03-10', 'end_date': '2026-03-11'})
+        self.assertEqual({row['id'] for row in response.data}, {inside.pk, last.pk})
+
+    def test_closed_months_are_archived_and_still_queryable(self):
+        now = timezone.now()
+        old = [self.create_log(now - timedelta(days=400), action='UPDATE') for _ in range(3)]
+        recent = self.create_log(now)
+        with self.settings(AUDIT_LOG_ARCHIVE_DIR=Path(self.archive_dir)):
+            call_command('archive_audit_logs', retention_months=6, stdout=StringIO())
+            self.assertEqual(list(AuditLog.objects.values_list('id', flat=True)), [recent.pk])
+            archive = AuditLogArchive.objects.get()
+            self.assertEqual(archive.row_count, 3)
+            self.assertTrue((Path(self.archive_dir) / archive.path).exists())
+
+            response = self.client.get(reverse('auditlog-archived'), {'action': 'update'})
+            self.assertEqual([row['id'] for row in response.data], [entry.pk for entry in old])
+            self.assertEqual(response.data[0]['user'], self.user.pk)
+            response = self.client.get(reverse('auditlog-archived'), {'start_date': now.date().isoformat()})
+            self.assertEqual(response.data, [])
+
+
+class AuditLogFilterTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='filterer', email='filterer@example.com', password='Testpass123',
+            role=User.Roles.MANAGER,
+        )
+        self.other = User.objects.create_user(
+            username='filterer2', email='filterer2@example.com', password='Testpass123'
+        )
+        self.client.force_authenticate(self.user)
+        AuditLog.objects.all().delete()
+        self.approve = AuditLog.objects.create(user=self.user, action='APPROVE', object_type='Purchase Order', object_id='7')
+        self.stock_in = AuditLog.objects.create(user=self.other, action='STOCK_IN', object_type='Inventory Item', object_id='7')
+        self.update = AuditLog.objects.create(user=self.user, action='UPDATE', object_type='Inventory Item', object_id='3')
+
+    def ids(self, params):
+        response = self.client.get(reverse('auditlog-list'), params)
+        return {row['id'] for row in response.data}
+
+    def test_codes_are_normalized_on_write(self):
+        self.assertEqual((self.stock_in.action_code, self.stock_in.object_type_code), ('STOCK_IN', 'INVENTORY_ITEM'))
+
+    def test_filters_match_exact_codes_and_users(self):
+        self.assertEqual(self.ids({'action': 'stock in'}), {self.stock_in.pk})
+        self.assertEqual(self.ids({'action': 'STOCK'}), set())
+        self.assertEqual(self.ids({'object_type': 'inventory item'}), {self.stock_in.pk, self.update.pk})
+        self.assertEqual(self.ids({'user': 'FILTERER'}), {self.approve.pk, self.update.pk})
+        self.assertEqual(self.ids({'user': self.other.pk}), {self.stock_in.pk})
+        self.assertEqual(self.ids({'object_type': 'Inventory Item', 'object_id': '7'}), {self.stock_in.pk})
+
+    def test_facets_use_one_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('auditlog-facets'), {'object_type': 'Inventory Item'})
+        self.assertEqual(response.data['total'], 2)
+        self.assertEqual(
+            {facet['code']: facet['count'] for facet in response.data['actions']},
+            {'STOCK_IN': 1, 'UPDATE': 1},
+        )
+        self.assertEqual(response.data['object_types'], [{'code': 'INVENTORY_ITEM', 'count': 2}])
+        self.assertEqual({user['username'] for user in response.data['users']}, {'filterer', 'filterer2'})
+
+    def test_user_autocomplete(self):
+        response = self.client.get(reverse('auditlog-user-autocomplete'), {'q': 'FILTER'})
+        self.assertEqual([user['username'] for user in response.data], ['filterer', 'filterer2'])
+
+    def test_picked_user_and_object_type_filter_the_list(self):
+        # The audit log page sends a user id from the autocomplete and an object type code from the facets.
+        picked = self.client.get(reverse('auditlog-user-autocomplete'), {'q': 'filterer2'}).data[0]
+        object_types = self.client.get(reverse('auditlog-facets')).data['object_types']
+        code = next(facet['code'] for facet in object_types if facet['code'] == 'INVENTORY_ITEM')
+        self.assertEqual(self.ids({'user': picked['id'], 'object_type': code}), {self.stock_in.pk})
+
+
+class AuditLogIntegrityTests(TestCase):
+    def setUp(self):
+        AuditLog.objects.all().delete()
+        self.entries = [
+            AuditLog.objects.create(action='CREATE', object_type='Supplier', object_id=str(i), message=f'Entry {i}')
+            for i in range(7)
+        ]
+
+    def verify(self, *args):
+        out = StringIO()
+        call_command('verify_audit_log', *args, stdout=out, stderr=StringIO())
+        return out.getvalue()
+
+    def test_seal_builds_chain_and_checkpoints(self):
+        sealed = integrity.seal(interval=3, delay=timedelta(0))
+        self.assertEqual(sealed, 7)
+        self.assertEqual(list(AuditCheckpoint.objects.values_list('last_seq', flat=True)), [3, 6, 7])
+        output = self.verify('--no-seal')
+        self.assertIn('Verified 7 audit log entries across 3', output)
+        self.assertFalse(AuditCheckpoint.objects.filter(verified_at__isnull=True).exists())
+
+    def test_incremental_verify_only_reads_new_segments(self):
+        integrity.seal(delay=timedelta(0))
+        self.verify('--no-seal')
+        AuditLog.objects.create(action='DELETE', object_type='Supplier', object_id='9')
+        integrity.seal(delay=timedelta(0))
+        self.assertIn('Verified 1 audit log entries across 1', self.verify('--no-seal'))
+        self.assertIn('Verified 8 audit log entries across 2', self.verify('--no-seal', '--full'))
+
+    def test_edited_entry_is_detected(self):
+        integrity.seal(interval=3, delay=timedelta(0))
+        AuditLog.objects.filter(pk=self.entries[4].pk).update(message='Rewritten')
+        with self.assertRaises(CommandError):
+            self.verify('--no-seal', '--full')
+
+    def test_recomputed_digest_breaks_chain(self):
+        integrity.seal(interval=3, delay=timedelta(0))
+        entry = AuditLog.objects.get(pk=self.entries[1].pk)
+        entry.message = 'Rewritten'
+        AuditLog.objects.filter(pk=entry.pk).update(message=entry.message, digest=entry.compute_digest())
+        checked, errors = integrity.verify_segments(
+            integrity.checkpoint_segments(AuditCheckpoint.objects.order_by('last_seq'))
+        )
+        self.assertIn(f'Audit log {entry.pk} (#2) breaks the hash chain', errors)
+
+    def test_deleted_entry_and_forged_checkpoint_are_detected(self):
+        integrity.seal(interval=3, delay=timedelta(0))
+        AuditLog.objects.filter(pk=self.entries[5].pk).delete()
+        AuditCheckpoint.objects.filter(last_seq=3).update(chain_digest='0' * 64)
+        checkpoints = list(AuditCheckpoint.objects.order_by('last_seq'))
+        self.assertEqual(integrity.verify_checkpoint_signatures(checkpoints),
+                         ['Checkpoint at #3 has an invalid signature'])
+        _, errors = integrity.verify_segments(integrity.checkpoint_segments(checkpoints))
+        self.assertIn('Entries #6-#6 are missing', errors)
+
+    def test_deleting_a_user_keeps_their_entries_verifiable(self):
+        user = User.objects.create_user(username='leaver', password='Testpass123')
+        entry = AuditLog.objects.create(user=user, action='UPDATE', object_type='Supplier', object_id='1')
+        AuditLog.objects.bulk_create([AuditLog(user=user, action='DELETE', object_type='Supplier', object_id='2')])
+        integrity.seal(interval=3, delay=timedelta(0))
+        user.delete()
+        self.assertEqual(AuditLog.objects.filter(username='leaver', user__isnull=True).count(), 2)
+        self.assertIn('Verified 9 audit log entries across 3', self.verify('--no-seal', '--full'))
+        AuditLog.objects.filter(pk=entry.pk).update(username='someone')
+        with self.assertRaises(CommandError):
+            self.verify('--no-seal', '--full')
+
+    def test_entries_are_append_only(self):
+        with self.assertRaises(ValueError):
+            self.entries[0].save()
+
+    def test_recent_entries_wait_for_seal_delay(self):
+        self.assertEqual(integrity.seal(), 0)
+        self.assertTrue(AuditLog.objects.filter(chain_seq__isnull=True).exists())
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Parallel verification needs a server database')
+class ParallelAuditLogVerificationTests(TransactionTestCase):
+    def test_full_verify_across_processes(self):
+        AuditLog.objects.all().delete()
+        AuditLog.objects.bulk_create(
+            AuditLog(action='UPDATE', object_type='Inventory Item', object_id=str(i)) for i in range(50)
+        )
+        integrity.seal(interval=10, delay=timedelta(0))
+        out = StringIO()
+        call_command('verify_audit_log', '--full', '--workers', '3', '--no-seal', stdout=out)
+        self.assertIn('Verified 50 audit log entries across 5', out.getvalue())
+
+
+class PDFReportTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='reportreader', email='reportreader@example.com', password='Testpass123'
+        )
+        self.client.force_authenticate(self.user)
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        self.enterContext(self.settings(REPORT_CACHE_DIR=Path(cache_dir)))
+
+    def download(self, url_name):
+        response = self.client.get(reverse(url_name))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        return PdfReader(io.BytesIO(b''.join(response.streaming_content)))
+
+    def test_exports_list_every_row_with_the_header_on_each_page(self):
+        InventoryItem.objects.bulk_create([
+            InventoryItem(name=f'Report Widget {i:03d}', sku=f'RPT-{i:03d}', quantity=i) for i in range(120)
+        ])
+        pdf = self.download('inventory-export-pdf')
+        self.assertGreater(len(pdf.pages), 1)
+        text = [page.extract_text() for page in pdf.pages]
+        self.assertIn('Inventory Report', text[0])
+        self.assertNotIn('Inventory Report', text[1])
+        for number, page in enumerate(text, start=1):
+            self.assertIn('Reorder Level', page)
+            self.assertIn(f'Page {number} of {len(text)}', page)
+        self.assertEqual(sum(page.count('Report Widget') for page in text), 120)
+
+        Supplier.objects.create(name='Report & <Supplier>', address='A very long address ' * 10)
+        text = ''.join(page.extract_text() for page in self.download('supplier-export-pdf').pages)
+        self.assertIn('Report & <Supplier>', text)
+        self.assertIn('Orders Report', self.download('order-export-pdf').pages[0].extract_text())
+
+    def test_parallel_render_matches_single_process(self):
+        InventoryItem.objects.bulk_create([
+            InventoryItem(name=f'Parallel Widget {i:03d}', sku=f'PAR-{i:03d}', quantity=i) for i in range(150)
+        ])
+        report = reports.REPORTS['inventory']
+        single, parallel = io.BytesIO(), io.BytesIO()
+        reports.render_pdf(report, single, workers=1)
+        reports.render_pdf(report, parallel, workers=2, chunk_pages=1)
+        single, parallel = PdfReader(single), PdfReader(parallel)
+        self.assertGreater(len(parallel.pages), 3)
+        self.assertEqual(
+            [page.extract_text().strip() for page in parallel.pages],
+            [page.extract_text().strip() for page in single.pages],
+        )
+        self.assertIn(f'Page 4 of {len(parallel.pages)}', parallel.pages[3].extract_text())
+        self.assertEqual(parallel.metadata.title, 'Inventory Report')
+        # Wrapped rows have no fixed height, so the supplier report stays in one process.
+        self.assertIsNone(pdf.ReportDocument(None, reports.REPORTS['suppliers']).rows_per_page())
+
+    def test_pdf_libraries_load_with_the_first_pdf_only(self):
+        loaded = subprocess.run(
+            [sys.executable, '-c', (
+                'import sys; from core.wsgi import application; from django.urls import get_resolver; '
+                'get_resolver().url_patterns; print(sorted({"reportlab", "pypdf"} & set(sys.modules)))'
+            )],
+            capture_output=True, text=True, check=True, cwd=settings.BASE_DIR,
+        ).stdout
+        self.assertEqual(loaded.strip(), '[]')
+
+    def test_empty_report_and_clipping(self):
+        output = io.BytesIO()
+        reports.render_pdf(reports.REPORTS['inventory'], output, rows=[])
+        self.assertEqual(len(PdfReader(output).pages), 1)
+        self.assertEqual(pdf.clip('short', 100), 'short')
+        clipped = pdf.clip('a much longer cell value than fits', 40)
+        self.assertTrue(clipped.endswith('…'))
+        self.assertLessEqual(pdf.stringWidth(clipped, pdf.FONT, pdf.FONT_SIZE), 40)
+
+
+class ReportArtifactCacheTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='cachereader', email='cachereader@example.com', password='Testpass123'
+        )
+        self.client.force_authenticate(self.user)
+        self.cache_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.cache_dir)
+        self.enterContext(self.settings(REPORT_CACHE_DIR=self.cache_dir))
+        self.item = InventoryItem.objects.create(name='Cached Widget', sku='CACHE-1', quantity=5)
+
+    def download(self, url_name):
+        response = self.client.get(reverse(url_name))
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content)
+
+    def test_repeat_exports_reuse_the_file_until_the_data_changes(self):
+        with mock.patch.object(reports, 'render_pdf', wraps=reports.render_pdf) as render:
+            first = self.download('inventory-export-pdf')
+            self.assertEqual(self.download('inventory-export-pdf'), first)
+            self.assertEqual(render.call_count, 1)
+
+            self.item.quantity = 6
+            self.item.save()
+            self.download('inventory-export-pdf')
+            self.assertEqual(render.call_count, 2)
+            InventoryItem.objects.filter(pk=self.item.pk).delete()
+            self.download('inventory-export-pdf')
+            self.assertEqual(render.call_count, 3)
+
+    def test_csv_exports_follow_related_data(self):
+        supplier = Supplier.objects.create(name='Cached Supplier Co')
+        PurchaseOrder.objects.create(supplier=supplier, item=self.item, quantity=3)
+        self.assertIn(b'Cached Supplier Co', self.download('order-export-csv'))
+        self.assertEqual(len(list(self.cache_dir.glob('*.csv'))), 1)
+        supplier.name = 'Renamed Supplier Co'
+        supplier.save()
+        content = self.download('order-export-csv')
+        self.assertIn(b'Renamed Supplier Co', content)
+        self.assertNotIn(b'Cached Supplier Co', content)
+        self.assertIn(b'Cached Widget', self.download('inventory-export-csv'))
+        self.assertEqual(len(list(self.cache_dir.glob('*.csv'))), 3)
+
+    def test_least_recently_used_files_are_evicted(self):
+        def render(path):
+            Path(path).write_bytes(b'x' * 100)
+
+        with self.settings(REPORT_CACHE_MAX_BYTES=250):
+            paths = []
+            for number in range(2):
+                artifacts.open_artifact(f'export-{number}.csv', (), render).close()
+                paths.append(max(self.cache_dir.iterdir(), key=lambda path: path.stat().st_mtime_ns))
+                os.utime(paths[-1], (number, number))
+            # A hit makes export-0 the most recently used.
+            artifacts.open_artifact('export-0.csv', (), render).close()
+            artifacts.open_artifact('export-2.csv', (), render).close()
+        self.assertTrue(paths[0].exists())
+        self.assertFalse(paths[1].exists())
+        self.assertEqual(len(list(self.cache_dir.iterdir())), 2)
+
+
+class ReportScheduleTests(APITestCase):
+    def setUp(self):
+        self.manager = User.objects.create_user(
+            username='schedulemanager', email='schedulemanager@example.com', password='Testpass123',
+            role=User.Roles.MANAGER,
+        )
+        self.client.force_authenticate(self.manager)
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        self.enterContext(self.settings(
+            REPORT_CACHE_DIR=Path(cache_dir), REPORT_SCHEDULE_WINDOW_START=1, REPORT_SCHEDULE_WINDOW_END=5,
+            BACKEND_URL='https://ipms.example.com',
+        ))
+        InventoryItem.objects.create(name='Scheduled Widget', sku='SCHED-1', quantity=4)
+
+    def at(self, day, hour):
+        return datetime(2026, 3, day, hour, tzinfo=dt_timezone.utc)
+
+    def create_schedule(self, **fields):
+        return ReportSchedule.objects.create(**{
+            'name': 'Nightly inventory', 'report': 'inventory', 'format': 'pdf',
+            'recipients': 'ops@example.com, buyer@example.com', 'next_run_at': self.at(10, 1), **fields,
+        })
+
+    def test_create_validates_recipients_and_waits_for_the_window(self):
+        url = reverse('report-schedule-list')
+        response = self.client.post(url, {
+            'name': 'Weekly orders', 'report': 'orders', 'format': 'csv', 'cadence': 'WEEKLY',
+            'recipients': 'ops@example.com\nnot-an-email',
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('not-an-email', str(response.data['recipients']))
+
+        response = self.client.post(url, {
+            'name': 'Weekly orders', 'report': 'orders', 'format': 'csv', 'cadence': 'WEEKLY',
+            'recipients': 'ops@example.com;  buyer@example.com',
+        })
+        self.assertEqual(response.status_code, 201)
+        schedule = ReportSchedule.objects.get(pk=response.data['id'])
+        self.assertEqual(schedule.recipients, 'ops@example.com, buyer@example.com')
+        self.assertEqual(schedule.created_by, self.manager)
+        self.assertTrue(schedules.in_window(schedule.next_run_at))
+
+        staff = User.objects.create_user(username='schedulestaff', password='Testpass123', role=User.Roles.STAFF)
+        self.client.force_authenticate(staff)
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+    def test_due_schedules_are_emailed_links_to_the_cached_report(self):
+        schedule = self.create_schedule()
+        self.assertEqual(schedules.run_due(now=self.at(10, 12)), [])
+
+        ran = schedules.run_due(now=self.at(10, 2))
+        self.assertEqual([s.pk for s in ran], [schedule.pk])
+        schedule.refresh_from_db()
+        self.assertEqual(schedule.last_status, ReportSchedule.Statuses.SENT)
+        self.assertEqual(schedule.next_run_at, self.at(11, 1))
+        self.assertEqual(schedules.run_due(now=self.at(10, 3)), [])
+
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), ['buyer@example.com', 'ops@example.com'])
+        link = re.search(r'href="([^"]+)"', mail.outbox[0].alternatives[0][0]).group(1)
+        self.assertTrue(link.startswith('https://ipms.example.com/api/reports/download/'))
+
+        self.client.force_authenticate(None)
+        response = self.client.get(link.removeprefix('https://ipms.example.com'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('inventory_report_2026-03-10.pdf', response['Content-Disposition'])
+        pdf = PdfReader(io.BytesIO(b''.join(response.streaming_content)))
+        self.assertIn('Scheduled Widget', pdf.pages[0].extract_text())
+
+        # The on-demand export of the unchanged data is the scheduled file.
+        self.client.force_authenticate(self.manager)
+        with mock.patch.object(reports, 'render_pdf') as render:
+            self.assertEqual(self.client.get(reverse('inventory-export-pdf')).status_code, 200)
+        render.assert_not_called()
+
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get(reverse('report-download', args=['forged'])).status_code, 404)
+        # A signed name outside the pinned files is not served from the cache.
+        cached = next(artifacts.cache_dir().glob('*.pdf')).name
+        unpinned = schedules.download_link(cached, 'report.pdf').removeprefix('https://ipms.example.com')
+        (artifacts.pinned_dir() / cached).unlink()
+        self.assertEqual(self.client.get(unpinned).status_code, 410)
+        with self.settings(REPORT_LINK_MAX_AGE=-1):
+            self.assertEqual(self.client.get(link.removeprefix('https://ipms.example.com')).status_code, 410)
+
+    def test_eviction_between_the_run_and_the_download_keeps_the_file(self):
+        self.create_schedule()
+        schedules.run_due(now=self.at(10, 2))
+        link = re.search(r'href="([^"]+)"', mail.outbox[0].alternatives[0][0]).group(1)
+        url = link.removeprefix('https://ipms.example.com')
+
+        # Other exports fill the cache and evict the scheduled report's cache entry.
+        with self.settings(REPORT_CACHE_MAX_BYTES=1):
+            artifacts.open_artifact('other.csv', (), lambda path: Path(path).write_bytes(b'x' * 100)).close()
+        self.assertEqual(list(artifacts.cache_dir().glob('*.pdf')), [])
+
+        self.client.force_authenticate(None)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        pdf = PdfReader(io.BytesIO(b''.join(response.streaming_content)))
+        self.assertIn('Scheduled Widget', pdf.pages[0].extract_text())
+
+        # Once the link has expired the pinned file goes at the next scheduler pass.
+        pinned = list(artifacts.pinned_dir().iterdir())
+        self.assertEqual(len(pinned), 1)
+        os.utime(pinned[0], (0, 0))
+        schedules.run_due(now=self.at(10, 3))
+        self.assertFalse(pinned[0].exists())
+
+    def test_only_the_scheduler_renders_with_several_processes(self):
+        self.create_schedule()
+        with self.settings(REPORT_PDF_SCHEDULED_WORKERS=3), mock.patch.object(reports, 'render_pdf') as render:
+            schedules.run_due(now=self.at(10, 2))
+            self.assertEqual(render.call_args.kwargs['workers'], 3)
+
+            InventoryItem.objects.create(name='Requested Widget', sku='SCHED-2')
+            self.assertEqual(self.client.get(reverse('inventory-export-pdf')).status_code, 200)
+            self.assertIsNone(render.call_args.kwargs['workers'])
+
+    def test_missed_runs_are_skipped_and_months_keep_their_day(self):
+        schedule = self.create_schedule(cadence='WEEKLY', next_run_at=self.at(1, 1))
+        schedules.run_due(now=self.at(20, 4))
+        schedule.refresh_from_db()
+        self.assertEqual(schedule.next_run_at, self.at(22, 1))
+
+        january = datetime(2026, 1, 31, 1, tzinfo=dt_timezone.utc)
+        self.assertEqual(schedules.add_cadence(january, 'MONTHLY'), datetime(2026, 2, 28, 1, tzinfo=dt_timezone.utc))
+        self.assertEqual(schedules.window_start(self.at(10, 9)), self.at(11, 1))
+
+    def test_failures_are_recorded(self):
+        schedule = self.create_schedule()
+        with mock.patch.object(reports.Report, 'open', side_effect=OSError('disk full')), \
+                self.assertLogs('core.schedules', 'ERROR'):
+            schedules.run_due(now=self.at(10, 2))
+        schedule.refresh_from_db()
+        self.assertEqual(schedule.last_status, ReportSchedule.Statuses.FAILED)
+        self.assertEqual(schedule.last_error, 'disk full')
+        self.assertEqual(schedule.next_run_at, self.at(11, 1))
+        self.assertEqual(mail.outbox, [])
+
+
+class BootstrapTests(TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.fixture = Path(directory) / 'local_data.json'
+        shutil.copy(Path(settings.BASE_DIR) / 'local_data.json', self.fixture)
+        self.enterContext(self.settings(BOOTSTRAP_FIXTURE=self.fixture))
+
+    def run_bootstrap(self, *args):
+        out = StringIO()
+        call_command('bootstrap', *args, stdout=out)
+        return out.getvalue()
+
+    def test_fixture_loads_once_with_its_timestamps(self):
+        output = self.run_bootstrap()
+        self.assertIn('Loaded 36 objects', output)
+        self.assertIn('Admin user created', output)
+        self.assertEqual(User.objects.count(), 4)
+        self.assertEqual(User.objects.get(pk=1).username, 'aman')
+        self.assertTrue(User.objects.get(username='admin').check_password('admin123'))
+        supplier = Supplier.objects.get(pk=1)
+        self.assertEqual(supplier.updated_at, datetime(2025, 7, 22, 8, 54, 58, 207000, tzinfo=dt_timezone.utc))
+        self.assertTrue(supplier.name_key)
+        self.assertEqual(AuditLog.objects.count(), 12)
+        self.assertEqual(FixtureLoad.objects.get(name='local_data.json').content_hash, bootstrap.file_hash(self.fixture))
+        # New rows continue after the fixture's primary keys.
+        self.assertGreater(InventoryItem.objects.create(name='After', sku='AFTER-1').pk, 4)
+
+        admin = User.objects.get(username='admin')
+        admin.set_password('Changed123')
+        admin.save()
+        with CaptureQueriesContext(connection) as queries:
+            output = self.run_bootstrap()
+        self.assertFalse([q for q in queries if q['sql'].startswith(('INSERT', 'UPDATE', 'DELETE'))])
+        self.assertLessEqual(len(queries), 5)
+        self.assertIn('unchanged', output)
+        self.assertTrue(User.objects.get(username='admin').check_password('Changed123'))
+
+    def test_changed_fixture_updates_rows_and_keeps_audit_entries(self):
+        self.run_bootstrap()
+        AuditLog.objects.filter(pk=1).update(message='Entry kept')
+        self.fixture.write_text(self.fixture.read_text().replace('Acme Supplies', 'Acme Industrial'))
+        self.assertIn('Loaded 36 objects', self.run_bootstrap())
+        self.assertEqual(Supplier.objects.get(pk=1).name, 'Acme Industrial')
+        self.assertEqual(Supplier.objects.count(), 3)
+        self.assertEqual(AuditLog.objects.get(pk=1).message, 'Entry kept')
+        self.assertEqual(FixtureLoad.objects.get().content_hash, bootstrap.file_hash(self.fixture))
+        self.assertIn('Loaded 36 objects', self.run_bootstrap('--force'))
+
+
+class FastLoadTests(TestCase):
+    def write_fixture(self, objects):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = Path(directory) / 'fixture.json'
+        path.write_text(json.dumps(objects, indent=1))
+        return path
+
+    def test_read_objects_streams_across_chunk_boundaries(self):
+        objects = [{'pk': 12345, 'name': 'Tab\tand "quotes" ]', 'tags': [1.5, None, True]}, {}, [], 7, 'x' * 50]
+        text = json.dumps(objects, indent=2)
+        for chunk_size in (1, 3, 64):
+            self.assertEqual(list(fixtures.read_objects(io.StringIO(text), chunk_size)), objects)
+        self.assertEqual(list(fixtures.read_objects(io.StringIO(' [ ] '))), [])
+        for broken in ('{"model": 1}', '[{"a": 1} {"b": 2}]', '[{"a": 1},'):
+            with self.assertRaises(DeserializationError):
+                list(fixtures.read_objects(io.StringIO(broken), 4))
+
+    def test_fast_load_writes_batches_in_any_order(self):
+        stamp = '2025-01-02T03:04:05.678Z'
+        objects = [
+            # Orders come before the supplier and items they refer to.
+            {'model': 'orders.purchaseorder', 'pk': 9000 + n, 'fields': {
+                'supplier': 900, 'item': 5000 + n, 'quantity': n + 1, 'status': 'RECEIVED',
+                'received_quantity': n + 1, 'lead_time': '2 03:00:00',
+                'created_at': stamp, 'updated_at': stamp,
+            }} for n in range(25)
+        ] + [
+            {'model': 'inventory.inventoryitem', 'pk': 5000 + n, 'fields': {
+                'name': f'Bulk\titem\n{n} \\', 'sku': f'BULK-{n}', 'quantity': n,
+                'created_at': stamp, 'updated_at': stamp,
+            }} for n in range(25)
+        ] + [
+            {'model': 'suppliers.supplier', 'pk': 900, 'fields': {
+                'name': 'Bulk Supplies Ltd.', 'created_at': stamp, 'updated_at': stamp,
+            }},
+        ]
+        out = StringIO()
+        call_command('fast_load', str(self.write_fixture(objects)), '--batch-size', '10', stdout=out)
+        self.assertIn('Loaded 51 objects', out.getvalue())
+        self.assertIn('inventory.InventoryItem: 25', out.getvalue())
+
+        item = InventoryItem.objects.get(pk=5003)
+        self.assertEqual(item.name, 'Bulk\titem\n3 \\')
+        self.assertEqual(item.updated_at, datetime(2025, 1, 2, 3, 4, 5, 678000, tzinfo=dt_timezone.utc))
+        self.assertEqual(Supplier.objects.get(pk=900).name_key, 'bulk supplies')
+        order = PurchaseOrder.objects.get(pk=9024)
+        self.assertEqual((order.item_id, order.lead_time), (5024, timedelta(days=2, hours=3)))
+        self.assertGreater(InventoryItem.objects.create(name='Next', sku='NEXT-1').pk, 5024)
+
+        # Loading again updates the existing rows instead of failing on their keys.
+        objects[0]['fields']['quantity'] = 99
+        call_command('fast_load', str(self.write_fixture(objects)), stdout=StringIO())
+        self.assertEqual(PurchaseOrder.objects.get(pk=9000).quantity, 99)
+        self.assertEqual(PurchaseOrder.objects.count(), 25)
+
+    def test_missing_foreign_keys_fail_the_whole_load(self):
+        stamp = '2025-01-02T03:04:05Z'
+        path = self.write_fixture([
+            {'model': 'inventory.inventoryitem', 'pk': 6000, 'fields': {
+                'name': 'Orphaned', 'sku': 'ORPH-1', 'created_at': stamp, 'updated_at': stamp,
+            }},
+            {'model': 'orders.purchaseorder', 'pk': 9500, 'fields': {
+                'item': 6000, 'supplier': 404, 'created_at': stamp, 'updated_at': stamp,
+            }},
+        ])
+        with self.assertRaisesRegex(IntegrityError, 'suppliers_supplier|supplier_id|foreign key'):
+            call_command('fast_load', str(path), stdout=StringIO())
+        self.assertFalse(InventoryItem.objects.filter(pk=6000).exists())
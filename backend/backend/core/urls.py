@@ -19,11 +19,12 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
-from rest_framework_simplejwt.views import (
-    TokenObtainPairView,
-    TokenRefreshView,
+from rest_framework_simplejwt.views import TokenRefreshView
+from .views import (
+    AuditLogListView, AuditLogArchiveListView, AuditLogFacetsView, AuditLogUserAutocompleteView,
+    AuditLogCreateView, ReportDownloadView, ReportScheduleDetailView, ReportScheduleListCreateView, home_view,
 )
-from .views import AuditLogListView, AuditLogCreateView, home_view
+from users.views import LoginView, TokenRevokeView
 
 urlpatterns = [
     path('', home_view, name='home'),
@@ -35,7 +36,14 @@ urlpatterns = [
     path('api/users/', include('users.urls')),
     path('api/payments/', include('payments.urls')),
     path('api/audit-logs/', AuditLogListView.as_view(), name='auditlog-list'),
+    path('api/audit-logs/archived/', AuditLogArchiveListView.as_view(), name='auditlog-archived'),
+    path('api/audit-logs/facets/', AuditLogFacetsView.as_view(), name='auditlog-facets'),
+    path('api/audit-logs/users/', AuditLogUserAutocompleteView.as_view(), name='auditlog-user-autocomplete'),
     path('api/audit-logs/create/', AuditLogCreateView.as_view(), name='auditlog-create'),
-    path('api/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
+    path('api/reports/schedules/', ReportScheduleListCreateView.as_view(), name='report-schedule-list'),
+    path('api/reports/schedules/<int:pk>/', ReportScheduleDetailView.as_view(), name='report-schedule-detail'),
+    path('api/reports/download/<str:token>/', ReportDownloadView.as_view(), name='report-download'),
+    path('api/token/', LoginView.as_view(), name='token_obtain_pair'),
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('api/token/revoke/', TokenRevokeView.as_view(), name='token_revoke'),
 ]
@@ -1,58 +1,243 @@
+from datetime import datetime, time, timedelta
 from rest_framework import generics, permissions
-from django.db.models import Q
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from django.contrib.auth import get_user_model
+from django.db.models import Count, Q
+from django.utils import timezone
 from django.utils.dateparse import parse_date
-from django.http import HttpResponse
-from .models import AuditLog
-from .serializers import AuditLogSerializer
+from django.core import signing
+from django.http import FileResponse, HttpResponse
+from rest_framework import status
+from . import schedules
+from .archive import iter_archived_rows
+from .models import AuditLog, ReportSchedule, normalize_code
+from .serializers import AuditLogSerializer, ReportScheduleSerializer
+from users.permissions import has_role_permission, role_permission, scope_queryset
+
+def date_range(params):
+    """
+    Translate start_date/end_date query params into a half-open
+    [start, end) datetime range, so filters compare the indexed created_at
+    column directly instead of wrapping it in a date() cast.
+    """
+    start = end = None
+    start_date = parse_date(params.get('start_date') or '')
+    if start_date:
+        start = timezone.make_aware(datetime.combine(start_date, time.min))
+    end_date = parse_date(params.get('end_date') or '')
+    if end_date:
+        end = timezone.make_aware(datetime.combine(end_date + timedelta(days=1), time.min))
+    return start, end
+
+class AuditLogFilter:
+    """
+    Audit log filters parsed from query params. All comparisons are exact
+    matches on indexed columns:
+    user (user id, or exact username), action and object_type (matched on
+    their normalized codes, so 'inventory item' finds 'Inventory Item'),
+    object_id, start_date and end_date.
+    """
+
+    def __init__(self, params):
+        self.user = (params.get('user') or '').strip()
+        self.action_code = normalize_code(params.get('action'))
+        self.object_type_code = normalize_code(params.get('object_type'))
+        self.object_id = params.get('object_id') or ''
+        self.start, self.end = date_range(params)
+
+    def apply(self, queryset):
+        if self.user:
+            if self.user.isdigit():
+                queryset = queryset.filter(user_id=int(self.user))
+            else:
+                user_ids = get_user_model().objects.filter(username__iexact=self.user).values('id')
+                queryset = queryset.filter(user_id__in=user_ids)
+        if self.action_code:
+            queryset = queryset.filter(action_code=self.action_code)
+        if self.object_type_code:
+            queryset = queryset.filter(object_type_code=self.object_type_code)
+        if self.object_id:
+            queryset = queryset.filter(object_id=self.object_id)
+        if self.start:
+            queryset = queryset.filter(created_at__gte=self.start)
+        if self.end:
+            queryset = queryset.filter(created_at__lt=self.end)
+        return queryset
+
+    def matches(self, row):
+        """Apply the same filters to an archived row (date range excluded)."""
+        if self.user:
+            if self.user.isdigit():
+                if row['user_id'] != int(self.user):
+                    return False
+            elif (row.get('username') or '').lower() != self.user.lower():
+                return False
+        if self.action_code and normalize_code(row['action']) != self.action_code:
+            return False
+        if self.object_type_code and normalize_code(row['object_type']) != self.object_type_code:
+            return False
+        if self.object_id and row['object_id'] != self.object_id:
+            return False
+        return True
+
+def visible_audit_logs(user):
+    """All audit logs for roles allowed audit.view_all, otherwise the user's own."""
+    return scope_queryset(AuditLog.objects.all(), user, 'audit.view_all', user=user)
 
 class AuditLogListView(generics.ListAPIView):
     """
     List all audit logs, most recent first.
-    Supports filtering by user, action, object_type, and date range.
+    Supports filtering by user, action, object_type, object_id and date range (see AuditLogFilter).
     """
     serializer_class = AuditLogSerializer
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [role_permission(GET='audit.view')]
 
     def get_queryset(self):
-        queryset = AuditLog.objects.all().order_by('-created_at')
-        
-        # Filter by user
-        user = self.request.query_params.get('user', None)
-        if user:
-            queryset = queryset.filter(user__username__icontains=user)
-        
-        # Filter by action
-        action = self.request.query_params.get('action', None)
-        if action:
-            queryset = queryset.filter(action__icontains=action)
-        
-        # Filter by object_type
-        object_type = self.request.query_params.get('object_type', None)
-        if object_type:
-            queryset = queryset.filter(object_type__icontains=object_type)
-        
-        # Filter by start date
-        start_date = self.request.query_params.get('start_date', None)
-        if start_date:
-            parsed_start_date = parse_date(start_date)
-            if parsed_start_date:
-                queryset = queryset.filter(created_at__date__gte=parsed_start_date)
-        
-        # Filter by end date
-        end_date = self.request.query_params.get('end_date', None)
-        if end_date:
-            parsed_end_date = parse_date(end_date)
-            if parsed_end_date:
-                queryset = queryset.filter(created_at__date__lte=parsed_end_date)
-        
-        return queryset
+        queryset = visible_audit_logs(self.request.user).order_by('-created_at')
+        return AuditLogFilter(self.request.query_params).apply(queryset)
+
+class AuditLogFacetsView(APIView):
+    """
+    Counts of matching audit logs per action, object type and user, computed
+    with a single grouped query. Accepts the same filters as AuditLogListView.
+    """
+    permission_classes = [role_permission(GET='audit.view')]
+
+    def get(self, request):
+        queryset = AuditLogFilter(request.query_params).apply(visible_audit_logs(request.user))
+        groups = (
+            queryset.order_by()
+            .values('action_code', 'object_type_code', 'user_id', 'user__username')
+            .annotate(count=Count('id'))
+        )
+        actions, object_types, users = {}, {}, {}
+        total = 0
+        for group in groups:
+            count = group['count']
+            total += count
+            actions[group['action_code']] = actions.get(group['action_code'], 0) + count
+            object_types[group['object_type_code']] = object_types.get(group['object_type_code'], 0) + count
+            user = users.setdefault(group['user_id'], {
+                'user': group['user_id'], 'username': group['user__username'], 'count': 0
+            })
+            user['count'] += count
+
+        def ranked(counts):
+            return [{'code': code, 'count': count}
+                    for code, count in sorted(counts.items(), key=lambda item: -item[1])]
+
+        return Response({
+            'total': total,
+            'actions': ranked(actions),
+            'object_types': ranked(object_types),
+            'users': sorted(users.values(), key=lambda user: -user['count']),
+        })
+
+class AuditLogUserAutocompleteView(APIView):
+    """
+    Suggest users for the audit log user filter by username prefix.
+    Returns ids to pass back as the user filter.
+    """
+    permission_classes = [role_permission(GET='audit.view_all')]
+    limit = 10
+
+    def get(self, request):
+        query = (request.query_params.get('q') or '').strip()
+        users = get_user_model().objects.order_by('username')
+        if query:
+            users = users.filter(username__istartswith=query)
+        return Response(list(users.values('id', 'username')[:self.limit]))
+
+class AuditLogArchiveListView(APIView):
+    """
+    List audit logs that have been moved to archive files, oldest first.
+    Supports the same filters as AuditLogListView plus offset and limit.
+    """
+    permission_classes = [role_permission(GET='audit.view')]
+    max_limit = 10000
+
+    def get(self, request):
+        params = request.query_params
+        filters = AuditLogFilter(params)
+        if not has_role_permission(request.user, 'audit.view_all'):
+            filters.user = str(request.user.pk)
+        try:
+            offset = max(int(params.get('offset', 0)), 0)
+            limit = min(max(int(params.get('limit', 1000)), 1), self.max_limit)
+        except ValueError:
+            return Response({'error': 'offset and limit must be integers.'}, status=400)
+
+        results = []
+        for row in iter_archived_rows(filters.start, filters.end):
+            if not filters.matches(row):
+                continue
+            if offset:
+                offset -= 1
+                continue
+            results.append({
+                'id': row['id'],
+                'user': row['user_id'],
+                'action': row['action'],
+                'object_type': row['object_type'],
+                'object_id': row['object_id'],
+                'message': row['message'],
+                'created_at': row['created_at'],
+                'archived': True,
+            })
+            if len(results) >= limit:
+                break
+        return Response(results)
 
 class AuditLogCreateView(generics.CreateAPIView):
     """
     Create a new audit log entry.
     """
     serializer_class = AuditLogSerializer
-    permission_classes = [permissions.IsAuthenticated] 
+    permission_classes = [role_permission(POST='audit.add')] 
+
+class ReportScheduleListCreateView(generics.ListCreateAPIView):
+    """
+    List and create scheduled reports. A new schedule first runs in the next
+    off-peak window.
+    """
+    queryset = ReportSchedule.objects.all()
+    serializer_class = ReportScheduleSerializer
+    permission_classes = [role_permission(GET='reports.schedule', POST='reports.schedule')]
+
+    def perform_create(self, serializer):
+        serializer.save(created_by=self.request.user, next_run_at=schedules.window_start(timezone.now()))
+
+class ReportScheduleDetailView(generics.RetrieveUpdateDestroyAPIView):
+    queryset = ReportSchedule.objects.all()
+    serializer_class = ReportScheduleSerializer
+    permission_classes = [role_permission(
+        GET='reports.schedule', PUT='reports.schedule', PATCH='reports.schedule', DELETE='reports.schedule',
+    )]
+
+class ReportDownloadView(APIView):
+    """
+    Download a scheduled report through the signed link emailed to its
+    recipients. The token is the credential, so no login is needed.
+    """
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request, token):
+        try:
+            file_name, download_name = schedules.read_link(token)
+        except signing.SignatureExpired:
+            return Response({'error': 'This download link has expired.'}, status=status.HTTP_410_GONE)
+        except signing.BadSignature:
+            return Response({'error': 'Invalid download link.'}, status=status.HTTP_404_NOT_FOUND)
+        try:
+            artifact = open(schedules.cache_path(file_name), 'rb')
+        except FileNotFoundError:
+            return Response(
+                {'error': 'This report is no longer available; export it from the reports page.'},
+                status=status.HTTP_410_GONE,
+            )
+        return FileResponse(artifact, as_attachment=True, filename=download_name)
 
 def home_view(request):
     """
@@ -104,11 +289,14 @@ def home_view(request):
             
             <h3>📊 Audit Logs</h3>
             <div class="api-endpoint">GET /api/audit-logs/</div>
+            <div class="api-endpoint">GET /api/audit-logs/archived/</div>
+            <div class="api-endpoint">GET /api/audit-logs/facets/</div>
             <div class="api-endpoint">POST /api/audit-logs/create/</div>
             
             <h3>🔑 Authentication</h3>
             <div class="api-endpoint">POST /api/token/ (Login)</div>
             <div class="api-endpoint">POST /api/token/refresh/ (Refresh Token)</div>
+            <div class="api-endpoint">POST /api/token/revoke/ (Logout)</div>
             
             <h2>📚 Documentation</h2>
             <p>This is a Django REST API backend for inventory and order management system.</p>
@@ -1,4 +1,5 @@
 from django.contrib import admin
-from .models import InventoryItem
+from .models import InventoryItem, StockMovement
 
 admin.site.register(InventoryItem)
+admin.site.register(StockMovement)
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.4 on 2026-10-19 13:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0002_stock_movement'),
+        ('suppliers', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inventoryitem',
+            name='preferred_supplier',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='preferred_items', to='suppliers.supplier'),
+        ),
+        migrations.AddField(
+            model_name='inventoryitem',
+            name='target_level',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='inventoryitem',
+            index=models.Index(condition=models.Q(('quantity__lte', models.F('reorder_level')), ('reorder_level__gt', 0)), fields=['preferred_supplier'], name='inventory_low_stock_idx'),
+        ),
+    ]
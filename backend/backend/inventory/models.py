@@ -1,3 +1,4 @@
+from django.contrib.auth import get_user_model
 from django.db import models
 
 # Create your models here.
@@ -10,8 +11,50 @@ class InventoryItem(models.Model):
     sku = models.CharField(max_length=100, unique=True)
     quantity = models.PositiveIntegerField(default=0)
     reorder_level = models.PositiveIntegerField(default=0)
+    # Replenishment (orders/replenishment.py): stock is topped up to target_level,
+    # or from recent consumption when it is 0, with orders to preferred_supplier.
+    target_level = models.PositiveIntegerField(default=0)
+    preferred_supplier = models.ForeignKey(
+        'suppliers.Supplier', on_delete=models.SET_NULL, null=True, blank=True, related_name='preferred_items'
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Only low-stock items are indexed, so the replenishment scan reads just those rows.
+            models.Index(
+                fields=['preferred_supplier'], name='inventory_low_stock_idx',
+                condition=models.Q(reorder_level__gt=0, quantity__lte=models.F('reorder_level')),
+            ),
+        ]
+
     def __str__(self):
         return f"{self.name} (SKU: {self.sku})"
+
+
+class StockMovement(models.Model):
+    """
+    One change to an item's stock level. Positive quantities add stock.
+    """
+    class Kinds(models.TextChoices):
+        RECEIPT = 'RECEIPT', 'Goods receipt'
+        STOCK_IN = 'STOCK_IN', 'Stock in'
+        STOCK_OUT = 'STOCK_OUT', 'Stock out'
+
+    item = models.ForeignKey(InventoryItem, on_delete=models.CASCADE, related_name='movements')
+    quantity = models.IntegerField()
+    kind = models.CharField(max_length=20, choices=Kinds.choices)
+    purchase_order = models.ForeignKey(
+        'orders.PurchaseOrder', on_delete=models.SET_NULL, null=True, blank=True, related_name='stock_movements'
+    )
+    # Delivery note or other document the movement was booked against.
+    reference = models.CharField(max_length=100, blank=True, default='')
+    user = models.ForeignKey(get_user_model(), on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['item', 'created_at'])]
+
+    def __str__(self):
+        return f"{self.quantity:+d} {self.item_id} ({self.kind})"
@@ -0,0 +1,31 @@
+from core.reports import Column, CSVExport, Report, register, register_csv
+from .models import InventoryItem
+
+INVENTORY_REPORT = register(Report(
+    'inventory', 'Inventory Report',
+    [
+        Column('Name', 'name', 3),
+        Column('SKU', 'sku', 2),
+        Column('Quantity', 'quantity', 1.4),
+        Column('Reorder Level', 'reorder_level', 2),
+        Column('Created', 'created_at', 2),
+        Column('Updated', 'updated_at', 2),
+    ],
+    lambda: InventoryItem.objects.order_by('name').only(
+        'name', 'sku', 'quantity', 'reorder_level', 'created_at', 'updated_at',
+    ),
+    'inventory_report',
+    (InventoryItem,),
+))
+
+INVENTORY_CSV = register_csv(CSVExport(
+    'inventory',
+    ['name', 'sku', 'quantity', 'reorder_level', 'created_at', 'updated_at'],
+    lambda item: [
+        item.name, item.sku, item.quantity, item.reorder_level,
+        item.created_at.isoformat(), item.updated_at.isoformat(),
+    ],
+    lambda: InventoryItem.objects.all(),
+    'inventory_export',
+    (InventoryItem,),
+))
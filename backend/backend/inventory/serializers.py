@@ -4,7 +4,10 @@ from .models import InventoryItem
 class InventoryItemSerializer(serializers.ModelSerializer):
     class Meta:
         model = InventoryItem
-        fields = ['id', 'name', 'sku', 'quantity', 'reorder_level', 'created_at', 'updated_at']
+        fields = [
+            'id', 'name', 'sku', 'quantity', 'reorder_level', 'target_level', 'preferred_supplier',
+            'created_at', 'updated_at',
+        ]
 
 class InventoryMetricsSerializer(serializers.Serializer):
     total_items = serializers.IntegerField()
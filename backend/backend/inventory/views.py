@@ -1,20 +1,18 @@
 from django.shortcuts import render
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
-from .models import InventoryItem
+from .models import InventoryItem, StockMovement
 from .serializers import InventoryMetricsSerializer
 from django.db import models
 from rest_framework import generics, permissions
 from .serializers import InventoryItemSerializer
-from django.http import HttpResponse
 import csv
 from rest_framework.parsers import MultiPartParser
 from rest_framework import status
 from rest_framework.generics import get_object_or_404
-from django.template.loader import render_to_string
-from xhtml2pdf import pisa
-from io import BytesIO
+from core import audit, reports
+from users.permissions import role_permission
+from .reports import INVENTORY_CSV, INVENTORY_REPORT
 
 # Create your views here.
 
@@ -23,7 +21,7 @@ class InventoryMetricsView(APIView):
     API endpoint for inventory dashboard metrics.
     Returns total items and low stock count.
     """
-    permission_classes = [IsAuthenticated]
+    permission_classes = [role_permission(GET='inventory.view')]
 
     def get(self, request):
         # Count total items and low stock items
@@ -39,7 +37,7 @@ class InventoryItemListCreateView(generics.ListCreateAPIView):
     """
     queryset = InventoryItem.objects.all().order_by('-created_at')
     serializer_class = InventoryItemSerializer
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [role_permission(GET='inventory.view', POST='inventory.add')]
 
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -57,32 +55,24 @@ class InventoryItemRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIVi
     """
     queryset = InventoryItem.objects.all()
     serializer_class = InventoryItemSerializer
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [role_permission(
+        GET='inventory.view', PUT='inventory.change', PATCH='inventory.change', DELETE='inventory.delete',
+    )]
 
 class InventoryCSVExportView(APIView):
     """
     Export all inventory items as a CSV file.
     """
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [role_permission(GET='inventory.view')]
 
     def get(self, request):
-        # Write all inventory items to CSV
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename="inventory_export.csv"'
-        writer = csv.writer(response)
-        writer.writerow(['name', 'sku', 'quantity', 'reorder_level', 'created_at', 'updated_at'])
-        for item in InventoryItem.objects.all():
-            writer.writerow([
-                item.name, item.sku, item.quantity, item.reorder_level,
-                item.created_at.isoformat(), item.updated_at.isoformat()
-            ])
-        return response
+        return reports.download(INVENTORY_CSV)
 
 class InventoryCSVImportView(APIView):
     """
     Import inventory items from a CSV file. Updates existing items by SKU or creates new ones.
     """
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [role_permission(POST='inventory.import')]
     parser_classes = [MultiPartParser]
 
     def post(self, request):
@@ -111,20 +101,22 @@ class InventoryItemStockInView(APIView):
     """
     API endpoint to increment the quantity of an inventory item (stock in).
     """
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [role_permission(POST='inventory.stock')]
 
     def post(self, request, pk):
         item = get_object_or_404(InventoryItem, pk=pk)
         amount = int(request.data.get('amount', 1))
         item.quantity += amount
+        audit.tag(item, 'STOCK_IN', f'Stocked in {amount} of {item.name}, new quantity {item.quantity}')
         item.save()
+        StockMovement.objects.create(item=item, quantity=amount, kind=StockMovement.Kinds.STOCK_IN, user=request.user)
         return Response({'status': 'stocked in', 'item_id': item.id, 'new_quantity': item.quantity}, status=status.HTTP_200_OK)
 
 class InventoryItemStockOutView(APIView):
     """
     API endpoint to decrement the quantity of an inventory item (stock out).
     """
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [role_permission(POST='inventory.stock')]
 
     def post(self, request, pk):
         item = get_object_or_404(InventoryItem, pk=pk)
@@ -132,21 +124,16 @@ class InventoryItemStockOutView(APIView):
         if item.quantity - amount < 0:
             return Response({'error': 'Not enough stock.'}, status=status.HTTP_400_BAD_REQUEST)
         item.quantity -= amount
+        audit.tag(item, 'STOCK_OUT', f'Stocked out {amount} of {item.name}, new quantity {item.quantity}')
         item.save()
+        StockMovement.objects.create(item=item, quantity=-amount, kind=StockMovement.Kinds.STOCK_OUT, user=request.user)
         return Response({'status': 'stocked out', 'item_id': item.id, 'new_quantity': item.quantity}, status=status.HTTP_200_OK)
 
 class InventoryPDFExportView(APIView):
     """
     Export all inventory items as a PDF file.
     """
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [role_permission(GET='inventory.view')]
 
     def get(self, request):
-        items = InventoryItem.objects.all().order_by('name')
-        html = render_to_string('inventory_pdf_template.html', {'items': items})
-        response = HttpResponse(content_type='application/pdf')
-        response['Content-Disposition'] = 'attachment; filename="inventory_report.pdf"'
-        pisa_status = pisa.CreatePDF(html, dest=response)
-        if pisa_status.err:
-            return HttpResponse('Error generating PDF', status=500)
-        return response
+        return reports.download(INVENTORY_REPORT)
@@ -6,36 +6,46 @@ from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes
 from .models import Notification
 from .serializers import NotificationSerializer
+from users.permissions import role_permission, scope_queryset
 
 # Create your views here.
 
+def visible_notifications(user):
+    """
+    Notifications the user may see: their own and global ones (user=None),
+    or all of them for roles allowed notifications.view_all.
+    """
+    return scope_queryset(
+        Notification.objects.all(), user, 'notifications.view_all',
+        models.Q(user=user) | models.Q(user=None),
+    )
+
 class NotificationListView(generics.ListAPIView):
     """
     List all notifications for the current user and global notifications (user=None).
     """
     serializer_class = NotificationSerializer
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [role_permission(GET='notifications.view')]
 
     def get_queryset(self):
-        user = self.request.user
-        return Notification.objects.filter(models.Q(user=user) | models.Q(user=None)).order_by('-created_at')
+        return visible_notifications(self.request.user).order_by('-created_at')
 
 class NotificationCreateView(generics.CreateAPIView):
     """
     Create a new notification (system or user-specific).
     """
     serializer_class = NotificationSerializer
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [role_permission(POST='notifications.add')]
 
 class NotificationMarkReadView(APIView):
     """
     Mark a notification as read.
     """
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [role_permission(POST='notifications.view')]
 
     def post(self, request, pk):
         try:
-            notif = Notification.objects.get(pk=pk)
+            notif = visible_notifications(request.user).get(pk=pk)
         except Notification.DoesNotExist:
             return Response({'error': 'Notification not found.'}, status=status.HTTP_404_NOT_FOUND)
         notif.is_read = True
@@ -46,11 +56,11 @@ class NotificationDeleteView(APIView):
     """
     Delete a notification.
     """
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [role_permission(DELETE='notifications.view')]
 
     def delete(self, request, pk):
         try:
-            notif = Notification.objects.get(pk=pk)
+            notif = visible_notifications(request.user).get(pk=pk)
             # Ensure user can only delete their own notifications
             if notif.user and notif.user != request.user:
                 return Response({'error': 'Permission denied.'}, status=status.HTTP_403_FORBIDDEN)
@@ -60,7 +70,7 @@ class NotificationDeleteView(APIView):
             return Response({'error': 'Notification not found.'}, status=status.HTTP_404_NOT_FOUND)
 
 @api_view(['POST'])
-@permission_classes([permissions.IsAuthenticated])
+@permission_classes([role_permission(POST='notifications.view')])
 def mark_all_read(request):
     """
     Mark all unread notifications as read for the current user.
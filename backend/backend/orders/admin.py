@@ -1,4 +1,5 @@
 from django.contrib import admin
-from .models import PurchaseOrder
+from .models import OrderTransition, PurchaseOrder
 
 admin.site.register(PurchaseOrder)
+admin.site.register(OrderTransition)
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class OrdersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'orders'
+
+    def ready(self):
+        # Keep the daily order rollups in step with created and deleted orders
+        from . import rollups
+        rollups.connect_signals()
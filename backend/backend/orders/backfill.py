@@ -0,0 +1,113 @@
+"""
+Map the free-text supplier/item values purchase orders were created with onto
+Supplier and InventoryItem foreign keys.
+
+Suppliers match on name and items on SKU or name, ignoring case and extra
+whitespace; item labels in the old "Name (SKU: CODE)" display format match on
+the SKU. Names shared by several records are ambiguous and left unmatched.
+Orders are processed in primary key batches, and everything left unmatched is
+reported so it can be fixed up and backfilled again.
+
+The functions take the model classes as arguments so the migration can pass
+its historical models.
+"""
+import re
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Q
+
+ITEM_LABEL = re.compile(r'^(?P<name>.*) \(SKU: (?P<sku>[^)]*)\)$')
+AMBIGUOUS = object()
+
+
+def normalize(value):
+    return ' '.join((value or '').split()).casefold()
+
+
+def build_index(rows):
+    """Map normalized keys to ids; keys shared by several ids are ambiguous."""
+    index = {}
+    for key, pk in rows:
+        key = normalize(key)
+        if key:
+            index[key] = AMBIGUOUS if index.get(key, pk) != pk else pk
+    return index
+
+
+class ReferenceResolver:
+    def __init__(self, Supplier, InventoryItem):
+        self.suppliers = build_index(Supplier.objects.values_list('name', 'pk'))
+        self.items_by_sku = build_index(InventoryItem.objects.values_list('sku', 'pk'))
+        self.items_by_name = build_index(InventoryItem.objects.values_list('name', 'pk'))
+
+    @staticmethod
+    def pick(*candidates):
+        for candidate in candidates:
+            if candidate is not None:
+                return None if candidate is AMBIGUOUS else candidate
+        return None
+
+    def supplier(self, value):
+        return self.pick(self.suppliers.get(normalize(value)))
+
+    def item(self, value):
+        label = ITEM_LABEL.match((value or '').strip())
+        if label:
+            return self.pick(
+                self.items_by_sku.get(normalize(label.group('sku'))),
+                self.items_by_name.get(normalize(label.group('name'))),
+            )
+        key = normalize(value)
+        return self.pick(self.items_by_sku.get(key), self.items_by_name.get(key))
+
+
+def backfill(PurchaseOrder, Supplier, InventoryItem, batch_size=1000):
+    """
+    Fill in missing supplier/item foreign keys from the legacy text columns.
+    Returns a report dict with the number of orders updated and Counters of
+    the unmatched supplier and item values.
+    """
+    resolver = ReferenceResolver(Supplier, InventoryItem)
+    pending = PurchaseOrder.objects.filter(
+        Q(supplier__isnull=True) & ~Q(legacy_supplier='') | Q(item__isnull=True) & ~Q(legacy_item='')
+    ).order_by('pk').only('pk', 'supplier', 'item', 'legacy_supplier', 'legacy_item')
+
+    report = {'updated': 0, 'unmatched_suppliers': Counter(), 'unmatched_items': Counter()}
+    last_pk = 0
+    while True:
+        batch = list(pending.filter(pk__gt=last_pk)[:batch_size])
+        if not batch:
+            break
+        last_pk = batch[-1].pk
+        changed = []
+        for order in batch:
+            updated = False
+            if order.supplier_id is None and order.legacy_supplier:
+                order.supplier_id = resolver.supplier(order.legacy_supplier)
+                if order.supplier_id is None:
+                    report['unmatched_suppliers'][order.legacy_supplier] += 1
+                else:
+                    updated = True
+            if order.item_id is None and order.legacy_item:
+                order.item_id = resolver.item(order.legacy_item)
+                if order.item_id is None:
+                    report['unmatched_items'][order.legacy_item] += 1
+                else:
+                    updated = True
+            if updated:
+                changed.append(order)
+        with transaction.atomic():
+            PurchaseOrder.objects.bulk_update(changed, ['supplier', 'item'])
+        report['updated'] += len(changed)
+    return report
+
+
+def format_report(report):
+    lines = [f"✅ Linked {report['updated']} purchase orders to suppliers and items"]
+    for label, key in (('supplier', 'unmatched_suppliers'), ('item', 'unmatched_items')):
+        unmatched = report[key]
+        if unmatched:
+            lines.append(f"⚠️ {sum(unmatched.values())} orders have an unmatched {label}:")
+            lines.extend(f"   {value!r}: {count}" for value, count in unmatched.most_common())
+    return lines
@@ -0,0 +1,86 @@
+"""
+Set-based approval and rejection of many purchase orders at once.
+
+The requested orders are read and locked in one query (in primary key order,
+so concurrent bulk actions cannot deadlock), and every order in a valid
+source state (see orders/workflow.py) is moved with a single UPDATE that
+also bumps its version. The locks keep another request from changing those
+orders in between, so the orders reported, audited and counted in the
+rollups are exactly the ones this UPDATE moved. Transitions and notifications
+are bulk-created, audit entries go through the request's audit buffer (one
+bulk insert) and the daily rollups get one update per touched rollup row, so
+the query count does not grow with the number of orders.
+"""
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from core import audit
+from notifications.models import Notification
+from .models import OrderTransition, PurchaseOrder
+from .rollups import RollupDelta
+from .workflow import TRANSITIONS, status_changes
+
+BULK_ACTIONS = {action: TRANSITIONS[action] for action in ('approve', 'reject')}
+# What the transitions and rollups need to know about each order.
+READ_FIELDS = ('status', 'version', 'supplier_id', 'item_id', 'quantity', 'created_at')
+
+
+def apply_bulk_action(order_ids, action, user=None):
+    """
+    Apply ``action`` to the orders in ``order_ids``. Returns a list of
+    per-order results in request order: {'id', 'outcome', 'status'} where
+    outcome is 'updated', 'invalid_state' or 'not_found'.
+    """
+    target, sources = BULK_ACTIONS[action]
+    order_ids = list(dict.fromkeys(order_ids))
+    with transaction.atomic():
+        read = {
+            order.pk: order for order in
+            PurchaseOrder.objects.select_for_update().only(*READ_FIELDS).filter(pk__in=order_ids).order_by('pk')
+        }
+        current = {pk: order.status for pk, order in read.items()}
+        eligible = [pk for pk in order_ids if current.get(pk) in sources]
+        updated = set(eligible)
+        now = timezone.now()
+        if eligible:
+            PurchaseOrder.objects.filter(pk__in=eligible).update(
+                version=F('version') + 1, updated_at=now, **status_changes(target, now),
+            )
+
+        user_id = user.pk if user and user.is_authenticated else None
+        OrderTransition.objects.bulk_create([
+            OrderTransition(
+                order_id=pk, action=action, from_status=read[pk].status, to_status=target,
+                version=read[pk].version + 1, user_id=user_id, note='bulk',
+            )
+            for pk in eligible
+        ])
+        delta = RollupDelta()
+        for pk in updated:
+            delta.move(read[pk], read[pk].status, target)
+            if target == 'APPROVED':
+                delta.approve(read[pk], now)
+            elif target == 'REJECTED':
+                delta.reject(read[pk])
+        delta.apply()
+        verb = target.title()
+        for pk in updated:
+            audit.record(
+                action.upper(), object_type='Purchase Order', object_id=str(pk),
+                message=f'{verb} purchase order {pk} (bulk)', user=user,
+            )
+        Notification.objects.bulk_create([
+            Notification(message=f'Purchase order #{pk} has been {target.lower()}.', type='INFO')
+            for pk in order_ids if pk in updated
+        ])
+
+    results = []
+    for pk in order_ids:
+        if pk in updated:
+            results.append({'id': pk, 'outcome': 'updated', 'status': target})
+        elif pk in current:
+            results.append({'id': pk, 'outcome': 'invalid_state', 'status': current[pk]})
+        else:
+            results.append({'id': pk, 'outcome': 'not_found', 'status': None})
+    return results
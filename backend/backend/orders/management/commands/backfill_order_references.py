@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from inventory.models import InventoryItem
+from orders.backfill import backfill, format_report
+from orders.models import PurchaseOrder
+from suppliers.models import Supplier
+
+
+class Command(BaseCommand):
+    help = 'Link purchase orders still missing a supplier or item to the records matching their legacy text'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Orders updated per batch')
+
+    def handle(self, *args, **options):
+        report = backfill(PurchaseOrder, Supplier, InventoryItem, batch_size=options['batch_size'])
+        for line in format_report(report):
+            self.stdout.write(line)
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from orders.models import OrderDailyRollup, PurchaseOrder
+from orders.rollups import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Recompute the daily order rollups from the purchase orders'
+
+    def handle(self, *args, **options):
+        rows = rebuild(PurchaseOrder, OrderDailyRollup)
+        if options['verbosity']:
+            self.stdout.write(self.style.SUCCESS(f'✅ Rebuilt {rows} daily order rollup rows'))
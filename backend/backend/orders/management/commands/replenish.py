@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+
+from orders import replenishment
+from suppliers.models import Supplier
+
+
+class Command(BaseCommand):
+    help = 'Draft purchase orders for items at or below their reorder level'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lookback-days', type=int, default=replenishment.LOOKBACK_DAYS,
+            help='Days of stock-out history used to estimate consumption',
+        )
+        parser.add_argument(
+            '--cover-days', type=int, default=replenishment.COVER_DAYS,
+            help='Days of consumption to order for items without a target level',
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Report the orders without creating them')
+
+    def handle(self, *args, **options):
+        report = replenishment.replenish(
+            lookback_days=options['lookback_days'], cover_days=options['cover_days'], dry_run=options['dry_run'],
+        )
+        names = dict(Supplier.objects.filter(
+            pk__in=[entry['supplier_id'] for entry in report['suppliers']]
+        ).values_list('pk', 'name'))
+        verb = 'Would draft' if options['dry_run'] else 'Drafted'
+        for entry in report['suppliers']:
+            self.stdout.write(
+                f"  {names.get(entry['supplier_id'], entry['supplier_id'])}: "
+                f"{entry['orders']} orders, {entry['quantity']} units"
+            )
+        self.stdout.write(
+            f"Scanned {report['scanned']} low-stock items: {report['covered']} already covered, "
+            f"{report['no_supplier']} without a preferred supplier."
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {verb} {report['orders_created']} purchase orders for {len(report['suppliers'])} suppliers"
+        ))
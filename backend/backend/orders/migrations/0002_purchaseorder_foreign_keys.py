@@ -0,0 +1,59 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def link_references(apps, schema_editor):
+    from orders.backfill import backfill, format_report
+
+    report = backfill(
+        apps.get_model('orders', 'PurchaseOrder'),
+        apps.get_model('suppliers', 'Supplier'),
+        apps.get_model('inventory', 'InventoryItem'),
+    )
+    if report['updated'] or report['unmatched_suppliers'] or report['unmatched_items']:
+        print()
+        for line in format_report(report):
+            print(f'  {line}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0001_initial'),
+        ('orders', '0001_initial'),
+        ('suppliers', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='purchaseorder',
+            old_name='supplier',
+            new_name='legacy_supplier',
+        ),
+        migrations.RenameField(
+            model_name='purchaseorder',
+            old_name='item',
+            new_name='legacy_item',
+        ),
+        migrations.AlterField(
+            model_name='purchaseorder',
+            name='legacy_supplier',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='purchaseorder',
+            name='legacy_item',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='purchaseorder',
+            name='supplier',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='purchase_orders', to='suppliers.supplier'),
+        ),
+        migrations.AddField(
+            model_name='purchaseorder',
+            name='item',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='purchase_orders', to='inventory.inventoryitem'),
+        ),
+        migrations.RunPython(link_references, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.4 on 2026-10-19 13:48
+
+from django.db import migrations, models
+
+
+def build_rollups(apps, schema_editor):
+    from orders.rollups import rebuild
+
+    rebuild(apps.get_model('orders', 'PurchaseOrder'), apps.get_model('orders', 'OrderDailyRollup'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0004_goods_receipt'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('APPROVED', 'Approved'), ('REJECTED', 'Rejected'), ('PARTIALLY_RECEIVED', 'Partially received'), ('RECEIVED', 'Received'), ('CANCELLED', 'Cancelled')], max_length=20)),
+                ('supplier_id', models.IntegerField(default=0)),
+                ('item_id', models.IntegerField(default=0)),
+                ('count', models.IntegerField(default=0)),
+                ('quantity', models.BigIntegerField(default=0)),
+                ('approvals', models.IntegerField(default=0)),
+                ('approval_seconds', models.FloatField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['item_id', 'day'], name='orders_orde_item_id_c5d779_idx')],
+                'constraints': [models.UniqueConstraint(fields=('day', 'status', 'supplier_id', 'item_id'), name='unique_order_rollup')],
+            },
+        ),
+        migrations.RunPython(build_rollups, migrations.RunPython.noop),
+    ]
@@ -1,3 +1,4 @@
+from django.contrib.auth import get_user_model
 from django.db import models
 
 # Create your models here.
@@ -10,13 +11,85 @@ class PurchaseOrder(models.Model):
         ('PENDING', 'Pending'),
         ('APPROVED', 'Approved'),
         ('REJECTED', 'Rejected'),
+        ('PARTIALLY_RECEIVED', 'Partially received'),
+        ('RECEIVED', 'Received'),
+        ('CANCELLED', 'Cancelled'),
     ]
-    supplier = models.CharField(max_length=255)
-    item = models.CharField(max_length=255)
+    supplier = models.ForeignKey(
+        'suppliers.Supplier', on_delete=models.SET_NULL, null=True, blank=True, related_name='purchase_orders'
+    )
+    item = models.ForeignKey(
+        'inventory.InventoryItem', on_delete=models.SET_NULL, null=True, blank=True, related_name='purchase_orders'
+    )
+    # Free text entered before supplier and item became foreign keys. Kept for
+    # rows the backfill could not match (see manage.py backfill_order_references).
+    legacy_supplier = models.CharField(max_length=255, blank=True, default='')
+    legacy_item = models.CharField(max_length=255, blank=True, default='')
     quantity = models.PositiveIntegerField(default=1)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
+    # Bumped on every change; see orders/workflow.py.
+    version = models.PositiveIntegerField(default=1)
+    # Goods receipt (orders/receiving.py). lead_time runs from approval to the
+    # receipt that completed the order.
+    received_quantity = models.PositiveIntegerField(default=0)
+    approved_at = models.DateTimeField(null=True, blank=True)
+    received_at = models.DateTimeField(null=True, blank=True)
+    lead_time = models.DurationField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    @property
+    def supplier_name(self):
+        return self.supplier.name if self.supplier_id else self.legacy_supplier
+
+    @property
+    def item_name(self):
+        return self.item.name if self.item_id else self.legacy_item
+
+    def __str__(self):
+        return f"Order for {self.item_name} from {self.supplier_name} ({self.status})"
+
+
+class OrderTransition(models.Model):
+    """
+    One status change of a purchase order, as applied by orders/workflow.py.
+    """
+    order = models.ForeignKey(PurchaseOrder, on_delete=models.CASCADE, related_name='transitions')
+    action = models.CharField(max_length=20)
+    from_status = models.CharField(max_length=20, choices=PurchaseOrder.STATUS_CHOICES)
+    to_status = models.CharField(max_length=20, choices=PurchaseOrder.STATUS_CHOICES)
+    # The order's version after this transition.
+    version = models.PositiveIntegerField()
+    user = models.ForeignKey(get_user_model(), on_delete=models.SET_NULL, null=True, blank=True)
+    note = models.CharField(max_length=255, blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['order', 'version']
+
+    def __str__(self):
+        return f"Order {self.order_id}: {self.from_status} -> {self.to_status}"
+
+
+class OrderDailyRollup(models.Model):
+    """
+    Order totals per creation day, status, supplier and item, maintained by
+    orders/rollups.py. supplier_id and item_id are 0 for orders without one.
+    """
+    day = models.DateField()
+    status = models.CharField(max_length=20, choices=PurchaseOrder.STATUS_CHOICES)
+    supplier_id = models.IntegerField(default=0)
+    item_id = models.IntegerField(default=0)
+    count = models.IntegerField(default=0)
+    quantity = models.BigIntegerField(default=0)
+    approvals = models.IntegerField(default=0)
+    approval_seconds = models.FloatField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'status', 'supplier_id', 'item_id'], name='unique_order_rollup'),
+        ]
+        indexes = [models.Index(fields=['item_id', 'day'])]
+
     def __str__(self):
-        return f"Order for {self.item} from {self.supplier} ({self.status})"
+        return f"{self.day} {self.status}: {self.count} orders"
@@ -0,0 +1,145 @@
+"""
+Goods receipt: booking delivered purchase order quantities into stock.
+
+A delivery, from a single order to a whole truck, is booked in one
+transaction that
+- moves each order to PARTIALLY_RECEIVED or RECEIVED with the workflow's
+  conditional UPDATE (orders/workflow.py), adding the received quantity and,
+  once the order is complete, its received_at time and supplier lead time;
+- increments stock for every delivered item with one set-based UPDATE
+  (quantity = quantity + CASE ...), so current levels are never read;
+- bulk-creates a StockMovement and an OrderTransition per order and moves
+  the orders between daily rollup rows, crediting completed orders' lead
+  time to their supplier's scorecard (orders/rollups.py).
+If any line cannot be booked the whole delivery is rolled back.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.utils import timezone
+
+from core import audit
+from inventory.models import InventoryItem, StockMovement
+from .models import OrderTransition, PurchaseOrder
+from .rollups import RollupDelta
+from .workflow import TRANSITIONS, conditional_update
+
+
+class ReceiptError(Exception):
+    """
+    The delivery could not be booked. ``errors`` holds one
+    {'order', 'error', 'status', 'version'} entry per rejected line.
+    """
+
+    def __init__(self, errors):
+        super().__init__('; '.join(error['error'] for error in errors))
+        self.errors = errors
+
+
+def _line_error(order_id, message, order=None):
+    return {
+        'order': order_id, 'error': message,
+        'status': order.status if order else None, 'version': order.version if order else None,
+    }
+
+
+def _check_line(order, quantity, expected_version):
+    """Return (action, quantity) for a receivable line or raise ValueError."""
+    if expected_version is not None and expected_version != order.version:
+        raise ValueError(f'Purchase order {order.pk} was changed by someone else (now version {order.version}).')
+    if order.item_id is None:
+        raise ValueError(f'Purchase order {order.pk} has no inventory item to receive into.')
+    outstanding = order.quantity - order.received_quantity
+    if quantity is None:
+        quantity = outstanding
+    action = 'receive' if quantity >= outstanding else 'receive_partial'
+    if order.status not in TRANSITIONS[action][1]:
+        raise ValueError(f'Cannot receive a purchase order that is {order.status.lower()}.')
+    if not 0 < quantity <= outstanding:
+        raise ValueError(f'Purchase order {order.pk} has {outstanding} outstanding, cannot receive {quantity}.')
+    return action, quantity
+
+
+def _lead_time(order, received_at):
+    """Supplier lead time: from approval (or creation, for older orders) to full receipt."""
+    return received_at - (order.approved_at or order.created_at)
+
+
+def receive_goods(lines, user=None, reference=''):
+    """
+    Book a delivery. ``lines`` are (order_id, quantity, expected_version)
+    tuples; a quantity of None receives everything outstanding and an
+    expected_version of None skips the version check. Returns the updated
+    orders in line order. Raises ReceiptError.
+    """
+    orders = PurchaseOrder.objects.in_bulk([line[0] for line in lines])
+    errors, booked, seen = [], [], set()
+    for order_id, quantity, expected_version in lines:
+        order = orders.get(order_id)
+        if order is None:
+            errors.append(_line_error(order_id, f'Purchase order {order_id} not found.'))
+        elif order_id in seen:
+            errors.append(_line_error(order_id, f'Purchase order {order_id} is listed more than once.', order))
+        else:
+            try:
+                booked.append((order, *_check_line(order, quantity, expected_version)))
+            except ValueError as exc:
+                errors.append(_line_error(order_id, str(exc), order))
+        seen.add(order_id)
+    if errors:
+        raise ReceiptError(errors)
+
+    now = timezone.now()
+    user_id = user.pk if user and user.is_authenticated else None
+    with transaction.atomic():
+        for order, action, quantity in booked:
+            changes = {'status': TRANSITIONS[action][0], 'received_quantity': order.received_quantity + quantity}
+            if action == 'receive':
+                changes.update(received_at=now, lead_time=_lead_time(order, now))
+            if not conditional_update(order.pk, order.status, order.version, updated_at=now, **changes):
+                current = PurchaseOrder.objects.get(pk=order.pk)
+                raise ReceiptError([_line_error(
+                    order.pk, f'Purchase order {order.pk} was changed by someone else (now version {current.version}).',
+                    current,
+                )])
+
+        received = defaultdict(int)
+        for order, _, quantity in booked:
+            received[order.item_id] += quantity
+        InventoryItem.objects.filter(pk__in=received).update(
+            quantity=F('quantity') + Case(
+                *[When(pk=item_id, then=Value(quantity)) for item_id, quantity in received.items()],
+                default=Value(0), output_field=IntegerField(),
+            ),
+            updated_at=now,
+        )
+
+        StockMovement.objects.bulk_create([
+            StockMovement(
+                item_id=order.item_id, quantity=quantity, kind=StockMovement.Kinds.RECEIPT,
+                purchase_order_id=order.pk, reference=reference, user_id=user_id,
+            )
+            for order, _, quantity in booked
+        ])
+        OrderTransition.objects.bulk_create([
+            OrderTransition(
+                order_id=order.pk, action=action, from_status=order.status, to_status=TRANSITIONS[action][0],
+                version=order.version + 1, user_id=user_id, note=reference,
+            )
+            for order, action, _ in booked
+        ])
+        delta = RollupDelta()
+        for order, action, _ in booked:
+            delta.move(order, order.status, TRANSITIONS[action][0])
+            if action == 'receive':
+                delta.receive(order, _lead_time(order, now))
+        delta.apply()
+        for order, action, quantity in booked:
+            audit.record(
+                'RECEIVE', object_type='Purchase Order', object_id=str(order.pk),
+                message=f'Received {quantity} of {order.quantity} for purchase order {order.pk}', user=user,
+            )
+
+    updated = PurchaseOrder.objects.select_related('supplier', 'item').in_bulk([order.pk for order, _, _ in booked])
+    return [updated[order.pk] for order, _, _ in booked]
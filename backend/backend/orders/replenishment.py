@@ -0,0 +1,110 @@
+"""
+Replenishment: drafting purchase orders for low-stock items.
+
+A run reads every item at or below its reorder level in one pass over the
+inventory_low_stock_idx partial index, plus two grouped queries for recent
+consumption (stock-out movements) and quantities already on order. The
+order quantity tops the item up to its target level; items without one are
+topped up to their reorder level plus the stock expected to be consumed over
+``cover_days``. Quantities already on open orders are subtracted, so runs
+can be repeated without ordering twice.
+
+Drafts are PENDING orders to the item's preferred supplier, created with
+bulk_create and grouped by supplier in the report. Items without a preferred
+supplier are reported but not ordered.
+"""
+import math
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F, Q, Sum
+from django.utils import timezone
+
+from core import audit
+from inventory.models import InventoryItem, StockMovement
+from .models import PurchaseOrder
+from .rollups import RollupDelta
+
+LOOKBACK_DAYS = 30
+COVER_DAYS = 14
+OPEN_STATUSES = ('PENDING', 'APPROVED', 'PARTIALLY_RECEIVED')
+LOW_STOCK = Q(reorder_level__gt=0, quantity__lte=F('reorder_level'))
+
+
+def order_quantity(quantity, reorder_level, target_level, consumed, on_order, lookback_days, cover_days):
+    """How many units to order for one item; 0 when it is covered."""
+    if target_level:
+        target = target_level
+    else:
+        target = reorder_level + math.ceil(consumed / lookback_days * cover_days)
+    return max(target - quantity - on_order, 0)
+
+
+def replenish(lookback_days=LOOKBACK_DAYS, cover_days=COVER_DAYS, dry_run=False, user=None, batch_size=1000):
+    """
+    Draft orders for every low-stock item. Returns a report:
+    {'scanned', 'covered', 'no_supplier', 'orders_created', 'quantity', 'suppliers': [...]}
+    where each supplier entry has its 'supplier_id', 'orders', 'quantity' and
+    the created 'order_ids' (empty on a dry run).
+    """
+    since = timezone.now() - timedelta(days=lookback_days)
+    low_items = InventoryItem.objects.filter(LOW_STOCK).values_list(
+        'pk', 'quantity', 'reorder_level', 'target_level', 'preferred_supplier_id',
+    )
+    consumed = dict(
+        StockMovement.objects.filter(
+            kind=StockMovement.Kinds.STOCK_OUT, created_at__gte=since,
+            item__reorder_level__gt=0, item__quantity__lte=F('item__reorder_level'),
+        ).values('item_id').annotate(total=Sum('quantity')).values_list('item_id', 'total')
+    )
+    on_order = dict(
+        PurchaseOrder.objects.filter(
+            status__in=OPEN_STATUSES, item__reorder_level__gt=0, item__quantity__lte=F('item__reorder_level'),
+        ).values('item_id').annotate(total=Sum(F('quantity') - F('received_quantity'))).values_list('item_id', 'total')
+    )
+
+    report = {'scanned': 0, 'covered': 0, 'no_supplier': 0, 'orders_created': 0, 'quantity': 0}
+    drafts = defaultdict(list)
+    for pk, quantity, reorder_level, target_level, supplier_id in low_items.iterator(chunk_size=batch_size):
+        report['scanned'] += 1
+        needed = order_quantity(
+            quantity, reorder_level, target_level, -(consumed.get(pk) or 0), on_order.get(pk) or 0,
+            lookback_days, cover_days,
+        )
+        if not needed:
+            report['covered'] += 1
+        elif supplier_id is None:
+            report['no_supplier'] += 1
+        else:
+            drafts[supplier_id].append(PurchaseOrder(supplier_id=supplier_id, item_id=pk, quantity=needed))
+
+    suppliers = []
+    with transaction.atomic():
+        for supplier_id in sorted(drafts):
+            orders = drafts[supplier_id]
+            if not dry_run:
+                PurchaseOrder.objects.bulk_create(orders, batch_size=batch_size)
+            suppliers.append({
+                'supplier_id': supplier_id,
+                'orders': len(orders),
+                'quantity': sum(order.quantity for order in orders),
+                'order_ids': [order.pk for order in orders if order.pk],
+            })
+        if not dry_run:
+            delta = RollupDelta()
+            for orders in drafts.values():
+                for order in orders:
+                    delta.create(order)
+            delta.apply()
+        report['orders_created'] = sum(entry['orders'] for entry in suppliers)
+        report['quantity'] = sum(entry['quantity'] for entry in suppliers)
+        if suppliers and not dry_run:
+            audit.record(
+                'REPLENISH', object_type='Purchase Order',
+                message=f"Drafted {report['orders_created']} purchase orders for {len(suppliers)} suppliers",
+                user=user,
+            )
+    report['suppliers'] = suppliers
+    report['dry_run'] = dry_run
+    return report
@@ -0,0 +1,31 @@
+from core.reports import Column, CSVExport, Report, register, register_csv
+from inventory.models import InventoryItem
+from suppliers.models import Supplier
+from .models import PurchaseOrder
+
+ORDERS_REPORT = register(Report(
+    'orders', 'Orders Report',
+    [
+        Column('Supplier', 'supplier_name', 3),
+        Column('Item', 'item_name', 3),
+        Column('Quantity', 'quantity', 1.3),
+        Column('Status', 'status', 2.2),
+        Column('Created', 'created_at', 2),
+        Column('Updated', 'updated_at', 2),
+    ],
+    lambda: PurchaseOrder.objects.select_related('supplier', 'item').order_by('-created_at'),
+    'orders_report',
+    (PurchaseOrder, Supplier, InventoryItem),
+))
+
+ORDERS_CSV = register_csv(CSVExport(
+    'orders',
+    ['supplier', 'item', 'quantity', 'status', 'created_at', 'updated_at'],
+    lambda order: [
+        order.supplier_name, order.item_name, order.quantity, order.status,
+        order.created_at.isoformat(), order.updated_at.isoformat(),
+    ],
+    lambda: PurchaseOrder.objects.select_related('supplier', 'item'),
+    'orders_export',
+    (PurchaseOrder, Supplier, InventoryItem),
+))
@@ -0,0 +1,247 @@
+"""
+Daily purchase order rollups and supplier scorecards.
+
+OrderDailyRollup holds, per creation day, status, supplier and item, how many
+orders there are and their total quantity, plus the number of approvals and
+their summed latency (creation to approval). Every code path that creates,
+edits, moves or deletes orders records its changes in a RollupDelta and
+applies it in the same transaction, so dashboards read a few rollup rows
+instead of grouping the orders table. rebuild() recomputes everything from
+the orders, e.g. after loading fixtures or editing orders in the admin.
+
+Approval columns stay on the row that was current when the order was
+approved, so they are only meaningful summed across statuses.
+
+The same deltas keep each supplier's SupplierScorecard current: order count
+and quantity, approvals, rejections, completed receipts with their lead time,
+and the latest order. rebuild_scorecards() recomputes them.
+"""
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, DurationField, ExpressionWrapper, F, Max, Q, Sum, Value, When
+from django.db.models.signals import post_delete, post_save
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+COLUMNS = ('count', 'quantity', 'approvals', 'approval_seconds')
+SCORECARD_COLUMNS = (
+    'order_count', 'total_quantity', 'approved_count', 'rejected_count', 'received_count', 'lead_time_seconds',
+)
+
+
+def rollup_day(created_at):
+    return timezone.localdate(created_at) if timezone.is_aware(created_at) else created_at.date()
+
+
+class RollupDelta:
+    """Accumulates rollup and scorecard changes for a batch of orders."""
+
+    def __init__(self):
+        self.rows = defaultdict(lambda: dict.fromkeys(COLUMNS, 0))
+        self.scorecards = defaultdict(lambda: dict.fromkeys(SCORECARD_COLUMNS, 0))
+        self.last_orders = {}
+
+    def key(self, order, status=None):
+        return (
+            rollup_day(order.created_at), status or order.status,
+            order.supplier_id or 0, order.item_id or 0,
+        )
+
+    def add(self, order, status=None, sign=1):
+        """Count ``order`` (in ``status``, default its own) in or, with sign=-1, out."""
+        row = self.rows[self.key(order, status)]
+        row['count'] += sign
+        row['quantity'] += sign * order.quantity
+        if order.supplier_id:
+            scorecard = self.scorecards[order.supplier_id]
+            scorecard['order_count'] += sign
+            scorecard['total_quantity'] += sign * order.quantity
+
+    def create(self, order):
+        self.add(order)
+        if order.supplier_id:
+            last = self.last_orders.get(order.supplier_id)
+            self.last_orders[order.supplier_id] = max(last, order.created_at) if last else order.created_at
+
+    def remove(self, order):
+        """Take a deleted order out of every total it was counted in."""
+        self.add(order, sign=-1)
+        if order.approved_at:
+            self.approve(order, order.approved_at, sign=-1)
+        if order.status == 'REJECTED':
+            self.reject(order, sign=-1)
+        if order.lead_time is not None:
+            self.receive(order, order.lead_time, sign=-1)
+
+    def move(self, order, from_status, to_status):
+        self.add(order, from_status, -1)
+        self.add(order, to_status)
+
+    def approve(self, order, approved_at, sign=1):
+        row = self.rows[self.key(order, 'APPROVED')]
+        row['approvals'] += sign
+        row['approval_seconds'] += sign * (approved_at - order.created_at).total_seconds()
+        if order.supplier_id:
+            self.scorecards[order.supplier_id]['approved_count'] += sign
+
+    def reject(self, order, sign=1):
+        if order.supplier_id:
+            self.scorecards[order.supplier_id]['rejected_count'] += sign
+
+    def receive(self, order, lead_time, sign=1):
+        """``order`` was fully received ``lead_time`` after its approval."""
+        if order.supplier_id:
+            scorecard = self.scorecards[order.supplier_id]
+            scorecard['received_count'] += sign
+            scorecard['lead_time_seconds'] += sign * lead_time.total_seconds()
+
+    def apply(self):
+        """Write the accumulated changes, one UPDATE (or INSERT) per touched row."""
+        from suppliers.models import SupplierScorecard
+        from .models import OrderDailyRollup
+
+        for (day, status, supplier_id, item_id), changes in self.rows.items():
+            key = {'day': day, 'status': status, 'supplier_id': supplier_id, 'item_id': item_id}
+            _increment(OrderDailyRollup, key, changes)
+        for supplier_id in self.scorecards.keys() | self.last_orders.keys():
+            changes = self.scorecards.get(supplier_id, {})
+            last = self.last_orders.get(supplier_id)
+            latest = {}
+            if last:
+                latest['last_order_at'] = Case(
+                    When(Q(last_order_at__isnull=True) | Q(last_order_at__lt=last), then=Value(last)),
+                    default=F('last_order_at'),
+                )
+            _increment(SupplierScorecard, {'supplier_id': supplier_id}, changes, latest, {'last_order_at': last})
+        self.rows.clear()
+        self.scorecards.clear()
+        self.last_orders.clear()
+
+
+def _increment(model, key, changes, updates=None, initial=None):
+    """Add ``changes`` to the row at ``key``, creating it if needed."""
+    changes = {name: value for name, value in changes.items() if value}
+    updates = {**{name: F(name) + value for name, value in changes.items()}, **(updates or {})}
+    if not updates:
+        return
+    if model.objects.filter(**key).update(**updates):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**key, **changes, **{name: value for name, value in (initial or {}).items() if value})
+    except IntegrityError:
+        # Created by a concurrent transaction since the update above.
+        model.objects.filter(**key).update(**updates)
+
+
+def handle_post_save(sender, instance, created, raw=False, **kwargs):
+    # Only creations: status and field changes go through orders/workflow.py,
+    # and fixture loads are followed by rebuild().
+    if created and not raw:
+        delta = RollupDelta()
+        delta.create(instance)
+        delta.apply()
+
+
+def handle_post_delete(sender, instance, **kwargs):
+    delta = RollupDelta()
+    delta.remove(instance)
+    delta.apply()
+
+
+def connect_signals():
+    from .models import PurchaseOrder
+
+    post_save.connect(handle_post_save, sender=PurchaseOrder, dispatch_uid='order-rollup-save')
+    post_delete.connect(handle_post_delete, sender=PurchaseOrder, dispatch_uid='order-rollup-delete')
+
+
+def merge_suppliers(survivor_id, duplicate_ids):
+    """
+    Move the duplicates' rollup rows and scorecard totals onto the surviving
+    supplier, for orders repointed in bulk by a supplier merge.
+    """
+    from suppliers.models import SupplierScorecard
+    from .models import OrderDailyRollup
+
+    delta = RollupDelta()
+    rows = OrderDailyRollup.objects.filter(supplier_id__in=duplicate_ids)
+    for row in rows:
+        merged = delta.rows[(row.day, row.status, survivor_id, row.item_id)]
+        for column in COLUMNS:
+            merged[column] += getattr(row, column)
+    scorecards = SupplierScorecard.objects.filter(supplier_id__in=duplicate_ids)
+    for scorecard in scorecards:
+        merged = delta.scorecards[survivor_id]
+        for column in SCORECARD_COLUMNS:
+            merged[column] += getattr(scorecard, column)
+        if scorecard.last_order_at:
+            last = delta.last_orders.get(survivor_id)
+            delta.last_orders[survivor_id] = max(last, scorecard.last_order_at) if last else scorecard.last_order_at
+    rows.delete()
+    scorecards.delete()
+    delta.apply()
+
+
+def rebuild(PurchaseOrder, OrderDailyRollup, batch_size=1000):
+    """
+    Replace all rollups with totals grouped from the orders. Takes the models
+    so it can run from a migration. Returns the number of rollup rows.
+    """
+    latency = ExpressionWrapper(F('approved_at') - F('created_at'), output_field=DurationField())
+    groups = (
+        PurchaseOrder.objects.annotate(day=TruncDate('created_at'))
+        .values('day', 'status', 'supplier_id', 'item_id')
+        .annotate(
+            count=Count('id'), quantity=Sum('quantity'),
+            approvals=Count('approved_at'), approval_time=Sum(latency),
+        )
+        .order_by()
+    )
+    rows = [
+        OrderDailyRollup(
+            day=group['day'], status=group['status'],
+            supplier_id=group['supplier_id'] or 0, item_id=group['item_id'] or 0,
+            count=group['count'], quantity=group['quantity'] or 0, approvals=group['approvals'],
+            approval_seconds=group['approval_time'].total_seconds() if group['approval_time'] else 0,
+        )
+        for group in groups
+    ]
+    with transaction.atomic():
+        OrderDailyRollup.objects.all().delete()
+        OrderDailyRollup.objects.bulk_create(rows, batch_size=batch_size)
+    return len(rows)
+
+
+def rebuild_scorecards(PurchaseOrder, SupplierScorecard, batch_size=1000):
+    """
+    Replace all supplier scorecards with totals grouped from the orders. Takes
+    the models so it can run from a migration. Returns the number of scorecards.
+    """
+    groups = (
+        PurchaseOrder.objects.filter(supplier__isnull=False)
+        .values('supplier_id')
+        .annotate(
+            order_count=Count('id'), total_quantity=Sum('quantity'),
+            approved_count=Count('id', filter=Q(approved_at__isnull=False)),
+            rejected_count=Count('id', filter=Q(status='REJECTED')),
+            received_count=Count('lead_time'), lead_time=Sum('lead_time'),
+            last_order_at=Max('created_at'),
+        )
+        .order_by()
+    )
+    scorecards = [
+        SupplierScorecard(
+            supplier_id=group['supplier_id'], order_count=group['order_count'],
+            total_quantity=group['total_quantity'] or 0, approved_count=group['approved_count'],
+            rejected_count=group['rejected_count'], received_count=group['received_count'],
+            lead_time_seconds=group['lead_time'].total_seconds() if group['lead_time'] else 0,
+            last_order_at=group['last_order_at'],
+        )
+        for group in groups
+    ]
+    with transaction.atomic():
+        SupplierScorecard.objects.all().delete()
+        SupplierScorecard.objects.bulk_create(scorecards, batch_size=batch_size)
+    return len(scorecards)
@@ -1,7 +1,64 @@
 from rest_framework import serializers
-from .models import PurchaseOrder
+from .models import OrderTransition, PurchaseOrder
 
 class PurchaseOrderSerializer(serializers.ModelSerializer):
+    """
+    Serializer for purchase orders. supplier and item take ids; their names are
+    returned alongside (load them with select_related(*ORDER_RELATED)).
+    status and version only change through orders/workflow.py.
+    """
+    supplier_name = serializers.CharField(read_only=True)
+    item_name = serializers.CharField(read_only=True)
+
     class Meta:
         model = PurchaseOrder
-        fields = ['id', 'supplier', 'item', 'quantity', 'status', 'created_at', 'updated_at'] 
\ No newline at end of file
+        fields = [
+            'id', 'supplier', 'supplier_name', 'item', 'item_name', 'quantity', 'status', 'version',
+            'received_quantity', 'approved_at', 'received_at', 'lead_time', 'created_at', 'updated_at',
+        ]
+        read_only_fields = ['status', 'version', 'received_quantity', 'approved_at', 'received_at', 'lead_time']
+        extra_kwargs = {
+            'supplier': {'required': True, 'allow_null': False},
+            'item': {'required': True, 'allow_null': False},
+        }
+
+
+class OrderTransitionSerializer(serializers.ModelSerializer):
+    """
+    Serializer for the status history of a purchase order.
+    """
+    username = serializers.CharField(source='user.username', read_only=True, default=None)
+
+    class Meta:
+        model = OrderTransition
+        fields = ['id', 'action', 'from_status', 'to_status', 'version', 'username', 'note', 'created_at']
+
+
+class ReceiptLineSerializer(serializers.Serializer):
+    """
+    One order on a goods receipt. quantity defaults to everything outstanding;
+    version, when given, must match the order's current version.
+    """
+    order = serializers.IntegerField(min_value=1)
+    quantity = serializers.IntegerField(min_value=1, required=False, allow_null=True, default=None)
+    version = serializers.IntegerField(min_value=1, required=False, allow_null=True, default=None)
+
+
+class GoodsReceiptSerializer(serializers.Serializer):
+    """
+    A delivery of one or more purchase orders, e.g. a whole truck.
+    """
+    reference = serializers.CharField(max_length=100, required=False, allow_blank=True, default='')
+    lines = ReceiptLineSerializer(many=True, allow_empty=False, max_length=200)
+
+    def validate_lines(self, lines):
+        return [(line['order'], line['quantity'], line['version']) for line in lines]
+
+
+class ReplenishmentSerializer(serializers.Serializer):
+    """
+    Options for a replenishment run (see orders/replenishment.py).
+    """
+    lookback_days = serializers.IntegerField(min_value=1, max_value=365, default=30)
+    cover_days = serializers.IntegerField(min_value=1, max_value=365, default=14)
+    dry_run = serializers.BooleanField(default=False)
@@ -1,3 +1,600 @@
-from django.test import TestCase
+import threading
+from collections import Counter
+from datetime import timedelta
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection, models
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from io import StringIO
+from unittest import mock, skipUnless
+from rest_framework.test import APITestCase
+
+from core.models import AuditLog
+from inventory.models import InventoryItem, StockMovement
+from notifications.models import Notification
+from suppliers.models import Supplier, SupplierScorecard
+from . import bulk, receiving, replenishment, rollups, workflow
+from .backfill import backfill
+from .models import OrderDailyRollup, OrderTransition, PurchaseOrder
+
+User = get_user_model()
+
+
+class OrderReferenceBackfillTests(TestCase):
+    def setUp(self):
+        self.acme = Supplier.objects.create(name='Backfill Supplies')
+        self.drill = InventoryItem.objects.create(name='Backfill Drill', sku='BF-DRL-1')
+        self.helmet = InventoryItem.objects.create(name='Backfill Helmet', sku='BF-HLT-1')
+        Supplier.objects.create(name='Twin Traders')
+        Supplier.objects.create(name='twin traders')
+
+    def legacy_order(self, supplier, item):
+        return PurchaseOrder.objects.create(legacy_supplier=supplier, legacy_item=item)
+
+    def test_matches_names_skus_and_display_labels(self):
+        by_label = self.legacy_order('Backfill Supplies', 'Backfill Drill (SKU: BF-DRL-1)')
+        by_name = self.legacy_order('  backfill   supplies', 'backfill helmet')
+        by_sku = self.legacy_order('BACKFILL SUPPLIES', 'bf-hlt-1')
+        report = backfill(PurchaseOrder, Supplier, InventoryItem, batch_size=2)
+
+        self.assertEqual(report['updated'], 3)
+        for order, item in ((by_label, self.drill), (by_name, self.helmet), (by_sku, self.helmet)):
+            order.refresh_from_db()
+            self.assertEqual((order.supplier, order.item), (self.acme, item))
+
+    def test_reports_unmatched_and_ambiguous_values(self):
+        unknown = self.legacy_order('Nobody Ltd', 'Backfill Drill')
+        self.legacy_order('Twin Traders', 'Mystery Box')
+        out = StringIO()
+        call_command('backfill_order_references', stdout=out)
+
+        unknown.refresh_from_db()
+        self.assertIsNone(unknown.supplier)
+        self.assertEqual(unknown.item, self.drill)
+        self.assertEqual(unknown.supplier_name, 'Nobody Ltd')
+        self.assertIn("'Nobody Ltd': 1", out.getvalue())
+        self.assertIn("'Twin Traders': 1", out.getvalue())
+        self.assertIn("'Mystery Box': 1", out.getvalue())
+
+
+class PurchaseOrderForeignKeyTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='orderclerk', email='orderclerk@example.com', password='Testpass123'
+        )
+        self.client.force_authenticate(self.user)
+        self.suppliers = [Supplier.objects.create(name=f'FK Supplier {i}') for i in range(3)]
+        self.items = [InventoryItem.objects.create(name=f'FK Item {i}', sku=f'FK-{i}') for i in range(3)]
+        for supplier in self.suppliers:
+            for item in self.items:
+                PurchaseOrder.objects.create(supplier=supplier, item=item, quantity=1)
+
+    def test_list_filters_by_id_and_joins_names(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('order-list-create'), {
+                'supplier': self.suppliers[1].pk, 'item': self.items[2].pk,
+            })
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(response.data[0]['supplier_name'], 'FK Supplier 1')
+        self.assertEqual(response.data[0]['item_name'], 'FK Item 2')
+
+        response = self.client.get(reverse('order-list-create'), {'supplier': 'fk supplier 2'})
+        self.assertEqual(len(response.data), 3)
+
+    def test_create_requires_existing_references(self):
+        response = self.client.post(reverse('order-list-create'), {'supplier': self.suppliers[0].pk, 'quantity': 1})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('item', response.data)
+        response = self.client.post(reverse('order-list-create'), {
+            'supplier': self.suppliers[0].pk, 'item': self.items[0].pk, 'quantity': 4,
+        })
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['item_name'], 'FK Item 0')
+
+
+class PurchaseOrderBulkActionTests(APITestCase):
+    def setUp(self):
+        self.manager = User.objects.create_user(
+            username='bulkmanager', email='bulkmanager@example.com', password='Testpass123',
+            role=User.Roles.MANAGER,
+        )
+        self.client.force_authenticate(self.manager)
+        self.supplier = Supplier.objects.create(name='Bulk Supplier')
+        self.item = InventoryItem.objects.create(name='Bulk Item', sku='BULK-1')
+
+    def create_orders(self, count, status='PENDING'):
+        orders = PurchaseOrder.objects.bulk_create([
+            PurchaseOrder(supplier=self.supplier, item=self.item, status=status) for _ in range(count)
+        ])
+        rollups.rebuild(PurchaseOrder, OrderDailyRollup)
+        rollups.rebuild_scorecards(PurchaseOrder, SupplierScorecard)
+        return orders
+
+    def test_thousand_orders_in_a_handful_of_queries(self):
+        ids = [order.pk for order in self.create_orders(1000)]
+        AuditLog.objects.all().delete()
+        with CaptureQueriesContext(connection) as ctx, self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.post(reverse('order-bulk-action'), {'action': 'approve', 'ids': ids}, format='json')
+        statements = [q['sql'] for q in ctx.captured_queries if 'SAVEPOINT' not in q['sql']]
+        writes = Counter(
+            tuple(sql.replace('"', '').split()[:3:2] if sql.startswith('INSERT') else sql.replace('"', '').split()[:2])
+            for sql in statements if not sql.startswith('SELECT')
+        )
+        # SQLite splits the reads and inserts into batches of its parameter limit.
+        self.assertEqual(writes[('UPDATE', 'orders_purchaseorder')], 1)
+        # The PENDING rollup row is decremented, the APPROVED one created.
+        self.assertEqual(
+            [sql.split()[0] for sql in statements if 'orders_orderdailyrollup' in sql],
+            ['UPDATE', 'UPDATE', 'INSERT'],
+        )
+        # The supplier's scorecard gets a single increment.
+        self.assertEqual(writes[('UPDATE', 'suppliers_supplierscorecard')], 1)
+        self.assertEqual(
+            {write for write in writes if not {'orders_orderdailyrollup', 'suppliers_supplierscorecard'} & set(write)},
+            {('UPDATE', 'orders_purchaseorder'), ('INSERT', 'orders_ordertransition'),
+             ('INSERT', 'notifications_notification')},
+        )
+        self.assertLessEqual(len(statements), 30)
+        self.assertEqual(response.data['updated'], 1000)
+        self.assertEqual(PurchaseOrder.objects.filter(pk__in=ids, status='APPROVED').count(), 1000)
+        self.assertEqual(Notification.objects.filter(message__startswith='Purchase order #').count(), 1000)
+        # One deferred audit entry per order, written by the request's single bulk insert.
+        self.assertEqual(len(callbacks), 1000)
+        self.assertEqual(OrderTransition.objects.filter(order_id__in=ids, version=2, to_status='APPROVED').count(), 1000)
+
+    def test_per_id_outcomes(self):
+        pending, = self.create_orders(1)
+        rejected, = self.create_orders(1, status='REJECTED')
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('order-bulk-action'), {
+                'action': 'reject', 'ids': [pending.pk, rejected.pk, 999999],
+            }, format='json')
+        self.assertEqual(response.data['results'], [
+            {'id': pending.pk, 'outcome': 'updated', 'status': 'REJECTED'},
+            {'id': rejected.pk, 'outcome': 'invalid_state', 'status': 'REJECTED'},
+            {'id': 999999, 'outcome': 'not_found', 'status': None},
+        ])
+        entry = AuditLog.objects.get(object_type='Purchase Order', object_id=str(pending.pk))
+        self.assertEqual((entry.action, entry.user), ('REJECT', self.manager))
+
+    def test_filter_selects_orders(self):
+        other = Supplier.objects.create(name='Other Bulk Supplier')
+        self.create_orders(3)
+        PurchaseOrder.objects.create(supplier=other, item=self.item)
+        response = self.client.post(reverse('order-bulk-action'), {
+            'action': 'approve', 'filter': {'supplier': self.supplier.pk, 'status': 'pending'},
+        }, format='json')
+        self.assertEqual(response.data['updated'], 3)
+        self.assertTrue(PurchaseOrder.objects.filter(supplier=other, status='PENDING').exists())
+
+    def test_staff_cannot_bulk_approve(self):
+        staff = User.objects.create_user(username='bulkstaff', email='bulkstaff@example.com', password='Testpass123')
+        self.client.force_authenticate(staff)
+        response = self.client.post(reverse('order-bulk-action'), {'action': 'approve', 'ids': []}, format='json')
+        self.assertEqual(response.status_code, 403)
+
+
+class PurchaseOrderWorkflowTests(APITestCase):
+    def setUp(self):
+        self.manager = User.objects.create_user(
+            username='flowmanager', email='flowmanager@example.com', password='Testpass123',
+            role=User.Roles.MANAGER,
+        )
+        self.client.force_authenticate(self.manager)
+        self.supplier = Supplier.objects.create(name='Workflow Supplier')
+        self.item = InventoryItem.objects.create(name='Workflow Item', sku='FLOW-1')
+        self.order = PurchaseOrder.objects.create(supplier=self.supplier, item=self.item, quantity=3)
+
+    def act(self, action, **data):
+        return self.client.post(
+            reverse('order-approve-reject', args=[self.order.pk]), {'action': action, **data}, format='json',
+        )
+
+    def test_transitions_bump_version_and_record_history(self):
+        response = self.act('approve', version=1, note='Budget ok')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['status'], response.data['version']), ('APPROVED', 2))
+        self.assertEqual(self.act('receive').status_code, 400)
+        response = self.client.post(reverse('order-receive', args=[self.order.pk]), {}, format='json')
+        self.assertEqual(response.data['status'], 'RECEIVED')
+
+        response = self.client.get(reverse('order-transitions', args=[self.order.pk]))
+        self.assertEqual(
+            [(row['from_status'], row['to_status'], row['version'], row['username']) for row in response.data],
+            [('PENDING', 'APPROVED', 2, 'flowmanager'), ('APPROVED', 'RECEIVED', 3, 'flowmanager')],
+        )
+        self.assertEqual(response.data[0]['note'], 'Budget ok')
+
+    def test_stale_version_and_invalid_transitions_conflict(self):
+        self.assertEqual(self.act('reject', version=1).status_code, 200)
+        response = self.act('approve', version=1)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual((response.data['status'], response.data['version']), ('REJECTED', 2))
+        response = self.act('cancel')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(self.act('ship').status_code, 400)
+        self.order.refresh_from_db()
+        self.assertEqual((self.order.status, self.order.version), ('REJECTED', 2))
+        self.assertEqual(self.order.transitions.count(), 1)
+
+    def test_concurrent_change_between_read_and_update_conflicts(self):
+        read_state = workflow._current_state
+
+        def racing_read(order_id):
+            state = read_state(order_id)
+            if state == ('PENDING', 1):
+                # Another manager rejects the order right after this request read it.
+                PurchaseOrder.objects.filter(pk=order_id).update(status='REJECTED', version=2)
+            return state
+
+        with mock.patch.object(workflow, '_current_state', side_effect=racing_read):
+            with self.assertRaises(workflow.TransitionConflict) as ctx:
+                workflow.transition(self.order.pk, 'approve', user=self.manager)
+        self.assertEqual((ctx.exception.status, ctx.exception.version), ('REJECTED', 2))
+        self.assertFalse(self.order.transitions.exists())
+
+    def test_edits_are_versioned_and_limited_to_pending_orders(self):
+        url = reverse('order-detail', args=[self.order.pk])
+        response = self.client.patch(url, {'quantity': 5, 'version': 1, 'status': 'RECEIVED'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['quantity'], response.data['status'], response.data['version']), (5, 'PENDING', 2))
+        response = self.client.patch(url, {'quantity': 6, 'version': 1}, format='json')
+        self.assertEqual(response.status_code, 409)
+
+        self.act('approve')
+        response = self.client.patch(url, {'quantity': 7}, format='json')
+        self.assertEqual(response.status_code, 409)
+        self.order.refresh_from_db()
+        self.assertEqual((self.order.quantity, self.order.status, self.order.version), (5, 'APPROVED', 3))
+
+
+class GoodsReceiptTests(APITestCase):
+    def setUp(self):
+        self.clerk = User.objects.create_user(
+            username='receivingclerk', email='receivingclerk@example.com', password='Testpass123'
+        )
+        self.client.force_authenticate(self.clerk)
+        self.supplier = Supplier.objects.create(name='Receipt Supplier')
+        self.bolts = InventoryItem.objects.create(name='Receipt Bolts', sku='RCV-BOLT', quantity=5)
+        self.nuts = InventoryItem.objects.create(name='Receipt Nuts', sku='RCV-NUT', quantity=0)
+
+    def approved_order(self, item, quantity):
+        order = PurchaseOrder.objects.create(supplier=self.supplier, item=item, quantity=quantity)
+        return workflow.transition(order.pk, 'approve')
+
+    def test_partial_then_full_receipt(self):
+        order = self.approved_order(self.bolts, 10)
+        url = reverse('order-receive', args=[order.pk])
+        response = self.client.post(url, {'quantity': 4, 'version': 2, 'reference': 'DN-1'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['status'], response.data['received_quantity']), ('PARTIALLY_RECEIVED', 4))
+        self.assertIsNone(response.data['lead_time'])
+
+        self.assertEqual(self.client.post(url, {'quantity': 7}, format='json').status_code, 409)
+        response = self.client.post(url, {'reference': 'DN-2'}, format='json')
+        self.assertEqual((response.data['status'], response.data['received_quantity']), ('RECEIVED', 10))
+        self.assertIsNotNone(response.data['lead_time'])
+
+        self.bolts.refresh_from_db()
+        self.assertEqual(self.bolts.quantity, 15)
+        self.assertEqual(
+            list(order.stock_movements.values_list('quantity', 'kind', 'reference', 'user')),
+            [(4, 'RECEIPT', 'DN-1', self.clerk.pk), (6, 'RECEIPT', 'DN-2', self.clerk.pk)],
+        )
+        self.assertEqual(
+            list(order.transitions.values_list('to_status', flat=True)),
+            ['APPROVED', 'PARTIALLY_RECEIVED', 'RECEIVED'],
+        )
+        rows = self.client.get(reverse('supplier-analytics')).data['top_suppliers']
+        row, = [row for row in rows if row['supplier_id'] == self.supplier.pk]
+        self.assertEqual(row['avg_lead_time_days'], 0.0)
+
+    def test_delivery_books_all_lines_with_set_based_stock_update(self):
+        orders = [self.approved_order(self.bolts, 3), self.approved_order(self.bolts, 2), self.approved_order(self.nuts, 8)]
+        lines = [{'order': order.pk} for order in orders]
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(
+                reverse('order-goods-receipt'), {'reference': 'TRUCK-7', 'lines': lines}, format='json',
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([order['status'] for order in response.data['orders']], ['RECEIVED'] * 3)
+        stock_updates = [q['sql'] for q in ctx.captured_queries if q['sql'].startswith('UPDATE "inventory_inventoryitem"')]
+        self.assertEqual(len(stock_updates), 1)
+        self.assertEqual(
+            dict(InventoryItem.objects.filter(pk__in=[self.bolts.pk, self.nuts.pk]).values_list('sku', 'quantity')),
+            {'RCV-BOLT': 10, 'RCV-NUT': 8},
+        )
+        self.assertEqual(StockMovement.objects.filter(reference='TRUCK-7').count(), 3)
+
+    def test_delivery_is_all_or_nothing(self):
+        good = self.approved_order(self.bolts, 3)
+        pending = PurchaseOrder.objects.create(supplier=self.supplier, item=self.nuts, quantity=1)
+        response = self.client.post(reverse('order-goods-receipt'), {'lines': [
+            {'order': good.pk}, {'order': pending.pk}, {'order': 999999},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(
+            [(error['order'], error['status']) for error in response.data['errors']],
+            [(pending.pk, 'PENDING'), (999999, None)],
+        )
+        good.refresh_from_db()
+        self.bolts.refresh_from_db()
+        self.assertEqual((good.status, good.received_quantity, self.bolts.quantity), ('APPROVED', 0, 5))
+        self.assertFalse(StockMovement.objects.filter(purchase_order=good).exists())
+
+    def test_lost_race_rolls_back_stock(self):
+        order = self.approved_order(self.bolts, 3)
+        other = self.approved_order(self.nuts, 2)
+        # Someone cancels the second order after the delivery was read.
+        real_update = receiving.conditional_update
+
+        def racing_update(order_id, *args, **changes):
+            if order_id == other.pk:
+                PurchaseOrder.objects.filter(pk=order_id).update(status='CANCELLED', version=3)
+            return real_update(order_id, *args, **changes)
+
+        with mock.patch.object(receiving, 'conditional_update', side_effect=racing_update):
+            with self.assertRaises(receiving.ReceiptError):
+                receiving.receive_goods([(order.pk, None, None), (other.pk, None, None)])
+        order.refresh_from_db()
+        self.assertEqual((order.status, order.received_quantity), ('APPROVED', 0))
+
+
+class ReplenishmentTests(APITestCase):
+    def setUp(self):
+        InventoryItem.objects.update(reorder_level=0)
+        self.manager = User.objects.create_user(
+            username='replenisher', email='replenisher@example.com', password='Testpass123',
+            role=User.Roles.MANAGER,
+        )
+        self.client.force_authenticate(self.manager)
+        self.north = Supplier.objects.create(name='Replenish North')
+        self.south = Supplier.objects.create(name='Replenish South')
+
+    def item(self, sku, quantity, reorder_level, target_level=0, supplier=None):
+        return InventoryItem.objects.create(
+            name=sku, sku=sku, quantity=quantity, reorder_level=reorder_level,
+            target_level=target_level, preferred_supplier=supplier,
+        )
+
+    def test_quantities_grouping_and_repeat_runs(self):
+        targeted = self.item('RPL-TARGET', 2, 5, target_level=20, supplier=self.north)
+        consumed = self.item('RPL-USAGE', 4, 10, supplier=self.south)
+        StockMovement.objects.create(item=consumed, quantity=-30, kind=StockMovement.Kinds.STOCK_OUT)
+        covered = self.item('RPL-COVERED', 1, 5, supplier=self.north)
+        PurchaseOrder.objects.create(supplier=self.north, item=covered, quantity=4, status='APPROVED')
+        self.item('RPL-ORPHAN', 0, 3)
+        self.item('RPL-HEALTHY', 50, 5, supplier=self.north)
+
+        report = replenishment.replenish()
+        self.assertEqual(
+            {key: report[key] for key in ('scanned', 'covered', 'no_supplier', 'orders_created', 'quantity')},
+            {'scanned': 4, 'covered': 1, 'no_supplier': 1, 'orders_created': 2, 'quantity': 38},
+        )
+        self.assertEqual(
+            [(entry['supplier_id'], entry['quantity']) for entry in report['suppliers']],
+            [(self.north.pk, 18), (self.south.pk, 20)],
+        )
+        drafts = PurchaseOrder.objects.filter(pk__in=report['suppliers'][0]['order_ids'])
+        self.assertEqual(list(drafts.values_list('item', 'status')), [(targeted.pk, 'PENDING')])
+
+        self.assertEqual(replenishment.replenish()['orders_created'], 0)
+
+    def test_scan_is_constant_in_queries(self):
+        InventoryItem.objects.bulk_create([
+            InventoryItem(name=f'Bulk {i}', sku=f'RPL-BULK-{i}', quantity=0, reorder_level=5, preferred_supplier=self.north)
+            for i in range(500)
+        ])
+        with CaptureQueriesContext(connection) as ctx:
+            report = replenishment.replenish(dry_run=True)
+        self.assertEqual(report['orders_created'], 500)
+        # The low-stock items, their consumption and what is already on order.
+        self.assertEqual(len([q for q in ctx.captured_queries if 'SAVEPOINT' not in q['sql']]), 3)
+        self.assertFalse(PurchaseOrder.objects.filter(item__sku__startswith='RPL-BULK').exists())
+
+    def test_api_and_command(self):
+        self.item('RPL-API', 0, 5, supplier=self.north)
+        response = self.client.post(reverse('order-replenish'), {'dry_run': True}, format='json')
+        self.assertEqual((response.status_code, response.data['orders_created']), (200, 1))
+        out = StringIO()
+        call_command('replenish', stdout=out)
+        self.assertIn('Drafted 1 purchase orders for 1 suppliers', out.getvalue())
+        self.assertTrue(PurchaseOrder.objects.filter(item__sku='RPL-API', quantity=5).exists())
+
+        staff = User.objects.create_user(username='replstaff', email='replstaff@example.com', password='Testpass123')
+        self.client.force_authenticate(staff)
+        self.assertEqual(self.client.post(reverse('order-replenish'), {}, format='json').status_code, 403)
+
+
+class OrderRollupTests(APITestCase):
+    def setUp(self):
+        self.manager = User.objects.create_user(
+            username='rollupmanager', email='rollupmanager@example.com', password='Testpass123',
+            role=User.Roles.MANAGER,
+        )
+        self.client.force_authenticate(self.manager)
+        self.supplier = Supplier.objects.create(name='Rollup Supplier')
+        self.bolts = InventoryItem.objects.create(name='Rollup Bolts', sku='ROLL-BOLT')
+        self.nuts = InventoryItem.objects.create(name='Rollup Nuts', sku='ROLL-NUT')
+        rollups.rebuild(PurchaseOrder, OrderDailyRollup)
+
+    def snapshot(self):
+        rows = OrderDailyRollup.objects.values_list('day', 'status', 'supplier_id', 'item_id', 'count', 'quantity')
+        totals = OrderDailyRollup.objects.aggregate(approvals=models.Sum('approvals'))
+        return {row[:4]: row[4:] for row in rows if row[4]}, totals
+
+    def create(self, item, quantity):
+        response = self.client.post(reverse('order-list-create'), {
+            'supplier': self.supplier.pk, 'item': item.pk, 'quantity': quantity,
+        }, format='json')
+        return response.data['id']
+
+    def test_incremental_rollups_match_a_rebuild(self):
+        first, second, third = self.create(self.bolts, 4), self.create(self.bolts, 6), self.create(self.nuts, 3)
+        self.client.patch(reverse('order-detail', args=[second]), {'item': self.nuts.pk}, format='json')
+        self.client.post(reverse('order-approve-reject', args=[first]), {'action': 'approve'}, format='json')
+        self.client.post(reverse('order-receive', args=[first]), {'quantity': 1}, format='json')
+        self.client.post(reverse('order-bulk-action'), {'action': 'reject', 'ids': [third]}, format='json')
+        self.client.delete(reverse('order-detail', args=[second]))
+
+        incremental = self.snapshot()
+        rollups.rebuild(PurchaseOrder, OrderDailyRollup)
+        self.assertEqual(incremental, self.snapshot())
+        self.assertEqual(incremental[1]['approvals'], 1)
+
+    def test_dashboards_read_only_rollups(self):
+        self.create(self.bolts, 2)
+        with CaptureQueriesContext(connection) as ctx:
+            distribution = self.client.get(reverse('order-analytics')).data['status_distribution']
+            self.client.get(reverse('order-analytics-series'), {'interval': 'month'})
+        self.assertIn({'status': 'PENDING', 'count': PurchaseOrder.objects.filter(status='PENDING').count()}, distribution)
+        self.assertFalse([q for q in ctx.captured_queries if 'orders_purchaseorder' in q['sql']])
+
+    def test_series_buckets_top_items_and_latency(self):
+        today = timezone.localdate()
+        ids = [self.create(self.bolts, 5), self.create(self.bolts, 5), self.create(self.nuts, 1)]
+        PurchaseOrder.objects.filter(pk=ids[0]).update(created_at=timezone.now() - timedelta(days=10))
+        PurchaseOrder.objects.filter(pk=ids[1]).update(
+            created_at=timezone.now() - timedelta(hours=3), status='APPROVED', approved_at=timezone.now(),
+        )
+        rollups.rebuild(PurchaseOrder, OrderDailyRollup)
+
+        response = self.client.get(reverse('order-analytics-series'), {
+            'start': (today - timedelta(days=10)).isoformat(), 'end': today.isoformat(), 'supplier': self.supplier.pk,
+        })
+        self.assertEqual(
+            [(row['period'], row['count'], row['quantity']) for row in response.data['series']],
+            [(today - timedelta(days=10), 1, 5), (today, 2, 6)],
+        )
+        self.assertEqual(response.data['series'][1]['statuses'], {'APPROVED': 1, 'PENDING': 1})
+        self.assertEqual(
+            [(row['item_name'], row['quantity']) for row in response.data['top_items']],
+            [('Rollup Bolts', 10), ('Rollup Nuts', 1)],
+        )
+        self.assertEqual(response.data['approval_latency'], {'approvals': 1, 'average_hours': 3.0})
+
+        response = self.client.get(reverse('order-analytics-series'), {'interval': 'month', 'item': self.nuts.pk})
+        self.assertEqual([row['period'] for row in response.data['series']], [today.replace(day=1)])
+        self.assertEqual(self.client.get(reverse('order-analytics-series'), {'interval': 'year'}).status_code, 400)
+
+
+class SupplierScorecardTests(APITestCase):
+    def setUp(self):
+        self.manager = User.objects.create_user(
+            username='scoremanager', email='scoremanager@example.com', password='Testpass123',
+            role=User.Roles.MANAGER,
+        )
+        self.client.force_authenticate(self.manager)
+        self.fast = Supplier.objects.create(name='Scorecard Fast')
+        self.slow = Supplier.objects.create(name='Scorecard Slow')
+        self.item = InventoryItem.objects.create(name='Scorecard Widget', sku='SCORE-WID')
+
+    def create(self, supplier, quantity):
+        response = self.client.post(reverse('order-list-create'), {
+            'supplier': supplier.pk, 'item': self.item.pk, 'quantity': quantity,
+        }, format='json')
+        return response.data['id']
+
+    def snapshot(self):
+        return {
+            row[0]: row[1:] for row in SupplierScorecard.objects.filter(supplier__in=[self.fast, self.slow]).values_list(
+                'supplier_id', 'order_count', 'total_quantity', 'approved_count', 'rejected_count',
+                'received_count', 'lead_time_seconds', 'last_order_at',
+            )
+        }
+
+    def test_incremental_scorecards_match_a_rebuild(self):
+        first, second, third = self.create(self.fast, 4), self.create(self.fast, 6), self.create(self.slow, 3)
+        self.client.patch(reverse('order-detail', args=[second]), {'supplier': self.slow.pk}, format='json')
+        self.client.post(reverse('order-approve-reject', args=[first]), {'action': 'approve'}, format='json')
+        self.client.post(reverse('order-receive', args=[first]), {}, format='json')
+        self.client.post(reverse('order-bulk-action'), {'action': 'reject', 'ids': [third]}, format='json')
+        fourth = self.create(self.slow, 2)
+        self.client.delete(reverse('order-detail', args=[fourth]))
+
+        incremental = self.snapshot()
+        self.assertEqual(incremental[self.fast.pk][:4], (1, 4, 1, 0))
+        self.assertEqual(incremental[self.slow.pk][:4], (2, 9, 0, 1))
+        self.assertEqual(incremental[self.fast.pk][4], 1)
+        rollups.rebuild_scorecards(PurchaseOrder, SupplierScorecard)
+        rebuilt = self.snapshot()
+        for supplier_id, row in incremental.items():
+            self.assertEqual(row[:5], rebuilt[supplier_id][:5])
+            self.assertAlmostEqual(row[5], rebuilt[supplier_id][5], places=3)
+        # The deleted order was the slow supplier's latest; a rebuild moves last_order_at back.
+        self.assertGreaterEqual(incremental[self.slow.pk][6], rebuilt[self.slow.pk][6])
+
+    def test_analytics_sort_by_metric_without_reading_orders(self):
+        for supplier, quantity in ((self.fast, 1), (self.slow, 50), (self.slow, 50)):
+            self.create(supplier, quantity)
+        SupplierScorecard.objects.filter(pk=self.fast.pk).update(received_count=1, lead_time_seconds=86400)
+        SupplierScorecard.objects.filter(pk=self.slow.pk).update(received_count=2, lead_time_seconds=10 * 86400)
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('supplier-analytics'), {'sort': 'avg_lead_time_days', 'order': 'asc'})
+        self.assertFalse([q for q in ctx.captured_queries if 'orders_purchaseorder' in q['sql']])
+        ranked = [row['supplier_id'] for row in response.data['top_suppliers']]
+        self.assertLess(ranked.index(self.fast.pk), ranked.index(self.slow.pk))
+        row, = [row for row in response.data['top_suppliers'] if row['supplier_id'] == self.slow.pk]
+        self.assertEqual((row['supplier__name'], row['order_count'], row['avg_lead_time_days']), ('Scorecard Slow', 2, 5.0))
+
+        response = self.client.get(reverse('supplier-analytics'), {'sort': 'total_quantity', 'order': 'asc'})
+        ranked = [row['supplier_id'] for row in response.data['top_suppliers']]
+        self.assertLess(ranked.index(self.fast.pk), ranked.index(self.slow.pk))
+        response = self.client.get(reverse('supplier-analytics'), {'sort': 'total_quantity', 'limit': 1})
+        self.assertEqual(len(response.data['top_suppliers']), 1)
+        self.assertEqual(self.client.get(reverse('supplier-analytics'), {'sort': 'name'}).status_code, 400)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Concurrent transactions need a server database')
+class ConcurrentBulkActionTests(TransactionTestCase):
+    def rival_approve(self, ids):
+        try:
+            self.rival_results = bulk.apply_bulk_action(ids, 'approve')
+        finally:
+            connection.close()
+
+    def rollup_rows(self):
+        return (
+            sorted(OrderDailyRollup.objects.exclude(count=0).values_list(
+                'day', 'status', 'supplier_id', 'item_id', 'count', 'approvals',
+            )),
+            sorted(SupplierScorecard.objects.values_list('supplier_id', 'order_count', 'approved_count', 'rejected_count')),
+        )
+
+    def test_orders_moved_by_a_concurrent_request_are_not_counted_twice(self):
+        supplier = Supplier.objects.create(name='Race Supplier')
+        item = InventoryItem.objects.create(name='Race Item', sku='RACE-1')
+        ids = [order.pk for order in PurchaseOrder.objects.bulk_create([
+            PurchaseOrder(supplier=supplier, item=item) for _ in range(6)
+        ])]
+        rollups.rebuild(PurchaseOrder, OrderDailyRollup)
+        rollups.rebuild_scorecards(PurchaseOrder, SupplierScorecard)
+
+        # Another manager approves half the orders after this request has read them.
+        rival = threading.Thread(target=self.rival_approve, args=(ids[:3],))
+        status_changes = bulk.status_changes
+
+        def race(*args):
+            if threading.current_thread() is rival:
+                return status_changes(*args)
+            rival.start()
+            rival.join(timeout=1)  # Blocked by this request's row locks.
+            return status_changes(*args)
+
+        with mock.patch.object(bulk, 'status_changes', race):
+            results = bulk.apply_bulk_action(ids, 'approve')
+        rival.join()
+
+        self.assertEqual([result['outcome'] for result in results], ['updated'] * 6)
+        self.assertEqual([result['outcome'] for result in self.rival_results], ['invalid_state'] * 3)
+        self.assertEqual(OrderTransition.objects.filter(order_id__in=ids).count(), 6)
+        self.assertEqual(Notification.objects.filter(message__startswith='Purchase order #').count(), 6)
+        counted = self.rollup_rows()
+        rollups.rebuild(PurchaseOrder, OrderDailyRollup)
+        rollups.rebuild_scorecards(PurchaseOrder, SupplierScorecard)
+        self.assertEqual(counted, self.rollup_rows())
@@ -1,11 +1,21 @@
 from django.urls import path
-from .views import PurchaseOrderListCreateView, PurchaseOrderRetrieveUpdateDestroyView, PurchaseOrderApproveRejectView, OrderCSVExportView, OrderPDFExportView, order_analytics
+from .views import (
+    PurchaseOrderListCreateView, PurchaseOrderRetrieveUpdateDestroyView, PurchaseOrderApproveRejectView,
+    PurchaseOrderReceiveView, GoodsReceiptView, ReplenishmentView, OrderTransitionListView, PurchaseOrderBulkActionView,
+    OrderCSVExportView, OrderPDFExportView, OrderAnalyticsSeriesView, order_analytics,
+)
 
 urlpatterns = [
     path('', PurchaseOrderListCreateView.as_view(), name='order-list-create'),
     path('<int:pk>/', PurchaseOrderRetrieveUpdateDestroyView.as_view(), name='order-detail'),
     path('<int:pk>/action/', PurchaseOrderApproveRejectView.as_view(), name='order-approve-reject'),
+    path('<int:pk>/receive/', PurchaseOrderReceiveView.as_view(), name='order-receive'),
+    path('receive/', GoodsReceiptView.as_view(), name='order-goods-receipt'),
+    path('replenish/', ReplenishmentView.as_view(), name='order-replenish'),
+    path('<int:pk>/transitions/', OrderTransitionListView.as_view(), name='order-transitions'),
+    path('bulk-action/', PurchaseOrderBulkActionView.as_view(), name='order-bulk-action'),
     path('export/csv/', OrderCSVExportView.as_view(), name='order-export-csv'),
     path('export/pdf/', OrderPDFExportView.as_view(), name='order-export-pdf'),
     path('analytics/', order_analytics, name='order-analytics'),
+    path('analytics/series/', OrderAnalyticsSeriesView.as_view(), name='order-analytics-series'),
 ] 
\ No newline at end of file
@@ -2,99 +2,317 @@ from django.shortcuts import render
 from rest_framework import generics, permissions, status
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from .models import PurchaseOrder
-from .serializers import PurchaseOrderSerializer
-from django.http import HttpResponse
-import csv
+from .bulk import BULK_ACTIONS, apply_bulk_action
+from . import workflow
+from .models import OrderDailyRollup, OrderTransition, PurchaseOrder
+from .receiving import ReceiptError, receive_goods
+from .replenishment import replenish
+from .serializers import (
+    GoodsReceiptSerializer, OrderTransitionSerializer, PurchaseOrderSerializer, ReceiptLineSerializer,
+    ReplenishmentSerializer,
+)
 from django.db import models
-from django.template.loader import render_to_string
-from xhtml2pdf import pisa
+from django.db.models.functions import TruncMonth, TruncWeek
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from datetime import timedelta
+from inventory.models import InventoryItem
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated
+from core import audit, reports
+from users.permissions import role_permission
+from .reports import ORDERS_CSV, ORDERS_REPORT
 
 # Create your views here.
 
+# Relations read by PurchaseOrderSerializer and the exports, joined in the
+# same query as the orders.
+ORDER_RELATED = ('supplier', 'item')
+
+def filter_orders(queryset, params):
+    """
+    Apply the supplier, item and status filters shared by the order list and
+    bulk actions.
+    """
+    supplier = str(params.get('supplier') or '')
+    item = str(params.get('item') or '')
+    status_param = params.get('status')
+    # Ids use the foreign key indexes; text still searches by name.
+    if supplier:
+        if supplier.isdigit():
+            queryset = queryset.filter(supplier_id=supplier)
+        else:
+            queryset = queryset.filter(supplier__name__icontains=supplier)
+    if item:
+        if item.isdigit():
+            queryset = queryset.filter(item_id=item)
+        else:
+            queryset = queryset.filter(item__name__icontains=item)
+    if status_param:
+        queryset = queryset.filter(status__iexact=status_param)
+    return queryset
+
 class PurchaseOrderListCreateView(generics.ListCreateAPIView):
-    queryset = PurchaseOrder.objects.all().order_by('-created_at')
+    queryset = PurchaseOrder.objects.select_related(*ORDER_RELATED).order_by('-created_at')
     serializer_class = PurchaseOrderSerializer
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [role_permission(GET='orders.view', POST='orders.add')]
 
     def get_queryset(self):
-        queryset = super().get_queryset()
-        supplier = self.request.query_params.get('supplier')
-        item = self.request.query_params.get('item')
-        status_param = self.request.query_params.get('status')
-        if supplier:
-            queryset = queryset.filter(supplier__name__icontains=supplier)
-        if item:
-            queryset = queryset.filter(item__name__icontains=item)
-        if status_param:
-            queryset = queryset.filter(status__iexact=status_param)
-        return queryset
+        return filter_orders(super().get_queryset(), self.request.query_params)
 
 class PurchaseOrderRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = PurchaseOrder.objects.all()
+    queryset = PurchaseOrder.objects.select_related(*ORDER_RELATED)
     serializer_class = PurchaseOrderSerializer
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [role_permission(
+        GET='orders.view', PUT='orders.change', PATCH='orders.change', DELETE='orders.delete',
+    )]
+
+    def update(self, request, *args, **kwargs):
+        """
+        Edit a pending order. Send the "version" you last read to get a 409
+        instead of overwriting a change made since.
+        """
+        partial = kwargs.pop('partial', False)
+        version = request.data.get('version')
+        if version is not None and not str(version).isdigit():
+            return Response({'error': 'version must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
+        order = self.get_object()
+        serializer = self.get_serializer(order, data=request.data, partial=partial)
+        serializer.is_valid(raise_exception=True)
+        try:
+            order = workflow.edit(order, serializer.validated_data, version)
+        except workflow.TransitionError as exc:
+            return Response(exc.as_dict(), status=status.HTTP_409_CONFLICT)
+        return Response(self.get_serializer(order).data)
 
 class PurchaseOrderApproveRejectView(APIView):
-    permission_classes = [permissions.IsAuthenticated]
+    """
+    Move an order through the workflow.
+    Body: {"action": "approve"|"reject"|"cancel", "version": n, "note": "..."}.
+    Orders are received through the goods receipt endpoints.
+    "version" is optional; when given and the order has changed since, when
+    another request changes it first, or when the action is not allowed from
+    its status, the response is 409 with the order's current status and version.
+    """
+    permission_classes = [role_permission(POST='orders.approve')]
 
     def post(self, request, pk):
+        action = request.data.get('action')
+        if action not in workflow.MANUAL_ACTIONS:
+            return Response({'error': 'Invalid action.'}, status=status.HTTP_400_BAD_REQUEST)
+        version = request.data.get('version')
+        if version is not None and not str(version).isdigit():
+            return Response({'error': 'version must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
         try:
-            order = PurchaseOrder.objects.get(pk=pk)
+            order = workflow.transition(
+                pk, action, user=request.user, expected_version=version,
+                note=str(request.data.get('note') or '')[:255],
+            )
         except PurchaseOrder.DoesNotExist:
             return Response({'error': 'Order not found.'}, status=status.HTTP_404_NOT_FOUND)
+        except workflow.TransitionError as exc:
+            return Response(exc.as_dict(), status=status.HTTP_409_CONFLICT)
+        return Response(PurchaseOrderSerializer(order).data)
+
+class PurchaseOrderReceiveView(APIView):
+    """
+    Receive goods for one approved order and book them into stock.
+    Body: {"quantity": n, "version": n, "reference": "..."}, all optional;
+    without a quantity everything outstanding is received.
+    """
+    permission_classes = [role_permission(POST='orders.receive')]
+
+    def post(self, request, pk):
+        line = ReceiptLineSerializer(data={**request.data, 'order': pk})
+        line.is_valid(raise_exception=True)
+        reference = str(request.data.get('reference') or '')[:100]
+        try:
+            order, = receive_goods(
+                [(pk, line.validated_data['quantity'], line.validated_data['version'])],
+                user=request.user, reference=reference,
+            )
+        except ReceiptError as exc:
+            error, = exc.errors
+            if error['status'] is None:
+                return Response({'error': 'Order not found.'}, status=status.HTTP_404_NOT_FOUND)
+            return Response(
+                {key: error[key] for key in ('error', 'status', 'version')}, status=status.HTTP_409_CONFLICT,
+            )
+        return Response(PurchaseOrderSerializer(order).data)
+
+class GoodsReceiptView(APIView):
+    """
+    Receive a whole delivery in one transaction.
+    Body: {"reference": "...", "lines": [{"order": id, "quantity": n, "version": n}, ...]}.
+    Either every line is booked or none is; a 409 lists the lines that failed.
+    """
+    permission_classes = [role_permission(POST='orders.receive')]
+
+    def post(self, request):
+        serializer = GoodsReceiptSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            orders = receive_goods(
+                serializer.validated_data['lines'], user=request.user,
+                reference=serializer.validated_data['reference'],
+            )
+        except ReceiptError as exc:
+            return Response({'errors': exc.errors}, status=status.HTTP_409_CONFLICT)
+        return Response({
+            'reference': serializer.validated_data['reference'],
+            'orders': PurchaseOrderSerializer(orders, many=True).data,
+        })
+
+class ReplenishmentView(APIView):
+    """
+    Draft purchase orders for every low-stock item, like manage.py replenish.
+    Body: {"lookback_days": 30, "cover_days": 14, "dry_run": false}, all optional.
+    """
+    permission_classes = [role_permission(POST='orders.replenish')]
+
+    def post(self, request):
+        serializer = ReplenishmentSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        report = replenish(user=request.user, **serializer.validated_data)
+        return Response(report, status=status.HTTP_200_OK if report['dry_run'] else status.HTTP_201_CREATED)
+
+class OrderTransitionListView(generics.ListAPIView):
+    """
+    The status history of one purchase order, oldest first.
+    """
+    serializer_class = OrderTransitionSerializer
+    permission_classes = [role_permission(GET='orders.view')]
+
+    def get_queryset(self):
+        return OrderTransition.objects.filter(order_id=self.kwargs['pk']).select_related('user')
+
+class PurchaseOrderBulkActionView(APIView):
+    """
+    Approve or reject many purchase orders in one request.
+    Body: {"action": "approve"|"reject", "ids": [...]} or, instead of ids, a
+    "filter" object with the order list filters (supplier, item, status).
+    Only PENDING orders change; the response reports the outcome per id.
+    """
+    permission_classes = [role_permission(POST='orders.approve')]
+    max_orders = 5000
+
+    def post(self, request):
         action = request.data.get('action')
-        if action == 'approve':
-            order.status = 'APPROVED'
-        elif action == 'reject':
-            order.status = 'REJECTED'
-        else:
+        if action not in BULK_ACTIONS:
             return Response({'error': 'Invalid action.'}, status=status.HTTP_400_BAD_REQUEST)
-        order.save()
-        return Response(PurchaseOrderSerializer(order).data)
+        ids = request.data.get('ids')
+        order_filter = request.data.get('filter')
+        if ids is not None:
+            if not isinstance(ids, list) or not all(isinstance(pk, int) for pk in ids):
+                return Response({'error': 'ids must be a list of integers.'}, status=status.HTTP_400_BAD_REQUEST)
+        elif isinstance(order_filter, dict):
+            ids = list(
+                filter_orders(PurchaseOrder.objects.order_by('pk'), order_filter)
+                .values_list('pk', flat=True)[:self.max_orders + 1]
+            )
+        else:
+            return Response({'error': 'Provide ids or a filter.'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(ids) > self.max_orders:
+            return Response(
+                {'error': f'At most {self.max_orders} orders can be processed at once.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        results = apply_bulk_action(ids, action, user=request.user)
+        return Response({
+            'action': action,
+            'requested': len(results),
+            'updated': sum(result['outcome'] == 'updated' for result in results),
+            'results': results,
+        })
 
 class OrderCSVExportView(APIView):
     """
     API endpoint to export all purchase orders as a CSV file.
     """
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [role_permission(GET='orders.view')]
 
     def get(self, request):
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename="orders_export.csv"'
-        writer = csv.writer(response)
-        writer.writerow(['supplier', 'item', 'quantity', 'status', 'created_at', 'updated_at'])
-        for order in PurchaseOrder.objects.all():
-            writer.writerow([
-                order.supplier, order.item, order.quantity, order.status,
-                order.created_at.isoformat(), order.updated_at.isoformat()
-            ])
-        return response
+        return reports.download(ORDERS_CSV)
 
 class OrderPDFExportView(APIView):
     """
     Export all purchase orders as a PDF file.
     """
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [role_permission(GET='orders.view')]
 
     def get(self, request):
-        orders = PurchaseOrder.objects.all().order_by('-created_at')
-        html = render_to_string('orders_pdf_template.html', {'orders': orders})
-        response = HttpResponse(content_type='application/pdf')
-        response['Content-Disposition'] = 'attachment; filename="orders_report.pdf"'
-        pisa_status = pisa.CreatePDF(html, dest=response)
-        if pisa_status.err:
-            return HttpResponse('Error generating PDF', status=500)
-        return response
+        return reports.download(ORDERS_REPORT)
 
 @api_view(['GET'])
-@permission_classes([IsAuthenticated])
+@permission_classes([role_permission(GET='orders.view')])
 def order_analytics(request):
     status_counts = (
-        PurchaseOrder.objects.values('status')
+        OrderDailyRollup.objects.values('status')
         .order_by('status')
-        .annotate(count=models.Count('id'))
+        .annotate(count=models.Sum('count'))
+        .filter(count__gt=0)
     )
     return Response({'status_distribution': list(status_counts)})
+
+class OrderAnalyticsSeriesView(APIView):
+    """
+    Order counts and quantities over time, read from the daily rollups.
+    Query params: start and end (YYYY-MM-DD, default the last 30 days),
+    interval (day, week or month), supplier and item ids, top (default 10).
+    """
+    permission_classes = [role_permission(GET='orders.view')]
+    intervals = {'day': None, 'week': TruncWeek, 'month': TruncMonth}
+
+    def get(self, request):
+        params = request.query_params
+        today = timezone.localdate()
+        start = parse_date(params.get('start') or '') or today - timedelta(days=29)
+        end = parse_date(params.get('end') or '') or today
+        interval = params.get('interval', 'day')
+        if interval not in self.intervals or start > end:
+            return Response({'error': 'Invalid interval or date range.'}, status=status.HTTP_400_BAD_REQUEST)
+        rollups = OrderDailyRollup.objects.filter(day__range=(start, end))
+        for param in ('supplier', 'item'):
+            value = params.get(param)
+            if value:
+                if not value.isdigit():
+                    return Response({'error': f'{param} must be an id.'}, status=status.HTTP_400_BAD_REQUEST)
+                rollups = rollups.filter(**{f'{param}_id': value})
+
+        trunc = self.intervals[interval]
+        period = trunc('day', output_field=models.DateField()) if trunc else models.F('day')
+        series = {}
+        rows = (
+            rollups.annotate(period=period).values('period', 'status')
+            .annotate(count=models.Sum('count'), quantity=models.Sum('quantity'))
+            .order_by('period', 'status')
+        )
+        for row in rows:
+            bucket = series.setdefault(row['period'], {'period': row['period'], 'count': 0, 'quantity': 0, 'statuses': {}})
+            bucket['count'] += row['count']
+            bucket['quantity'] += row['quantity']
+            if row['count']:
+                bucket['statuses'][row['status']] = row['count']
+
+        top = params.get('top', '')
+        top = min(int(top), 100) if top.isdigit() and int(top) else 10
+        top_items = list(
+            rollups.exclude(item_id=0).values('item_id')
+            .annotate(count=models.Sum('count'), quantity=models.Sum('quantity'))
+            .filter(count__gt=0).order_by('-quantity', 'item_id')[:top]
+        )
+        names = dict(InventoryItem.objects.filter(pk__in=[row['item_id'] for row in top_items]).values_list('pk', 'name'))
+        for row in top_items:
+            row['item_name'] = names.get(row['item_id'])
+
+        latency = rollups.aggregate(approvals=models.Sum('approvals'), seconds=models.Sum('approval_seconds'))
+        approvals = latency['approvals'] or 0
+        return Response({
+            'start': start, 'end': end, 'interval': interval,
+            'series': list(series.values()),
+            'top_items': top_items,
+            'approval_latency': {
+                'approvals': approvals,
+                'average_hours': round(latency['seconds'] / approvals / 3600, 2) if approvals else None,
+            },
+        })
@@ -0,0 +1,172 @@
+"""
+The purchase order workflow.
+
+TRANSITIONS declares every action an order supports, the status it moves the
+order to and the statuses it may start from:
+
+    PENDING --approve--> APPROVED --receive_partial--> PARTIALLY_RECEIVED (repeatable)
+    APPROVED or PARTIALLY_RECEIVED --receive--> RECEIVED
+    PENDING --reject--> REJECTED
+    PENDING, APPROVED or PARTIALLY_RECEIVED --cancel--> CANCELLED
+
+The receive actions book stock as well and are applied by orders/receiving.py;
+MANUAL_ACTIONS are the ones a manager can apply directly.
+
+Each order carries a version that is bumped on every change. A transition is a
+single conditional UPDATE ... WHERE status = <expected> AND version = <n>, so
+two managers acting on the same order at once cannot overwrite each other: the
+second one updates no row and gets a TransitionConflict (HTTP 409) instead of
+a lock wait. Every applied transition is recorded in OrderTransition.
+"""
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from core import audit
+from .models import OrderTransition, PurchaseOrder
+from .rollups import RollupDelta
+
+# action -> (target status, statuses it may be applied to)
+TRANSITIONS = {
+    'approve': ('APPROVED', ('PENDING',)),
+    'reject': ('REJECTED', ('PENDING',)),
+    'cancel': ('CANCELLED', ('PENDING', 'APPROVED', 'PARTIALLY_RECEIVED')),
+    'receive_partial': ('PARTIALLY_RECEIVED', ('APPROVED', 'PARTIALLY_RECEIVED')),
+    'receive': ('RECEIVED', ('APPROVED', 'PARTIALLY_RECEIVED')),
+}
+MANUAL_ACTIONS = ('approve', 'reject', 'cancel')
+
+# Statuses in which the order itself (supplier, item, quantity) may be edited.
+EDITABLE_STATUSES = ('PENDING',)
+
+
+class TransitionError(Exception):
+    """Base class for rejected order changes; carries the order's current state."""
+
+    def __init__(self, message, status=None, version=None):
+        super().__init__(message)
+        self.status = status
+        self.version = version
+
+    def as_dict(self):
+        return {'error': str(self), 'status': self.status, 'version': self.version}
+
+
+class InvalidTransition(TransitionError):
+    """The action is not allowed from the order's current status."""
+
+
+class TransitionConflict(TransitionError):
+    """The order changed since the caller read it."""
+
+
+def allowed_actions(status):
+    """The actions that may be applied to an order in ``status``."""
+    return [action for action, (_, sources) in TRANSITIONS.items() if status in sources]
+
+
+def _current_state(order_id):
+    state = PurchaseOrder.objects.filter(pk=order_id).values_list('status', 'version').first()
+    if state is None:
+        raise PurchaseOrder.DoesNotExist(f'Purchase order {order_id} does not exist.')
+    return state
+
+
+def status_changes(target, now):
+    """Fields to write alongside a move to ``target``."""
+    changes = {'status': target}
+    if target == 'APPROVED':
+        changes['approved_at'] = now
+    return changes
+
+
+def conditional_update(order_id, status, version, /, **changes):
+    """Apply ``changes`` only if the order is still at ``status`` and ``version``."""
+    changes.setdefault('updated_at', timezone.now())
+    return PurchaseOrder.objects.filter(pk=order_id, status=status, version=version).update(
+        version=F('version') + 1, **changes,
+    )
+
+
+def _check_version(order_id, status, version, expected_version):
+    if expected_version is not None and int(expected_version) != version:
+        raise TransitionConflict(
+            f'Purchase order {order_id} was changed by someone else (now version {version}).',
+            status, version,
+        )
+
+
+def transition(order_id, action, user=None, expected_version=None, note=''):
+    """
+    Apply ``action`` to the order and return it reloaded.
+
+    ``expected_version`` is the version the caller based its decision on; when
+    omitted the version read here is used, which still detects a concurrent
+    change between this read and the update. Raises PurchaseOrder.DoesNotExist,
+    InvalidTransition or TransitionConflict.
+    """
+    if action not in TRANSITIONS:
+        raise InvalidTransition(f"Unknown action '{action}'.")
+    target, sources = TRANSITIONS[action]
+    with transaction.atomic():
+        status, version = _current_state(order_id)
+        _check_version(order_id, status, version, expected_version)
+        if status not in sources:
+            raise InvalidTransition(
+                f'Cannot {action} a purchase order that is {status.lower()}.', status, version,
+            )
+        if not conditional_update(order_id, status, version, **status_changes(target, timezone.now())):
+            status, version = _current_state(order_id)
+            raise TransitionConflict(
+                f'Purchase order {order_id} was changed by someone else (now {status.lower()}, version {version}).',
+                status, version,
+            )
+        OrderTransition.objects.create(
+            order_id=order_id, action=action, from_status=status, to_status=target,
+            version=version + 1, user=user if user and user.is_authenticated else None, note=note,
+        )
+        audit.record(
+            action.upper(), object_type='Purchase Order', object_id=str(order_id),
+            message=f'{target.title()} purchase order {order_id}', user=user,
+        )
+        order = PurchaseOrder.objects.select_related('supplier', 'item').get(pk=order_id)
+        delta = RollupDelta()
+        delta.move(order, status, target)
+        if target == 'APPROVED':
+            delta.approve(order, order.approved_at)
+        elif target == 'REJECTED':
+            delta.reject(order)
+        delta.apply()
+    return order
+
+
+def edit(order, changes, expected_version=None):
+    """
+    Save field ``changes`` to ``order`` with the same optimistic check as
+    transitions. Only orders in EDITABLE_STATUSES can be edited. The status
+    and version are never written from ``changes``.
+    """
+    changes = {name: value for name, value in changes.items() if name not in ('status', 'version')}
+    with transaction.atomic():
+        before = PurchaseOrder.objects.filter(pk=order.pk).first()
+        if before is None:
+            raise PurchaseOrder.DoesNotExist(f'Purchase order {order.pk} does not exist.')
+        status, version = before.status, before.version
+        _check_version(order.pk, status, version, expected_version)
+        if status not in EDITABLE_STATUSES:
+            raise InvalidTransition(
+                f'Cannot edit a purchase order that is {status.lower()}.', status, version,
+            )
+        if not conditional_update(order.pk, status, version, **changes):
+            status, version = _current_state(order.pk)
+            raise TransitionConflict(
+                f'Purchase order {order.pk} was changed by someone else (now version {version}).',
+                status, version,
+            )
+        order.refresh_from_db()
+        audit.record('UPDATE', order, object_type='Purchase Order', message=f'Updated purchase order: {order}')
+        delta = RollupDelta()
+        delta.add(before, sign=-1)
+        delta.add(order)
+        delta.apply()
+    return order
@@ -0,0 +1,69 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from orders.models import PurchaseOrder
+from suppliers.models import Supplier
+from .models import PaymentRequest, PaymentTransaction
+
+User = get_user_model()
+
+
+class PaymentQueryBudgetTests(APITestCase):
+    """
+    Query-count budgets for the payment endpoints. Each budget is independent of
+    the number of rows returned, so an N+1 regression fails the build.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='payer', email='payer@example.com', password='Testpass123'
+        )
+        self.client.force_authenticate(self.user)
+
+    def create_payments(self, count):
+        for i in range(count):
+            supplier = Supplier.objects.create(name=f'Budget Supplier {i}')
+            order = PurchaseOrder.objects.create(supplier=supplier, quantity=1)
+            payment = PaymentRequest.objects.create(
+                user=self.user, payment_type='ORDER_PAYMENT', amount=Decimal('10.00'),
+                description='Budget test', momo_phone='+233200000000',
+                order=order, supplier=supplier,
+            )
+            PaymentTransaction.objects.create(
+                payment_request=payment, transaction_type='PAYMENT', amount=Decimal('10.00'),
+                momo_transaction_id=f'TX-{payment.reference_id}', momo_phone='+233200000000',
+                status='COMPLETED', description='Budget test',
+            )
+
+    def test_request_list_budget(self):
+        self.create_payments(20)
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('payment-request-list-create'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 20)
+        self.assertTrue(all(row['supplier_name'] for row in response.data))
+
+    def test_request_detail_budget(self):
+        self.create_payments(1)
+        payment = PaymentRequest.objects.get()
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('payment-request-detail', args=[payment.pk]))
+        self.assertEqual(response.data['user_email'], 'payer@example.com')
+
+    def test_transaction_list_budget(self):
+        self.create_payments(20)
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('payment-transaction-list'))
+        self.assertEqual(len(response.data), 20)
+        self.assertTrue(all(row['payment_request_reference'] for row in response.data))
+
+    def test_analytics_budget(self):
+        self.create_payments(20)
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('payment-analytics'))
+        self.assertEqual(response.data['total_payments'], 20)
+        self.assertEqual(response.data['total_amount'], 0.0)
+        self.assertEqual(len(response.data['recent_payments']), 5)
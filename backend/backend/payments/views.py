@@ -5,6 +5,7 @@ from rest_framework import generics, permissions, status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
+from django.db import models
 from django.db.models import Q
 from django.utils import timezone
 from .models import PaymentRequest, PaymentTransaction, PaymentSettings
@@ -13,17 +14,24 @@ from .serializers import (
     PaymentRequestCreateSerializer, PaymentStatusUpdateSerializer
 )
 from core.email_service import EmailService
+from core import audit
+from users.permissions import role_permission, scope_queryset
 import uuid
 
+# Relations read by PaymentRequestSerializer, fetched in the same query as the
+# payment rows so list endpoints stay at a fixed number of queries.
+PAYMENT_REQUEST_RELATED = ('user', 'order', 'supplier')
+
 class PaymentRequestListCreateView(generics.ListCreateAPIView):
     """List and create payment requests"""
     
+    queryset = PaymentRequest.objects.select_related(*PAYMENT_REQUEST_RELATED)
     serializer_class = PaymentRequestSerializer
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [role_permission(GET='payments.view', POST='payments.add')]
     
     def get_queryset(self):
         """Filter payment requests by user and status"""
-        queryset = PaymentRequest.objects.filter(user=self.request.user)
+        queryset = scope_queryset(super().get_queryset(), self.request.user, 'payments.view_all', user=self.request.user)
         
         # Filter by status
         status_filter = self.request.query_params.get('status')
@@ -46,20 +54,29 @@ class PaymentRequestListCreateView(generics.ListCreateAPIView):
 class PaymentRequestDetailView(generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update, or delete a payment request"""
     
+    queryset = PaymentRequest.objects.select_related(*PAYMENT_REQUEST_RELATED)
     serializer_class = PaymentRequestSerializer
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [role_permission(
+        GET='payments.view', PUT='payments.change', PATCH='payments.change', DELETE='payments.delete',
+    )]
     
     def get_queryset(self):
-        return PaymentRequest.objects.filter(user=self.request.user)
+        return scope_queryset(super().get_queryset(), self.request.user, 'payments.view_all', user=self.request.user)
 
 class PaymentRequestStatusUpdateView(APIView):
     """Update payment request status"""
     
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [role_permission(POST='payments.change')]
     
     def post(self, request, pk):
         """Update payment status"""
-        payment_request = get_object_or_404(PaymentRequest, pk=pk, user=request.user)
+        payment_request = get_object_or_404(
+            scope_queryset(
+                PaymentRequest.objects.select_related(*PAYMENT_REQUEST_RELATED),
+                request.user, 'payments.view_all', user=request.user,
+            ),
+            pk=pk
+        )
         serializer = PaymentStatusUpdateSerializer(data=request.data)
         
         if serializer.is_valid():
@@ -76,6 +93,8 @@ class PaymentRequestStatusUpdateView(APIView):
             if new_status == 'COMPLETED':
                 payment_request.completed_at = timezone.now()
             
+            audit.tag(payment_request, 'STATUS_UPDATE',
+                      f'Payment {payment_request.reference_id} status changed from {old_status} to {new_status}')
             payment_request.save()
             
             # Send email notification for status change
@@ -94,53 +113,52 @@ class PaymentRequestStatusUpdateView(APIView):
 class PaymentTransactionListView(generics.ListAPIView):
     """List payment transactions"""
     
+    queryset = PaymentTransaction.objects.select_related('payment_request')
     serializer_class = PaymentTransactionSerializer
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [role_permission(GET='payments.view')]
     
     def get_queryset(self):
         """Filter transactions by payment request"""
+        queryset = scope_queryset(
+            super().get_queryset(), self.request.user, 'payments.view_all', payment_request__user=self.request.user
+        )
         payment_request_id = self.request.query_params.get('payment_request')
         if payment_request_id:
-            return PaymentTransaction.objects.filter(
-                payment_request_id=payment_request_id,
-                payment_request__user=self.request.user
-            )
-        return PaymentTransaction.objects.filter(payment_request__user=self.request.user)
+            queryset = queryset.filter(payment_request_id=payment_request_id)
+        return queryset
 
 class PaymentAnalyticsView(APIView):
     """Get payment analytics"""
     
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [role_permission(GET='payments.view')]
     
     def get(self, request):
         """Get payment statistics"""
-        user_payments = PaymentRequest.objects.filter(user=request.user)
-        
-        # Calculate statistics
-        total_payments = user_payments.count()
-        completed_payments = user_payments.filter(status='COMPLETED').count()
-        pending_payments = user_payments.filter(status='PENDING').count()
-        failed_payments = user_payments.filter(status='FAILED').count()
+        user_payments = scope_queryset(PaymentRequest.objects.all(), request.user, 'payments.view_all', user=request.user)
         
-        # Calculate total amounts
-        total_amount = user_payments.filter(status='COMPLETED').aggregate(
-            total=models.Sum('amount')
-        )['total'] or 0
+        # Calculate statistics and total amounts in a single aggregate query
+        stats = user_payments.aggregate(
+            total_payments=models.Count('id'),
+            completed_payments=models.Count('id', filter=Q(status='COMPLETED')),
+            pending_payments=models.Count('id', filter=Q(status='PENDING')),
+            failed_payments=models.Count('id', filter=Q(status='FAILED')),
+            total_amount=models.Sum('amount', filter=Q(status='COMPLETED')),
+        )
         
         # Payment type distribution
-        payment_types = user_payments.values('payment_type').annotate(
+        payment_types = user_payments.values('payment_type').order_by('payment_type').annotate(
             count=models.Count('id')
         )
         
         # Recent payments
-        recent_payments = user_payments.order_by('-created_at')[:5]
+        recent_payments = user_payments.select_related(*PAYMENT_REQUEST_RELATED).order_by('-created_at')[:5]
         
         return Response({
-            'total_payments': total_payments,
-            'completed_payments': completed_payments,
-            'pending_payments': pending_payments,
-            'failed_payments': failed_payments,
-            'total_amount': float(total_amount),
+            'total_payments': stats['total_payments'],
+            'completed_payments': stats['completed_payments'],
+            'pending_payments': stats['pending_payments'],
+            'failed_payments': stats['failed_payments'],
+            'total_amount': float(stats['total_amount'] or 0),
             'payment_types': list(payment_types),
             'recent_payments': PaymentRequestSerializer(recent_payments, many=True).data
         })
@@ -149,7 +167,7 @@ class PaymentSettingsView(generics.ListCreateAPIView):
     """Manage payment settings"""
     
     serializer_class = PaymentSettingsSerializer
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [role_permission(GET='payments.view', POST='payments.settings')]
     
     def get_queryset(self):
         return PaymentSettings.objects.filter(is_active=True)
@@ -161,7 +179,7 @@ class PaymentSettingsView(generics.ListCreateAPIView):
 class GeneratePaymentLinkView(APIView):
     """Generate MTN MoMo payment link"""
     
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [role_permission(POST='payments.add')]
     
     def post(self, request):
         """Generate payment link for MTN MoMo"""
@@ -209,7 +227,7 @@ class PaymentWebhookView(APIView):
         status = webhook_data.get('status')
         
         try:
-            payment_request = PaymentRequest.objects.get(reference_id=reference_id)
+            payment_request = PaymentRequest.objects.select_related('user').get(reference_id=reference_id)
             
             # Update payment status
             payment_request.status = status
@@ -218,6 +236,8 @@ class PaymentWebhookView(APIView):
             if status == 'COMPLETED':
                 payment_request.completed_at = timezone.now()
             
+            audit.tag(payment_request, 'STATUS_UPDATE',
+                      f'Payment {reference_id} status updated to {status} by webhook')
             payment_request.save()
             
             # Send email notification
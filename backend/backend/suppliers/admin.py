@@ -1,4 +1,5 @@
 from django.contrib import admin
-from .models import Supplier
+from .models import Supplier, SupplierScorecard
 
 admin.site.register(Supplier)
+admin.site.register(SupplierScorecard)
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class SuppliersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'suppliers'
+
+    def ready(self):
+        # Give every saved supplier (fixtures included) its natural key
+        from . import keys
+        keys.connect_signals()
@@ -0,0 +1,246 @@
+"""
+Fuzzy supplier deduplication.
+
+Names are normalized (accents, case and punctuation folded, legal suffixes
+such as "Ltd" or "Inc" dropped), emails lowercased and phones reduced to
+their last nine digits. Rather than comparing every pair of suppliers, each
+one is filed under a few blocking keys:
+
+- its normalized name, email and phone, whose blocks are duplicates outright
+  and are linked in a chain instead of pairwise;
+- a phonetic key (Soundex of the first two name words) and an n-gram key
+  (the first four letters of the name without spaces), whose members are
+  scored pairwise. Blocks larger than MAX_BLOCK_SIZE are too common to be
+  informative and are skipped.
+
+A pair's score is the Dice similarity of the names' letter trigrams, raised
+to at least 0.9 when they share an email or phone. Pairs scoring at least the
+threshold are joined into clusters; merge_suppliers() folds a cluster into
+one supplier.
+"""
+import re
+import unicodedata
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from core import audit
+from inventory.models import InventoryItem
+from orders import rollups
+from orders.models import PurchaseOrder
+from payments.models import PaymentRequest
+from .models import Supplier, SupplierScorecard
+
+THRESHOLD = 0.8
+MAX_BLOCK_SIZE = 200
+CONTACT_MATCH_SCORE = 0.9
+LEGAL_WORDS = frozenset({
+    'the', 'and', 'co', 'company', 'corp', 'corporation', 'inc', 'incorporated', 'llc', 'llp', 'ltd',
+    'limited', 'plc', 'pty', 'gmbh', 'sa', 'srl', 'bv', 'enterprise', 'enterprises',
+})
+SOUNDEX_CODES = {
+    **dict.fromkeys('bfpv', '1'), **dict.fromkeys('cgjkqsxz', '2'), **dict.fromkeys('dt', '3'),
+    'l': '4', **dict.fromkeys('mn', '5'), 'r': '6',
+}
+# Contact fields copied from duplicates onto a survivor that has them blank.
+CONTACT_FIELDS = ('contact_name', 'contact_email', 'contact_phone', 'address')
+
+
+def normalize_name(name):
+    folded = unicodedata.normalize('NFKD', name or '').encode('ascii', 'ignore').decode('ascii').lower()
+    words = re.sub(r'[^a-z0-9]+', ' ', folded.replace('&', ' and ')).split()
+    return ' '.join([word for word in words if word not in LEGAL_WORDS] or words)
+
+
+def normalize_email(email):
+    return (email or '').strip().lower()
+
+
+def normalize_phone(phone):
+    """The last nine digits, which drops country and trunk prefixes."""
+    digits = re.sub(r'\D', '', phone or '')
+    return digits[-9:] if len(digits) >= 7 else ''
+
+
+def soundex(word):
+    if not word[:1].isalpha():
+        return word
+    code, previous = word[0].upper(), SOUNDEX_CODES.get(word[0], '')
+    for letter in word[1:]:
+        digit = SOUNDEX_CODES.get(letter, '')
+        if digit and digit != previous:
+            code += digit
+            if len(code) == 4:
+                break
+        if letter not in 'hw':
+            previous = digit
+    return code.ljust(4, '0')
+
+
+def trigrams(name):
+    padded = f'  {name} '
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+class Record:
+    """The normalized fields of one supplier."""
+    __slots__ = ('pk', 'name', 'email', 'phone', 'grams')
+
+    def __init__(self, pk, name, email, phone):
+        self.pk = pk
+        self.name = normalize_name(name)
+        self.email = normalize_email(email)
+        self.phone = normalize_phone(phone)
+        self.grams = trigrams(self.name)
+
+    def exact_keys(self):
+        keys = [f'name:{self.name}'] if self.name else []
+        if self.email:
+            keys.append(f'email:{self.email}')
+        if self.phone:
+            keys.append(f'phone:{self.phone}')
+        return keys
+
+    def fuzzy_keys(self):
+        words = self.name.split()
+        if not words:
+            return []
+        return [
+            'sound:' + ' '.join(soundex(word) for word in words[:2]),
+            'gram:' + self.name.replace(' ', '')[:4],
+        ]
+
+
+def score(a, b):
+    """Similarity of two records between 0 and 1."""
+    similarity = 2 * len(a.grams & b.grams) / (len(a.grams) + len(b.grams)) if a.grams or b.grams else 0.0
+    if (a.email and a.email == b.email) or (a.phone and a.phone == b.phone):
+        similarity = max(similarity, CONTACT_MATCH_SCORE)
+    return similarity
+
+
+class _Clusters:
+    """Union-find over supplier ids, remembering each cluster's best pair score."""
+
+    def __init__(self):
+        self.parent = {}
+        self.scores = {}
+
+    def find(self, pk):
+        root = self.parent.setdefault(pk, pk)
+        while root != self.parent[root]:
+            root = self.parent[root]
+        while pk != root:
+            self.parent[pk], pk = root, self.parent[pk]
+        return root
+
+    def join(self, a, b, similarity):
+        root_a, root_b = self.find(a), self.find(b)
+        best = max(self.scores.pop(root_a, 0), self.scores.pop(root_b, 0), similarity)
+        if root_a != root_b:
+            self.parent[root_b] = root_a
+        self.scores[root_a] = best
+
+    def groups(self):
+        members = defaultdict(list)
+        for pk in self.parent:
+            members[self.find(pk)].append(pk)
+        return [(sorted(pks), self.scores[root]) for root, pks in members.items()]
+
+
+def find_duplicates(threshold=THRESHOLD, queryset=None, batch_size=2000):
+    """
+    Cluster likely duplicate suppliers. Returns a list, best score first, of
+    {'supplier_ids', 'score', 'survivor'} where survivor is the suggested
+    supplier to keep: the one with the most orders, then the oldest.
+    """
+    queryset = Supplier.objects.all() if queryset is None else queryset
+    blocks = defaultdict(list)
+    rows = queryset.order_by('pk').values_list('pk', 'name', 'contact_email', 'contact_phone')
+    for pk, name, email, phone in rows.iterator(chunk_size=batch_size):
+        record = Record(pk, name, email, phone)
+        for key in record.exact_keys() + record.fuzzy_keys():
+            blocks[key].append(record)
+
+    clusters = _Clusters()
+    compared = set()
+    for key, members in blocks.items():
+        if len(members) < 2:
+            continue
+        if not key.startswith(('sound:', 'gram:')):
+            # Same normalized name, email or phone: a chain links them all.
+            for previous, record in zip(members, members[1:]):
+                similarity = score(previous, record)
+                if similarity >= threshold:
+                    clusters.join(previous.pk, record.pk, similarity)
+            continue
+        if len(members) > MAX_BLOCK_SIZE:
+            continue
+        for i, a in enumerate(members):
+            for b in members[i + 1:]:
+                if (a.pk, b.pk) in compared:
+                    continue
+                compared.add((a.pk, b.pk))
+                similarity = score(a, b)
+                if similarity >= threshold:
+                    clusters.join(a.pk, b.pk, similarity)
+
+    groups = clusters.groups()
+    order_counts = dict(SupplierScorecard.objects.values_list('supplier_id', 'order_count')) if groups else {}
+    results = [
+        {
+            'supplier_ids': pks,
+            'score': round(best, 3),
+            'survivor': min(pks, key=lambda pk: (-order_counts.get(pk, 0), pk)),
+        }
+        for pks, best in groups
+    ]
+    results.sort(key=lambda cluster: (-cluster['score'], cluster['supplier_ids'][0]))
+    return results
+
+
+def merge_suppliers(survivor, duplicate_ids, user=None):
+    """
+    Fold the ``duplicate_ids`` suppliers into ``survivor``: their orders,
+    payment requests and preferred items are repointed with one UPDATE each,
+    their rollups and scorecards are added to the survivor's, blank contact
+    fields are filled from them and they are deleted. Returns the counts moved.
+    """
+    duplicate_ids = sorted({pk for pk in duplicate_ids if pk != survivor.pk})
+    with transaction.atomic():
+        duplicates = list(Supplier.objects.select_for_update().filter(pk__in=duplicate_ids).order_by('pk'))
+        duplicate_ids = [duplicate.pk for duplicate in duplicates]
+        now = timezone.now()
+        moved = {
+            'orders': PurchaseOrder.objects.filter(supplier_id__in=duplicate_ids).update(
+                supplier=survivor, version=F('version') + 1, updated_at=now,
+            ),
+            'payments': PaymentRequest.objects.filter(supplier_id__in=duplicate_ids).update(
+                supplier=survivor, updated_at=now,
+            ),
+            'items': InventoryItem.objects.filter(preferred_supplier_id__in=duplicate_ids).update(
+                preferred_supplier=survivor, updated_at=now,
+            ),
+        }
+        rollups.merge_suppliers(survivor.pk, duplicate_ids)
+
+        filled = []
+        for field in CONTACT_FIELDS:
+            if not getattr(survivor, field):
+                value = next((getattr(duplicate, field) for duplicate in duplicates if getattr(duplicate, field)), '')
+                if value:
+                    setattr(survivor, field, value)
+                    filled.append(field)
+        Supplier.objects.filter(pk__in=duplicate_ids).delete()
+        # Saving also hands the survivor a natural key freed by the duplicates.
+        survivor.save(update_fields=[*filled, 'name_key', 'updated_at'])
+        moved['merged'] = len(duplicates)
+        if duplicates:
+            audit.record(
+                'MERGE', survivor, object_type='Supplier',
+                message=f"Merged {', '.join(duplicate.name for duplicate in duplicates)} into {survivor.name}",
+                user=user,
+            )
+    return moved
@@ -0,0 +1,216 @@
+"""
+Bulk supplier import from CSV.
+
+The file is streamed in chunks of CHUNK_SIZE rows. Each chunk is validated
+in one pass (names, emails, phones and field lengths), matched to existing
+suppliers with a single query on their natural key (the normalized name,
+see suppliers/keys.py) or, failing that, their email, and written with one
+bulk_create(update_conflicts=True) upsert on name_key. Blank cells keep the
+existing values. Rejected rows go to an error CSV with their row number and
+reasons while the rest of the file is imported; each chunk commits on its
+own, so a file that turns out to be unreadable halfway keeps its earlier
+chunks.
+
+The columns are those of the supplier CSV export, so an export can be edited
+and imported back (its created_at and updated_at columns are ignored).
+"""
+import csv
+import re
+import threading
+from itertools import islice
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import connection, transaction
+from django.db.models import Q
+from django.db.models.functions import Lower
+from django.utils import timezone
+from django.utils.text import get_valid_filename
+
+from core import audit
+from .dedupe import normalize_name
+from .models import Supplier, SupplierImport
+
+CHUNK_SIZE = 1000
+FIELDS = ('name', 'contact_name', 'contact_email', 'contact_phone', 'address')
+PHONE_RE = re.compile(r'^\+?[\d\s().-]+$')
+
+
+class ImportFailed(Exception):
+    """The file as a whole cannot be imported."""
+
+
+def import_dir():
+    return Path(getattr(settings, 'SUPPLIER_IMPORT_DIR', Path(settings.MEDIA_ROOT) / 'supplier_imports'))
+
+
+def source_path(job):
+    # The import_suppliers command records absolute paths, which Path joins keep.
+    return import_dir() / job.path
+
+
+def save_upload(upload, user=None):
+    """Store an uploaded file under SUPPLIER_IMPORT_DIR and return its pending import."""
+    job = SupplierImport.objects.create(
+        file_name=upload.name[:255], user=user if user and user.is_authenticated else None,
+    )
+    job.path = f'{job.pk}-{get_valid_filename(Path(upload.name).name)}'
+    import_dir().mkdir(parents=True, exist_ok=True)
+    with open(source_path(job), 'wb') as destination:
+        for chunk in upload.chunks():
+            destination.write(chunk)
+    job.save(update_fields=['path'])
+    return job
+
+
+def clean_row(row):
+    """The row's supplier fields, or ValidationError listing every problem."""
+    values = {field: ' '.join((row.get(field) or '').split()) for field in FIELDS}
+    values['address'] = (row.get('address') or '').strip()
+    problems = []
+    if not values['name']:
+        problems.append('name is required.')
+    elif not normalize_name(values['name']):
+        problems.append('name has no letters or digits.')
+    for field in FIELDS:
+        limit = Supplier._meta.get_field(field).max_length
+        if limit and len(values[field]) > limit:
+            problems.append(f'{field} is longer than {limit} characters.')
+    if values['contact_email']:
+        values['contact_email'] = values['contact_email'].lower()
+        try:
+            validate_email(values['contact_email'])
+        except ValidationError:
+            problems.append(f"contact_email '{values['contact_email']}' is not a valid email address.")
+    if values['contact_phone']:
+        digits = sum(character.isdigit() for character in values['contact_phone'])
+        if not PHONE_RE.match(values['contact_phone']) or not 7 <= digits <= 15:
+            problems.append(f"contact_phone '{values['contact_phone']}' is not a valid phone number.")
+    if problems:
+        raise ValidationError(problems)
+    return values
+
+
+def upsert(rows):
+    """
+    Create or update the suppliers for validated ``rows`` (field dicts) with
+    one read and one write. Later rows for the same supplier overwrite the
+    cells they fill in. Returns (created, updated).
+    """
+    by_key = {}
+    for values in rows:
+        key = normalize_name(values['name'])
+        earlier = by_key.get(key)
+        by_key[key] = {field: values[field] or earlier[field] for field in FIELDS} if earlier else values
+    emails = {values['contact_email'] for values in by_key.values() if values['contact_email']}
+    existing = list(
+        Supplier.objects.annotate(email_key=Lower('contact_email'))
+        .filter(Q(name_key__in=by_key) | Q(email_key__in=emails))
+        .only('name_key', *FIELDS)
+    )
+    by_name = {supplier.name_key: supplier for supplier in existing}
+    by_email = {}
+    for supplier in existing:
+        if supplier.contact_email:
+            by_email.setdefault(supplier.contact_email.lower(), supplier)
+
+    suppliers, matched = {}, set()
+    for key, values in by_key.items():
+        match = by_name.get(key) or by_email.get(values['contact_email'])
+        if match is not None:
+            # A supplier matched by email keeps its key even if the name differs.
+            key = match.name_key
+            values = {field: values[field] or getattr(match, field) for field in FIELDS}
+            matched.add(key)
+        suppliers[key] = Supplier(name_key=key, **values)
+    Supplier.objects.bulk_create(
+        suppliers.values(), update_conflicts=True, unique_fields=['name_key'], update_fields=[*FIELDS, 'updated_at'],
+    )
+    return len(suppliers) - len(matched), len(matched)
+
+
+class ErrorFile:
+    """The CSV of rejected rows, created with the first one."""
+
+    def __init__(self, job, fieldnames):
+        self.job = job
+        self.fieldnames = [name for name in fieldnames if name]
+        self.file = self.writer = None
+
+    def write(self, number, row, problems):
+        if self.file is None:
+            self.job.error_path = f'{self.job.pk}-errors.csv'
+            self.file = open(import_dir() / self.job.error_path, 'w', newline='', encoding='utf-8')
+            self.writer = csv.writer(self.file)
+            self.writer.writerow(['row', 'errors', *self.fieldnames])
+        self.writer.writerow([number, ' '.join(problems), *(row.get(name) or '' for name in self.fieldnames)])
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+
+
+def run(job, chunk_size=CHUNK_SIZE):
+    """Import ``job``'s file, recording progress and the outcome on the job."""
+    job.status = SupplierImport.Statuses.RUNNING
+    job.save(update_fields=['status'])
+    errors = None
+    try:
+        with open(source_path(job), newline='', encoding='utf-8-sig') as source:
+            reader = csv.DictReader(source)
+            if 'name' not in (reader.fieldnames or []):
+                raise ImportFailed("The file has no 'name' column.")
+            import_dir().mkdir(parents=True, exist_ok=True)
+            errors = ErrorFile(job, reader.fieldnames)
+            # Row 1 is the header, as in a spreadsheet.
+            numbered = enumerate(reader, start=2)
+            while chunk := list(islice(numbered, chunk_size)):
+                valid = []
+                for number, row in chunk:
+                    try:
+                        valid.append(clean_row(row))
+                    except ValidationError as exc:
+                        errors.write(number, row, exc.messages)
+                        job.error_count += 1
+                if valid:
+                    with transaction.atomic():
+                        created, updated = upsert(valid)
+                    job.created_count += created
+                    job.updated_count += updated
+                job.total_rows += len(chunk)
+                job.save(update_fields=['total_rows', 'created_count', 'updated_count', 'error_count', 'error_path'])
+        job.status = SupplierImport.Statuses.COMPLETED
+    except (ImportFailed, UnicodeDecodeError, csv.Error, OSError) as exc:
+        job.status = SupplierImport.Statuses.FAILED
+        job.error_message = str(exc)
+    finally:
+        if errors is not None:
+            errors.close()
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'error_message', 'finished_at', 'error_path'])
+    audit.record(
+        'IMPORT', job,
+        message=(
+            f'Imported suppliers from {job.file_name}: {job.created_count} created, '
+            f'{job.updated_count} updated, {job.error_count} rejected'
+            + (f' ({job.error_message})' if job.error_message else '')
+        ),
+        user=job.user,
+    )
+    return job
+
+
+def _run_in_background(job_id):
+    try:
+        run(SupplierImport.objects.get(pk=job_id))
+    finally:
+        connection.close()
+
+
+def start(job):
+    """Run ``job`` in a background thread once the current transaction commits."""
+    transaction.on_commit(
+        lambda: threading.Thread(target=_run_in_background, args=(job.pk,), daemon=True).start()
+    )
@@ -0,0 +1,59 @@
+"""
+Natural keys for suppliers.
+
+Every supplier carries a unique name_key, its normalized name (see
+suppliers/dedupe.py), so "ACME Supplies Ltd." and "Acme Supplies" share one
+key and imports can upsert on it. A supplier whose key is already taken, a
+duplicate waiting to be merged, gets the key with a "#<suffix>" and moves to
+the plain key once it is free again.
+"""
+import uuid
+
+from django.db.models.signals import pre_save
+
+from .dedupe import normalize_name
+
+
+def base_key(name_key):
+    return name_key.split('#', 1)[0]
+
+
+def unique_name_key(model, name, pk=None, suffix=None):
+    key = normalize_name(name)
+    if model.objects.filter(name_key=key).exclude(pk=pk).exists():
+        key = f'{key}#{suffix or uuid.uuid4().hex[:8]}'
+    return key
+
+
+def assign_name_key(sender, instance, update_fields=None, **kwargs):
+    key = normalize_name(instance.name)
+    current = instance.name_key
+    if current == key:
+        return
+    if current and base_key(current) == key:
+        # A suffixed duplicate takes the plain key once nobody else holds it.
+        if sender.objects.filter(name_key=key).exclude(pk=instance.pk).exists():
+            return
+    else:
+        key = unique_name_key(sender, instance.name, instance.pk)
+    instance.name_key = key
+    if update_fields is not None and 'name_key' not in update_fields and instance.pk:
+        # Saved with update_fields, which would otherwise leave the key out.
+        sender.objects.filter(pk=instance.pk).update(name_key=key)
+
+
+def connect_signals():
+    from .models import Supplier
+
+    pre_save.connect(assign_name_key, sender=Supplier, dispatch_uid='supplier-name-key')
+
+
+def backfill(Supplier):
+    """Set every supplier's key, oldest first. Takes the model so it can run from a migration."""
+    taken = set()
+    suppliers = list(Supplier.objects.order_by('pk'))
+    for supplier in suppliers:
+        key = normalize_name(supplier.name)
+        supplier.name_key = f'{key}#{supplier.pk}' if key in taken else key
+        taken.add(key)
+    Supplier.objects.bulk_update(suppliers, ['name_key'], batch_size=500)
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from suppliers import dedupe
+from suppliers.models import Supplier
+
+
+class Command(BaseCommand):
+    help = 'List clusters of likely duplicate suppliers, optionally merging them'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--threshold', type=float, default=dedupe.THRESHOLD, help='Minimum name similarity (0-1) for a match',
+        )
+        parser.add_argument(
+            '--merge', action='store_true', help='Merge each cluster into its suggested surviving supplier',
+        )
+
+    def handle(self, *args, **options):
+        clusters = dedupe.find_duplicates(options['threshold'])
+        for cluster in clusters:
+            names = dict(Supplier.objects.filter(pk__in=cluster['supplier_ids']).values_list('pk', 'name'))
+            survivor = cluster['survivor']
+            self.stdout.write(
+                f"  {cluster['score']:.2f}  {names[survivor]} ({survivor}) <- "
+                + ', '.join(f'{names[pk]} ({pk})' for pk in cluster['supplier_ids'] if pk != survivor)
+            )
+            if options['merge']:
+                dedupe.merge_suppliers(Supplier.objects.get(pk=survivor), cluster['supplier_ids'])
+        verb = 'Merged' if options['merge'] else 'Found'
+        self.stdout.write(self.style.SUCCESS(f'✅ {verb} {len(clusters)} clusters of duplicate suppliers'))
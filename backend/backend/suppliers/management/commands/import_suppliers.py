@@ -0,0 +1,29 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from suppliers import imports
+from suppliers.models import SupplierImport
+
+
+class Command(BaseCommand):
+    help = 'Import suppliers from a CSV file, updating those with the same normalized name or email'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV file with the supplier export columns')
+        parser.add_argument('--chunk-size', type=int, default=imports.CHUNK_SIZE, help='Rows per upsert')
+
+    def handle(self, *args, **options):
+        path = Path(options['path']).resolve()
+        if not path.is_file():
+            raise CommandError(f'File not found: {path}')
+        job = SupplierImport.objects.create(file_name=path.name, path=str(path))
+        imports.run(job, chunk_size=options['chunk_size'])
+        if job.status == SupplierImport.Statuses.FAILED:
+            raise CommandError(f'❌ Import failed: {job.error_message}')
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Imported {job.total_rows} rows: {job.created_count} created, {job.updated_count} updated, '
+            f'{job.error_count} rejected'
+        ))
+        if job.error_path:
+            self.stdout.write(f'  Rejected rows: {imports.import_dir() / job.error_path}')
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from orders.models import PurchaseOrder
+from orders.rollups import rebuild_scorecards
+from suppliers.models import SupplierScorecard
+
+
+class Command(BaseCommand):
+    help = 'Recompute the supplier scorecards from the purchase orders'
+
+    def handle(self, *args, **options):
+        count = rebuild_scorecards(PurchaseOrder, SupplierScorecard)
+        if options['verbosity']:
+            self.stdout.write(self.style.SUCCESS(f'✅ Rebuilt {count} supplier scorecards'))
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.4 on 2026-10-19 13:52
+
+import django.db.models.deletion
+import django.db.models.expressions
+import django.db.models.functions.comparison
+from django.db import migrations, models
+
+
+def build_scorecards(apps, schema_editor):
+    from orders.rollups import rebuild_scorecards
+
+    rebuild_scorecards(apps.get_model('orders', 'PurchaseOrder'), apps.get_model('suppliers', 'SupplierScorecard'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('suppliers', '0001_initial'),
+        ('orders', '0005_order_daily_rollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SupplierScorecard',
+            fields=[
+                ('supplier', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='scorecard', serialize=False, to='suppliers.supplier')),
+                ('order_count', models.IntegerField(default=0)),
+                ('total_quantity', models.BigIntegerField(default=0)),
+                ('approved_count', models.IntegerField(default=0)),
+                ('rejected_count', models.IntegerField(default=0)),
+                ('received_count', models.IntegerField(default=0)),
+                ('lead_time_seconds', models.FloatField(default=0)),
+                ('last_order_at', models.DateTimeField(blank=True, null=True)),
+                ('approval_rate', models.GeneratedField(db_persist=True, expression=models.Case(models.When(models.Q(('approved_count__gt', 0), ('rejected_count__gt', 0), _connector='OR'), then=django.db.models.expressions.CombinedExpression(django.db.models.functions.comparison.Cast('approved_count', models.FloatField()), '/', django.db.models.expressions.CombinedExpression(models.F('approved_count'), '+', models.F('rejected_count'))))), output_field=models.FloatField())),
+                ('avg_lead_time_days', models.GeneratedField(db_persist=True, expression=models.Case(models.When(received_count__gt=0, then=django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(models.F('lead_time_seconds'), '/', models.F('received_count')), '/', models.Value(86400)))), output_field=models.FloatField())),
+            ],
+            options={
+                'indexes': [models.Index(fields=['order_count'], name='suppliers_s_order_c_6568cb_idx'), models.Index(fields=['total_quantity'], name='suppliers_s_total_q_71953f_idx'), models.Index(fields=['approval_rate'], name='suppliers_s_approva_dcfb78_idx'), models.Index(fields=['avg_lead_time_days'], name='suppliers_s_avg_lea_fb7fda_idx'), models.Index(fields=['last_order_at'], name='suppliers_s_last_or_148286_idx')],
+            },
+        ),
+        migrations.RunPython(build_scorecards, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+def backfill_name_keys(apps, schema_editor):
+    from suppliers.keys import backfill
+
+    backfill(apps.get_model('suppliers', 'Supplier'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('suppliers', '0002_supplier_scorecard'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='supplier',
+            name='name_key',
+            field=models.CharField(editable=False, max_length=300, null=True),
+        ),
+        migrations.RunPython(backfill_name_keys, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='supplier',
+            name='name_key',
+            field=models.CharField(editable=False, max_length=300, unique=True),
+        ),
+        migrations.AddIndex(
+            model_name='supplier',
+            index=models.Index(django.db.models.functions.text.Lower('contact_email'), name='supplier_email_lower_idx'),
+        ),
+    ]
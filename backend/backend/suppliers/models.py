@@ -1,4 +1,7 @@
+from django.contrib.auth import get_user_model
 from django.db import models
+from django.db.models import F
+from django.db.models.functions import Cast, Lower
 
 # Create your models here.
 
@@ -11,8 +14,89 @@ class Supplier(models.Model):
     contact_email = models.EmailField(blank=True)
     contact_phone = models.CharField(max_length=50, blank=True)
     address = models.TextField(blank=True)
+    # Normalized name (see suppliers/keys.py), the natural key imports upsert on.
+    name_key = models.CharField(max_length=300, unique=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [models.Index(Lower('contact_email'), name='supplier_email_lower_idx')]
+
     def __str__(self):
         return self.name
+
+
+class SupplierScorecard(models.Model):
+    """
+    Running purchase order totals for a supplier, maintained with the daily
+    order rollups (orders/rollups.py). The rates are generated columns, so
+    every metric can be sorted on directly.
+    """
+    supplier = models.OneToOneField(Supplier, on_delete=models.CASCADE, primary_key=True, related_name='scorecard')
+    order_count = models.IntegerField(default=0)
+    total_quantity = models.BigIntegerField(default=0)
+    approved_count = models.IntegerField(default=0)
+    rejected_count = models.IntegerField(default=0)
+    # Fully received orders and their summed lead time from approval to receipt.
+    received_count = models.IntegerField(default=0)
+    lead_time_seconds = models.FloatField(default=0)
+    last_order_at = models.DateTimeField(null=True, blank=True)
+    approval_rate = models.GeneratedField(
+        expression=models.Case(
+            models.When(
+                models.Q(approved_count__gt=0) | models.Q(rejected_count__gt=0),
+                then=Cast('approved_count', models.FloatField()) / (F('approved_count') + F('rejected_count')),
+            ),
+        ),
+        output_field=models.FloatField(), db_persist=True,
+    )
+    avg_lead_time_days = models.GeneratedField(
+        expression=models.Case(
+            models.When(received_count__gt=0, then=F('lead_time_seconds') / F('received_count') / 86400),
+        ),
+        output_field=models.FloatField(), db_persist=True,
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['order_count']),
+            models.Index(fields=['total_quantity']),
+            models.Index(fields=['approval_rate']),
+            models.Index(fields=['avg_lead_time_days']),
+            models.Index(fields=['last_order_at']),
+        ]
+
+    def __str__(self):
+        return f"Scorecard for supplier {self.supplier_id}"
+
+
+class SupplierImport(models.Model):
+    """
+    A supplier CSV import (see suppliers/imports.py). Small files are imported
+    during the upload request, larger ones in the background; rejected rows
+    are written to a CSV error file next to the upload.
+    """
+    class Statuses(models.TextChoices):
+        PENDING = 'PENDING', 'Pending'
+        RUNNING = 'RUNNING', 'Running'
+        COMPLETED = 'COMPLETED', 'Completed'
+        FAILED = 'FAILED', 'Failed'
+
+    file_name = models.CharField(max_length=255)
+    path = models.CharField(max_length=500, help_text='Upload file name relative to SUPPLIER_IMPORT_DIR')
+    error_path = models.CharField(max_length=500, blank=True, help_text='Error file name relative to SUPPLIER_IMPORT_DIR')
+    status = models.CharField(max_length=10, choices=Statuses.choices, default=Statuses.PENDING)
+    total_rows = models.PositiveIntegerField(default=0)
+    created_count = models.PositiveIntegerField(default=0)
+    updated_count = models.PositiveIntegerField(default=0)
+    error_count = models.PositiveIntegerField(default=0)
+    error_message = models.TextField(blank=True)
+    user = models.ForeignKey(get_user_model(), on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Supplier import {self.pk} ({self.file_name})"
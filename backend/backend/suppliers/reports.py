@@ -0,0 +1,32 @@
+from core.reports import Column, CSVExport, Report, register, register_csv
+from .models import Supplier
+
+SUPPLIERS_REPORT = register(Report(
+    'suppliers', 'Suppliers Report',
+    [
+        Column('Name', 'name', 2.4, wrap=True),
+        Column('Contact Name', 'contact_name', 2, wrap=True),
+        Column('Contact Email', 'contact_email', 2.6, wrap=True),
+        Column('Contact Phone', 'contact_phone', 2),
+        Column('Address', 'address', 2.6, wrap=True),
+        Column('Created', 'created_at', 2),
+        Column('Updated', 'updated_at', 2),
+    ],
+    lambda: Supplier.objects.order_by('name'),
+    'suppliers_report',
+    (Supplier,),
+    # Seven columns need the width of a landscape page.
+    landscape=True,
+))
+
+SUPPLIERS_CSV = register_csv(CSVExport(
+    'suppliers',
+    ['name', 'contact_name', 'contact_email', 'contact_phone', 'address', 'created_at', 'updated_at'],
+    lambda supplier: [
+        supplier.name, supplier.contact_name, supplier.contact_email, supplier.contact_phone, supplier.address,
+        supplier.created_at.isoformat(), supplier.updated_at.isoformat(),
+    ],
+    lambda: Supplier.objects.all(),
+    'suppliers_export',
+    (Supplier,),
+))
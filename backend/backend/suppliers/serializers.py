@@ -1,7 +1,53 @@
 from rest_framework import serializers
-from .models import Supplier
+from django.urls import reverse
+from .models import Supplier, SupplierImport, SupplierScorecard
 
 class SupplierSerializer(serializers.ModelSerializer):
     class Meta:
         model = Supplier
-        fields = ['id', 'name', 'contact_name', 'contact_email', 'contact_phone', 'address', 'created_at', 'updated_at'] 
\ No newline at end of file
+        fields = ['id', 'name', 'contact_name', 'contact_email', 'contact_phone', 'address', 'created_at', 'updated_at'] 
+
+class SupplierMergeSerializer(serializers.Serializer):
+    """
+    The suppliers to fold into the one in the URL (see suppliers/dedupe.py).
+    """
+    duplicates = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=1000,
+    )
+
+class SupplierImportSerializer(serializers.ModelSerializer):
+    """
+    Progress and outcome of a supplier CSV import. errors_url downloads the
+    rejected rows, if any.
+    """
+    errors_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = SupplierImport
+        fields = [
+            'id', 'file_name', 'status', 'total_rows', 'created_count', 'updated_count', 'error_count',
+            'error_message', 'errors_url', 'created_at', 'finished_at',
+        ]
+
+    def get_errors_url(self, obj):
+        return reverse('supplier-import-errors', args=[obj.pk]) if obj.error_path else None
+
+SCORECARD_METRICS = (
+    'order_count', 'total_quantity', 'approved_count', 'rejected_count', 'received_count',
+    'approval_rate', 'avg_lead_time_days', 'last_order_at',
+)
+
+class SupplierScorecardSerializer(serializers.ModelSerializer):
+    """
+    A supplier's scorecard. supplier__name keeps the key the reports page charts.
+    """
+    supplier_id = serializers.IntegerField(read_only=True)
+    supplier__name = serializers.CharField(source='supplier.name', read_only=True)
+    avg_lead_time_days = serializers.SerializerMethodField()
+
+    class Meta:
+        model = SupplierScorecard
+        fields = ['supplier_id', 'supplier__name', *SCORECARD_METRICS]
+
+    def get_avg_lead_time_days(self, obj):
+        return round(obj.avg_lead_time_days, 2) if obj.avg_lead_time_days is not None else None
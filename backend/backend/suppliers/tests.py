@@ -1,3 +1,230 @@
-from django.test import TestCase
+import csv
+import io
+import shutil
+import tempfile
+from decimal import Decimal
+from pathlib import Path
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from core.models import AuditLog
+from inventory.models import InventoryItem
+from orders import rollups
+from orders.models import OrderDailyRollup, PurchaseOrder
+from payments.models import PaymentRequest
+from . import dedupe, imports
+from .models import Supplier, SupplierImport, SupplierScorecard
+
+User = get_user_model()
+
+
+class SupplierDedupeTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username='dedupeadmin', email='dedupeadmin@example.com', password='Testpass123',
+            role=User.Roles.ADMIN,
+        )
+        self.client.force_authenticate(self.admin)
+        self.zebulon = Supplier.objects.create(name='Zebulon Hardware')
+        self.zebulon_ltd = Supplier.objects.create(name='ZEBULON HARDWARE Ltd.', contact_email='sales@zebulon.example')
+        self.zebulon_typo = Supplier.objects.create(name='Zebulon Hardwre Co')
+        self.paints = Supplier.objects.create(name='Quixote Paints', contact_phone='+233 24 555 0101')
+        self.colours = Supplier.objects.create(name='Quixotic Colour House', contact_phone='024 555 0101')
+        self.timber = Supplier.objects.create(name='Unrelated Timber')
+
+    def cluster_of(self, clusters, supplier):
+        return next((cluster for cluster in clusters if supplier.pk in cluster['supplier_ids']), None)
+
+    def test_normalization_and_keys(self):
+        self.assertEqual(dedupe.normalize_name('ACME Supplies, Ltd.'), dedupe.normalize_name('Acme Supplies'))
+        self.assertEqual(dedupe.normalize_name('Café & Co'), 'cafe')
+        self.assertEqual(dedupe.normalize_phone('+233 (24) 555-0101'), dedupe.normalize_phone('0245550101'))
+        self.assertEqual(dedupe.soundex('robert'), dedupe.soundex('rupert'))
+        self.assertEqual(dedupe.soundex('ashcraft'), 'A261')
+
+    def test_clusters_fuzzy_names_and_shared_contacts(self):
+        clusters = dedupe.find_duplicates()
+        zebulon = self.cluster_of(clusters, self.zebulon)
+        self.assertEqual(zebulon['supplier_ids'], [self.zebulon.pk, self.zebulon_ltd.pk, self.zebulon_typo.pk])
+        self.assertEqual(zebulon['score'], 1.0)
+        self.assertEqual(dedupe.find_duplicates(queryset=Supplier.objects.filter(pk=self.zebulon.pk)), [])
+        paints = self.cluster_of(clusters, self.paints)
+        self.assertEqual((paints['supplier_ids'], paints['score']), ([self.paints.pk, self.colours.pk], 0.9))
+        self.assertIsNone(self.cluster_of(clusters, self.timber))
+        # A stricter threshold keeps exact name matches but not contact-only ones.
+        self.assertIsNone(self.cluster_of(dedupe.find_duplicates(0.95), self.paints))
+
+    def test_survivor_is_the_supplier_with_most_orders(self):
+        PurchaseOrder.objects.create(supplier=self.zebulon_typo, quantity=1)
+        self.assertEqual(self.cluster_of(dedupe.find_duplicates(), self.zebulon)['survivor'], self.zebulon_typo.pk)
+
+        response = self.client.get(reverse('supplier-duplicates'), {'limit': 100})
+        self.assertEqual(response.status_code, 200)
+        cluster = next(
+            cluster for cluster in response.data['clusters']
+            if cluster['suppliers'][0]['id'] == self.zebulon.pk
+        )
+        self.assertEqual([supplier['name'] for supplier in cluster['suppliers']][1], 'ZEBULON HARDWARE Ltd.')
+        self.assertEqual(self.client.get(reverse('supplier-duplicates'), {'threshold': 'x'}).status_code, 400)
+
+    def test_merge_repoints_orders_payments_items_and_totals(self):
+        item = InventoryItem.objects.create(name='Dedupe Hammer', sku='DEDUPE-HAM', preferred_supplier=self.zebulon_ltd)
+        kept = PurchaseOrder.objects.create(supplier=self.zebulon, item=item, quantity=2)
+        moved = [
+            PurchaseOrder.objects.create(supplier=self.zebulon_ltd, item=item, quantity=3),
+            PurchaseOrder.objects.create(supplier=self.zebulon_typo, item=item, quantity=5),
+        ]
+        payment = PaymentRequest.objects.create(
+            user=self.admin, payment_type='SUPPLIER_PAYMENT', amount=Decimal('10.00'),
+            description='Dedupe test', momo_phone='+233200000000', supplier=self.zebulon_typo,
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('supplier-merge', args=[self.zebulon.pk]), {
+                'duplicates': [self.zebulon_ltd.pk, self.zebulon_typo.pk],
+            }, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            {key: response.data[key] for key in ('orders', 'payments', 'items', 'merged')},
+            {'orders': 2, 'payments': 1, 'items': 1, 'merged': 2},
+        )
+        self.assertEqual(response.data['supplier']['contact_email'], 'sales@zebulon.example')
+        self.assertFalse(Supplier.objects.filter(pk__in=[self.zebulon_ltd.pk, self.zebulon_typo.pk]).exists())
+        orders = PurchaseOrder.objects.filter(pk__in=[kept.pk, *[order.pk for order in moved]])
+        self.assertEqual(set(orders.values_list('supplier', flat=True)), {self.zebulon.pk})
+        self.assertEqual(PurchaseOrder.objects.get(pk=moved[0].pk).version, 2)
+        payment.refresh_from_db()
+        item.refresh_from_db()
+        self.assertEqual((payment.supplier_id, item.preferred_supplier_id), (self.zebulon.pk, self.zebulon.pk))
+        self.assertTrue(AuditLog.objects.filter(action='MERGE', object_id=str(self.zebulon.pk)).exists())
+
+        # The bulk repoint kept the rollups and scorecards in step with the orders.
+        scorecard = SupplierScorecard.objects.get(pk=self.zebulon.pk)
+        self.assertEqual((scorecard.order_count, scorecard.total_quantity), (3, 10))
+        merged_rows = set(OrderDailyRollup.objects.filter(count__gt=0).values_list('supplier_id', 'item_id', 'count'))
+        rollups.rebuild(PurchaseOrder, OrderDailyRollup)
+        rollups.rebuild_scorecards(PurchaseOrder, SupplierScorecard)
+        self.assertEqual(
+            merged_rows, set(OrderDailyRollup.objects.filter(count__gt=0).values_list('supplier_id', 'item_id', 'count')),
+        )
+        self.assertEqual(SupplierScorecard.objects.get(pk=self.zebulon.pk).order_count, 3)
+
+    def test_merge_validation_and_permissions(self):
+        url = reverse('supplier-merge', args=[self.zebulon.pk])
+        self.assertEqual(self.client.post(url, {'duplicates': [self.zebulon.pk]}, format='json').status_code, 400)
+        self.assertEqual(self.client.post(url, {'duplicates': [999999]}, format='json').status_code, 400)
+        self.assertEqual(self.client.post(
+            reverse('supplier-merge', args=[999999]), {'duplicates': [self.zebulon.pk]}, format='json',
+        ).status_code, 404)
+        manager = User.objects.create_user(
+            username='dedupemanager', email='dedupemanager@example.com', password='Testpass123',
+            role=User.Roles.MANAGER,
+        )
+        self.client.force_authenticate(manager)
+        self.assertEqual(self.client.post(url, {'duplicates': [self.zebulon_ltd.pk]}, format='json').status_code, 403)
+
+
+class SupplierImportTests(APITestCase):
+    def setUp(self):
+        self.manager = User.objects.create_user(
+            username='importmanager', email='importmanager@example.com', password='Testpass123',
+            role=User.Roles.MANAGER,
+        )
+        self.client.force_authenticate(self.manager)
+        self.import_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.import_dir)
+        self.enterContext(self.settings(SUPPLIER_IMPORT_DIR=Path(self.import_dir)))
+        self.northwind = Supplier.objects.create(name='Northwind Traders', contact_name='Nancy')
+        self.contoso = Supplier.objects.create(name='Contoso', contact_email='Ap@Contoso.example')
+
+    def upload(self, rows, header=('name', 'contact_name', 'contact_email', 'contact_phone', 'address')):
+        content = io.StringIO()
+        writer = csv.writer(content)
+        writer.writerow(header)
+        writer.writerows(rows)
+        return SimpleUploadedFile('vendors.csv', content.getvalue().encode('utf-8'), content_type='text/csv')
+
+    def test_upserts_by_name_or_email_and_reports_rejected_rows(self):
+        upload = self.upload([
+            ['NORTHWIND TRADERS Ltd', '', '', '+233 20 111 2222', ''],
+            ['Contoso Holdings', 'Carl', 'AP@CONTOSO.example', '', ''],
+            ['Fabrikam Parts', 'Fiona', 'sales@fabrikam.example', '', '1 Dock Road'],
+            ['', 'Nobody', '', '', ''],
+            ['Bad Contact Co', '', 'not-an-email', 'call me', ''],
+            ['Fabrikam Parts', 'Later Wins', '', '', ''],
+        ])
+        response = self.client.post(reverse('supplier-import-csv'), {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            {key: response.data[key] for key in ('status', 'total_rows', 'created_count', 'updated_count', 'error_count')},
+            {'status': 'COMPLETED', 'total_rows': 6, 'created_count': 1, 'updated_count': 2, 'error_count': 2},
+        )
+
+        self.northwind.refresh_from_db()
+        self.assertEqual(
+            (self.northwind.name, self.northwind.contact_name, self.northwind.contact_phone),
+            ('NORTHWIND TRADERS Ltd', 'Nancy', '+233 20 111 2222'),
+        )
+        self.contoso.refresh_from_db()
+        self.assertEqual((self.contoso.name, self.contoso.contact_name), ('Contoso Holdings', 'Carl'))
+        fabrikam = Supplier.objects.get(name_key='fabrikam parts')
+        self.assertEqual((fabrikam.contact_name, fabrikam.address), ('Later Wins', '1 Dock Road'))
+
+        errors = self.client.get(response.data['errors_url'])
+        self.assertEqual(errors.status_code, 200)
+        rows = list(csv.DictReader(io.StringIO(b''.join(errors.streaming_content).decode('utf-8'))))
+        self.assertEqual([row['row'] for row in rows], ['5', '6'])
+        self.assertIn('name is required.', rows[0]['errors'])
+        self.assertIn('valid email', rows[1]['errors'])
+        self.assertIn('valid phone', rows[1]['errors'])
+        self.assertEqual(rows[1]['name'], 'Bad Contact Co')
+
+    def test_each_chunk_is_one_read_and_one_upsert(self):
+        rows = [imports.clean_row({'name': f'Chunked Vendor {i}'}) for i in range(100)]
+        with self.assertNumQueries(2):
+            self.assertEqual(imports.upsert(rows), (100, 0))
+        with self.assertNumQueries(2):
+            self.assertEqual(imports.upsert(rows), (0, 100))
+        self.assertEqual(Supplier.objects.filter(name__startswith='Chunked Vendor').count(), 100)
+
+    def test_large_files_run_in_the_background(self):
+        with self.settings(SUPPLIER_IMPORT_INLINE_MAX_BYTES=0), self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.post(
+                reverse('supplier-import-csv'), {'file': self.upload([['Queued Vendor']], header=['name'])},
+                format='multipart',
+            )
+        self.assertEqual((response.status_code, response.data['status']), (202, 'PENDING'))
+        self.assertEqual(len(callbacks), 1)
+        imports.run(SupplierImport.objects.get(pk=response.data['id']))
+        detail = self.client.get(reverse('supplier-import-detail', args=[response.data['id']]))
+        self.assertEqual((detail.data['status'], detail.data['created_count'], detail.data['errors_url']), ('COMPLETED', 1, None))
+
+    def test_bad_files_fail_and_staff_cannot_import(self):
+        response = self.client.post(
+            reverse('supplier-import-csv'), {'file': self.upload([['x']], header=['vendor'])}, format='multipart',
+        )
+        self.assertEqual((response.data['status'], response.data['error_message']), ('FAILED', "The file has no 'name' column."))
+
+        path = Path(self.import_dir) / 'command.csv'
+        path.write_text('name,contact_email\nCommand Vendor,cv@example.com\n', encoding='utf-8')
+        out = io.StringIO()
+        call_command('import_suppliers', str(path), stdout=out)
+        self.assertIn('1 created', out.getvalue())
+        self.assertTrue(Supplier.objects.filter(name='Command Vendor', contact_email='cv@example.com').exists())
+
+        staff = User.objects.create_user(username='importstaff', email='importstaff@example.com', password='Testpass123')
+        self.client.force_authenticate(staff)
+        response = self.client.post(reverse('supplier-import-csv'), {'file': self.upload([])}, format='multipart')
+        self.assertEqual(response.status_code, 403)
+
+    def test_natural_keys_follow_names(self):
+        duplicate = Supplier.objects.create(name='Northwind Traders Limited')
+        self.assertEqual((self.northwind.name_key, duplicate.name_key[:18]), ('northwind traders', 'northwind traders#'))
+        dedupe.merge_suppliers(self.northwind, [duplicate.pk])
+        self.northwind.name = 'Northwind Trading'
+        self.northwind.save()
+        self.assertEqual(Supplier.objects.get(pk=self.northwind.pk).name_key, 'northwind trading')
@@ -1,10 +1,19 @@
 from django.urls import path
-from .views import SupplierListCreateView, SupplierRetrieveUpdateDestroyView, SupplierCSVExportView, SupplierAnalyticsView, SupplierPDFExportView, supplier_analytics
+from .views import (
+    SupplierListCreateView, SupplierRetrieveUpdateDestroyView, SupplierCSVExportView, SupplierAnalyticsView,
+    SupplierPDFExportView, supplier_analytics, SupplierDuplicatesView, SupplierMergeView, SupplierCSVImportView,
+    SupplierImportDetailView, SupplierImportErrorsView,
+)
 
 urlpatterns = [
     path('', SupplierListCreateView.as_view(), name='supplier-list-create'),
     path('<int:pk>/', SupplierRetrieveUpdateDestroyView.as_view(), name='supplier-detail'),
+    path('<int:pk>/merge/', SupplierMergeView.as_view(), name='supplier-merge'),
+    path('duplicates/', SupplierDuplicatesView.as_view(), name='supplier-duplicates'),
     path('export/csv/', SupplierCSVExportView.as_view(), name='supplier-export-csv'),
+    path('import/csv/', SupplierCSVImportView.as_view(), name='supplier-import-csv'),
+    path('imports/<int:pk>/', SupplierImportDetailView.as_view(), name='supplier-import-detail'),
+    path('imports/<int:pk>/errors/', SupplierImportErrorsView.as_view(), name='supplier-import-errors'),
     path('export/pdf/', SupplierPDFExportView.as_view(), name='supplier-export-pdf'),
     path('analytics/', supplier_analytics, name='supplier-analytics'),
 ] 
\ No newline at end of file
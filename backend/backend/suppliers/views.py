@@ -1,24 +1,29 @@
 from django.shortcuts import render
-from rest_framework import generics, permissions
-from .models import Supplier
-from .serializers import SupplierSerializer
-from django.http import HttpResponse
-import csv
+from rest_framework import generics, permissions, status
+from .models import Supplier, SupplierImport, SupplierScorecard
+from . import imports
+from .dedupe import THRESHOLD, find_duplicates, merge_suppliers
+from .serializers import (
+    SCORECARD_METRICS, SupplierImportSerializer, SupplierMergeSerializer, SupplierScorecardSerializer,
+    SupplierSerializer,
+)
+from django.conf import settings
+from django.http import FileResponse, Http404
+from rest_framework.parsers import MultiPartParser
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from orders.models import PurchaseOrder
 from django.db import models
-from django.template.loader import render_to_string
-from xhtml2pdf import pisa
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated
+from core import reports
+from users.permissions import role_permission
+from .reports import SUPPLIERS_CSV, SUPPLIERS_REPORT
 
 # Create your views here.
 
 class SupplierListCreateView(generics.ListCreateAPIView):
     queryset = Supplier.objects.all().order_by('-created_at')
     serializer_class = SupplierSerializer
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [role_permission(GET='suppliers.view', POST='suppliers.add')]
 
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -36,67 +41,159 @@ class SupplierListCreateView(generics.ListCreateAPIView):
 class SupplierRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
     queryset = Supplier.objects.all()
     serializer_class = SupplierSerializer
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [role_permission(
+        GET='suppliers.view', PUT='suppliers.change', PATCH='suppliers.change', DELETE='suppliers.delete',
+    )]
+
+class SupplierDuplicatesView(APIView):
+    """
+    Clusters of likely duplicate suppliers, best match first.
+    Params: threshold (0-1, default 0.8) and limit (default 100).
+    """
+    permission_classes = [role_permission(GET='suppliers.view')]
+
+    def get(self, request):
+        try:
+            threshold = float(request.query_params.get('threshold', THRESHOLD))
+        except ValueError:
+            threshold = -1
+        if not 0 < threshold <= 1:
+            return Response({'error': 'threshold must be between 0 and 1.'}, status=status.HTTP_400_BAD_REQUEST)
+        limit = request.query_params.get('limit', '')
+        limit = int(limit) if limit.isdigit() else 100
+        clusters = find_duplicates(threshold)
+        shown = clusters[:limit]
+        suppliers = Supplier.objects.in_bulk([pk for cluster in shown for pk in cluster['supplier_ids']])
+        for cluster in shown:
+            cluster['suppliers'] = SupplierSerializer(
+                [suppliers[pk] for pk in cluster.pop('supplier_ids')], many=True,
+            ).data
+        return Response({'count': len(clusters), 'clusters': shown})
+
+class SupplierMergeView(APIView):
+    """
+    Merge duplicate suppliers into this one. Body: {"duplicates": [ids]}.
+    Their orders, payment requests and preferred items move to this supplier.
+    """
+    permission_classes = [role_permission(POST='suppliers.merge')]
+
+    def post(self, request, pk):
+        survivor = Supplier.objects.filter(pk=pk).first()
+        if survivor is None:
+            return Response({'error': 'Supplier not found.'}, status=status.HTTP_404_NOT_FOUND)
+        serializer = SupplierMergeSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        duplicates = set(serializer.validated_data['duplicates']) - {survivor.pk}
+        if not duplicates:
+            return Response({'error': 'Nothing to merge.'}, status=status.HTTP_400_BAD_REQUEST)
+        missing = duplicates - set(Supplier.objects.filter(pk__in=duplicates).values_list('pk', flat=True))
+        if missing:
+            return Response(
+                {'error': f"Suppliers not found: {', '.join(map(str, sorted(missing)))}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        moved = merge_suppliers(survivor, duplicates, user=request.user)
+        survivor.refresh_from_db()
+        return Response({'supplier': SupplierSerializer(survivor).data, **moved})
 
 class SupplierCSVExportView(APIView):
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [role_permission(GET='suppliers.view')]
 
     def get(self, request):
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename="suppliers_export.csv"'
-        writer = csv.writer(response)
-        writer.writerow(['name', 'contact_name', 'contact_email', 'contact_phone', 'address', 'created_at', 'updated_at'])
-        for supplier in Supplier.objects.all():
-            writer.writerow([
-                supplier.name, supplier.contact_name, supplier.contact_email, supplier.contact_phone, supplier.address,
-                supplier.created_at.isoformat(), supplier.updated_at.isoformat()
-            ])
-        return response
+        return reports.download(SUPPLIERS_CSV)
+
+class SupplierCSVImportView(APIView):
+    """
+    Import suppliers from a CSV file with the export's columns, updating the
+    suppliers with the same normalized name or email (see suppliers/imports.py).
+    Files up to SUPPLIER_IMPORT_INLINE_MAX_BYTES are imported before the
+    response (201); larger ones run in the background (202), followed at
+    imports/<id>/.
+    """
+    permission_classes = [role_permission(POST='suppliers.import')]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request):
+        upload = request.FILES.get('file')
+        if not upload:
+            return Response({'error': 'No file uploaded.'}, status=status.HTTP_400_BAD_REQUEST)
+        job = imports.save_upload(upload, user=request.user)
+        if upload.size <= settings.SUPPLIER_IMPORT_INLINE_MAX_BYTES:
+            imports.run(job)
+            return Response(SupplierImportSerializer(job).data, status=status.HTTP_201_CREATED)
+        imports.start(job)
+        return Response(SupplierImportSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+class SupplierImportDetailView(generics.RetrieveAPIView):
+    queryset = SupplierImport.objects.all()
+    serializer_class = SupplierImportSerializer
+    permission_classes = [role_permission(GET='suppliers.import')]
+
+class SupplierImportErrorsView(APIView):
+    """
+    Download the rejected rows of an import as CSV, with the row number and
+    reasons in front of the original columns.
+    """
+    permission_classes = [role_permission(GET='suppliers.import')]
+
+    def get(self, request, pk):
+        job = SupplierImport.objects.filter(pk=pk).first()
+        path = imports.import_dir() / job.error_path if job and job.error_path else None
+        if path is None or not path.exists():
+            raise Http404('No error file for this import.')
+        return FileResponse(
+            open(path, 'rb'), as_attachment=True, filename=f'supplier_import_{pk}_errors.csv', content_type='text/csv',
+        )
 
 class SupplierPDFExportView(APIView):
     """
     Export all suppliers as a PDF file.
     """
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [role_permission(GET='suppliers.view')]
 
     def get(self, request):
-        suppliers = Supplier.objects.all().order_by('name')
-        html = render_to_string('suppliers_pdf_template.html', {'suppliers': suppliers})
-        response = HttpResponse(content_type='application/pdf')
-        response['Content-Disposition'] = 'attachment; filename="suppliers_report.pdf"'
-        pisa_status = pisa.CreatePDF(html, dest=response)
-        if pisa_status.err:
-            return HttpResponse('Error generating PDF', status=500)
-        return response
+        return reports.download(SUPPLIERS_REPORT)
+
+def ranked_scorecards(params, default_limit=10):
+    """
+    Supplier scorecards sorted by the "sort" metric ("order" asc or desc,
+    default desc) and cut to "limit" rows. Returns None for an unknown metric.
+    """
+    sort = params.get('sort', 'order_count')
+    if sort not in SCORECARD_METRICS:
+        return None
+    limit = str(params.get('limit', ''))
+    limit = min(int(limit), 100) if limit.isdigit() and int(limit) else default_limit
+    metric = models.F(sort)
+    ordering = metric.asc(nulls_last=True) if params.get('order') == 'asc' else metric.desc(nulls_last=True)
+    return (
+        SupplierScorecard.objects.filter(order_count__gt=0).select_related('supplier')
+        .order_by(ordering, 'supplier_id')[:limit]
+    )
 
 class SupplierAnalyticsView(APIView):
-    permission_classes = [permissions.IsAuthenticated]
+    """
+    Supplier count and the top suppliers from the scorecards, sortable by any
+    metric: ?sort=order_count|total_quantity|approval_rate|avg_lead_time_days|...
+    """
+    permission_classes = [role_permission(GET='suppliers.view')]
 
     def get(self, request):
-        total_suppliers = Supplier.objects.count()
-        # Top suppliers by order count
-        top_suppliers = (
-       PurchaseOrder.objects.values('supplier__name')
-       .annotate(order_count=models.Count('id'))
-       .order_by('-order_count')[:10]
-        )
-        top_suppliers = (
-            PurchaseOrder.objects.values('supplier__name')
-            .annotate(order_count=models.Count('id'))
-            .order_by('-order_count')[:10]
-        )
+        scorecards = ranked_scorecards(request.query_params)
+        if scorecards is None:
+            return Response({'error': 'Unknown sort metric.'}, status=status.HTTP_400_BAD_REQUEST)
         return Response({
-            'total_suppliers': total_suppliers,
-            'top_suppliers': list(top_suppliers),
+            'total_suppliers': Supplier.objects.count(),
+            'top_suppliers': SupplierScorecardSerializer(scorecards, many=True).data,
         })
 
 @api_view(['GET'])
-@permission_classes([IsAuthenticated])
+@permission_classes([role_permission(GET='suppliers.view')])
 def supplier_analytics(request):
-    # Top suppliers by order count (using supplier as a string field)
-    top_suppliers = (
-        PurchaseOrder.objects.values('supplier')
-        .annotate(order_count=models.Count('id'))
-        .order_by('-order_count')[:10]
-    )
-    return Response({'top_suppliers': list(top_suppliers)})
+    scorecards = ranked_scorecards(request.query_params)
+    if scorecards is None:
+        return Response({'error': 'Unknown sort metric.'}, status=status.HTTP_400_BAD_REQUEST)
+    return Response({
+        'total_suppliers': Supplier.objects.count(),
+        'top_suppliers': SupplierScorecardSerializer(scorecards, many=True).data,
+    })
@@ -0,0 +1,109 @@
+"""
+JWT authentication without a per-request user query.
+
+Tokens carry the account fields views rely on (username, email, role,
+is_staff, is_superuser, is_active) plus the account's auth_version.
+CachedJWTAuthentication builds request.user from those claims and only checks
+the version, which is served from the 'shared' cache (see CACHES), so
+steady-state requests never touch the users table. Changing an account bumps
+its version and deletes the cached one for every worker: tokens issued before
+the change are rejected with the code token_stale, and clients refresh to get
+the new claims.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import router, transaction
+from django.db.models import F
+from django.utils.connection import ConnectionProxy
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from .revocation import is_revoked
+
+USER_CLAIMS = ('username', 'email', 'role', 'is_staff', 'is_superuser', 'is_active')
+VERSION_CLAIM = 'ver'
+cache = ConnectionProxy(caches, 'shared')
+
+
+def version_cache_key(user_id):
+    return f'auth-version:{user_id}'
+
+
+def add_user_claims(token, user):
+    """Embed the user's current account fields and auth version in ``token``."""
+    for claim in USER_CLAIMS:
+        token[claim] = getattr(user, claim)
+    token[VERSION_CLAIM] = user.auth_version
+    return token
+
+
+def current_version(user_id):
+    """The user's auth_version, from the cache when possible. None if the user is gone."""
+    key = version_cache_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        User = get_user_model()
+        version = User.objects.filter(pk=user_id).values_list('auth_version', flat=True).first()
+        if version is not None:
+            cache.set(key, version, getattr(settings, 'AUTH_VERSION_CACHE_TIMEOUT', 30))
+    return version
+
+
+def bump_version(user_id):
+    """Invalidate every token issued to the user so far."""
+    User = get_user_model()
+    User.objects.filter(pk=user_id).update(auth_version=F('auth_version') + 1)
+    forget_version(user_id)
+
+
+def forget_version(user_id):
+    # Wait for the commit so a concurrent request can't re-cache the old version.
+    transaction.on_commit(lambda: cache.delete(version_cache_key(user_id)))
+
+
+def token_user(validated_token):
+    """
+    A User instance built from token claims. Fields not carried in the token
+    are deferred and only loaded if something reads them.
+    """
+    User = get_user_model()
+    values = {
+        'id': validated_token[api_settings.USER_ID_CLAIM],
+        'auth_version': validated_token[VERSION_CLAIM],
+        **{claim: validated_token.get(claim) for claim in USER_CLAIMS},
+    }
+    fields = [field.attname for field in User._meta.concrete_fields if field.attname in values]
+    return User.from_db(router.db_for_read(User), fields, [values[name] for name in fields])
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that resolves the user from token claims instead of
+    loading it from the database, and rejects revoked tokens.
+    """
+
+    def get_validated_token(self, raw_token):
+        validated_token = super().get_validated_token(raw_token)
+        if is_revoked(validated_token):
+            raise InvalidToken(_('Token has been revoked'))
+        return validated_token
+
+    def get_user(self, validated_token):
+        if VERSION_CLAIM not in validated_token:
+            # Issued before claims were embedded; fall back to a lookup.
+            return super().get_user(validated_token)
+        try:
+            user_id = int(validated_token[api_settings.USER_ID_CLAIM])
+        except (KeyError, TypeError, ValueError):
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        version = current_version(user_id)
+        if version is None:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found')
+        if version != validated_token[VERSION_CLAIM]:
+            raise AuthenticationFailed(_('Account has changed, please refresh your token.'), code='token_stale')
+        if not validated_token.get('is_active'):
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        return token_user(validated_token)
@@ -13,8 +13,25 @@ class User(AbstractUser):
 
     role = models.CharField(max_length=20, choices=Roles.choices, default=Roles.STAFF)
     email = models.EmailField(unique=True)
+    # Bumped whenever an admin changes the account; tokens embed it (see users/authentication.py).
+    auth_version = models.PositiveIntegerField(default=0, editable=False)
+    # Refresh tokens issued before this are rejected (see users/revocation.py).
+    tokens_valid_after = models.DateTimeField(null=True, blank=True, editable=False)
 
     REQUIRED_FIELDS = ['email', 'role']
 
     def __str__(self):
         return f"{self.username} ({self.role})"
+
+class RevokedToken(models.Model):
+    """
+    A revoked token session or token id, kept until the token expires.
+    Checked in memory through users.revocation.
+    """
+    jti = models.CharField(max_length=255, unique=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, related_name='revoked_tokens')
+    expires_at = models.DateTimeField(db_index=True)
+    revoked_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.jti} (until {self.expires_at})"
@@ -0,0 +1,120 @@
+"""
+Role-based access control.
+
+PERMISSION_MATRIX declares which User.role may perform each action. It is
+compiled once, at import, into a set of (role, action) grants, so a check is a
+single set lookup against the role carried by request.user (a token claim, see
+users/authentication.py) and never touches the database. Superusers are
+granted every action.
+
+Views declare the action each HTTP method needs with role_permission(), and
+list endpoints narrow their querysets with scope_queryset().
+"""
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework import permissions
+
+from .models import User
+
+ADMIN, MANAGER, STAFF = User.Roles.ADMIN, User.Roles.MANAGER, User.Roles.STAFF
+EVERYONE = (ADMIN, MANAGER, STAFF)
+MANAGERS = (ADMIN, MANAGER)
+
+PERMISSION_MATRIX = {
+    # Inventory
+    'inventory.view': EVERYONE,
+    'inventory.add': MANAGERS,
+    'inventory.change': MANAGERS,
+    'inventory.delete': MANAGERS,
+    'inventory.stock': EVERYONE,
+    'inventory.import': MANAGERS,
+    # Purchase orders
+    'orders.view': EVERYONE,
+    'orders.add': EVERYONE,
+    'orders.change': MANAGERS,
+    'orders.delete': MANAGERS,
+    'orders.approve': MANAGERS,
+    'orders.receive': EVERYONE,
+    'orders.replenish': MANAGERS,
+    # Suppliers
+    'suppliers.view': EVERYONE,
+    'suppliers.add': MANAGERS,
+    'suppliers.change': MANAGERS,
+    'suppliers.delete': (ADMIN,),
+    'suppliers.merge': (ADMIN,),
+    'suppliers.import': MANAGERS,
+    # Payments: everyone manages their own requests, managers see all of them
+    'payments.view': EVERYONE,
+    'payments.add': EVERYONE,
+    'payments.change': EVERYONE,
+    'payments.delete': EVERYONE,
+    'payments.view_all': MANAGERS,
+    'payments.settings': (ADMIN,),
+    # Notifications: everyone sees their own and global ones
+    'notifications.view': EVERYONE,
+    'notifications.add': MANAGERS,
+    'notifications.view_all': (ADMIN,),
+    # Audit logs: staff see their own entries
+    'audit.view': EVERYONE,
+    'audit.view_all': MANAGERS,
+    'audit.add': (ADMIN,),
+    # Scheduled reports
+    'reports.schedule': MANAGERS,
+    # User accounts
+    'users.view': (ADMIN,),
+    'users.add': (ADMIN,),
+    'users.change': (ADMIN,),
+    'users.delete': (ADMIN,),
+    'users.revoke_tokens': (ADMIN,),
+}
+
+ACTIONS = frozenset(PERMISSION_MATRIX)
+GRANTS = frozenset(
+    (role, action) for action, roles in PERMISSION_MATRIX.items() for role in roles
+)
+
+
+def has_role_permission(user, action):
+    """Whether ``user`` may perform ``action``."""
+    if action not in ACTIONS:
+        raise ImproperlyConfigured(f"Unknown permission action '{action}'")
+    if not (user and user.is_authenticated):
+        return False
+    return user.is_superuser or (user.role, action) in GRANTS
+
+
+def scope_queryset(queryset, user, action, /, *conditions, **lookups):
+    """
+    Return ``queryset`` unchanged for users allowed ``action``, otherwise
+    only the rows matching ``conditions``/``lookups`` (e.g. their own).
+    """
+    if has_role_permission(user, action):
+        return queryset
+    return queryset.filter(*conditions, **lookups)
+
+
+class RolePermission(permissions.BasePermission):
+    """
+    Grant a request if the user's role allows the action mapped to its HTTP
+    method. Methods without a mapped action are denied; HEAD follows GET.
+    """
+    actions = {}
+
+    def has_permission(self, request, view):
+        if not (request.user and request.user.is_authenticated):
+            return False
+        if request.method == 'OPTIONS':
+            return True
+        method = 'GET' if request.method == 'HEAD' else request.method
+        action = self.actions.get(method)
+        return action is not None and has_role_permission(request.user, action)
+
+
+def role_permission(**actions):
+    """
+    Build a RolePermission for a view, e.g.
+    permission_classes = [role_permission(GET='orders.view', POST='orders.add')]
+    """
+    unknown = set(actions.values()) - ACTIONS
+    if unknown:
+        raise ImproperlyConfigured(f"Unknown permission actions: {', '.join(sorted(unknown))}")
+    return type('RolePermission', (RolePermission,), {'actions': actions})
@@ -0,0 +1,97 @@
+"""
+Token revocation served from memory.
+
+Revoked token ids are stored as RevokedToken rows, but requests check them
+against an in-process set. Each process pulls rows revoked since its last
+sync at most every TOKEN_REVOCATION_SYNC_INTERVAL seconds, so a check is a
+clock comparison plus a set lookup and never a query. Revocations made by the
+current process apply immediately; other processes pick them up on their next
+sync.
+
+Refresh tokens get a ``sid`` (session id) claim equal to their original jti,
+which is copied into every access token minted from them. Revoking a refresh
+token revokes its session, and with it all of those access tokens.
+"""
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+
+SESSION_CLAIM = 'sid'
+
+# Rows are re-read this far back on each sync, so revocations committed late
+# (after a later sync started) are still picked up.
+SYNC_OVERLAP = timedelta(minutes=1)
+
+
+def session_id(token):
+    return token.get(SESSION_CLAIM) or token[api_settings.JTI_CLAIM]
+
+
+def token_expiry(token):
+    return datetime.fromtimestamp(token['exp'], tz=dt_timezone.utc)
+
+
+class RevocationSet:
+    """Process-local copy of the unexpired revoked ids."""
+
+    def __init__(self):
+        self.expiries = {}
+        self.synced_at = None
+        self.next_sync = 0.0
+        self.lock = threading.Lock()
+
+    def __contains__(self, token_id):
+        if time.monotonic() >= self.next_sync:
+            self.sync()
+        return token_id in self.expiries
+
+    def add(self, token_id, expires_at):
+        self.expiries[token_id] = expires_at.timestamp()
+
+    def sync(self):
+        from .models import RevokedToken
+
+        with self.lock:
+            if time.monotonic() < self.next_sync:
+                return
+            now = timezone.now()
+            rows = RevokedToken.objects.filter(expires_at__gt=now)
+            if self.synced_at is not None:
+                rows = rows.filter(revoked_at__gte=self.synced_at - SYNC_OVERLAP)
+            expiries = {
+                token_id: expires_at.timestamp()
+                for token_id, expires_at in rows.values_list('jti', 'expires_at')
+            }
+            # Drop ids whose tokens have expired anyway.
+            cutoff = now.timestamp()
+            expiries.update(
+                (token_id, expires) for token_id, expires in self.expiries.items() if expires > cutoff
+            )
+            self.expiries = expiries
+            self.synced_at = now
+            self.next_sync = time.monotonic() + getattr(settings, 'TOKEN_REVOCATION_SYNC_INTERVAL', 5)
+
+
+revoked = RevocationSet()
+
+
+def is_revoked(token):
+    """Whether ``token`` or the session it belongs to has been revoked."""
+    return session_id(token) in revoked or token[api_settings.JTI_CLAIM] in revoked
+
+
+def revoke(token, user=None):
+    """Revoke ``token``'s session until the token would have expired anyway."""
+    from .models import RevokedToken
+
+    token_id, expires_at = session_id(token), token_expiry(token)
+    RevokedToken.objects.filter(expires_at__lte=timezone.now()).delete()
+    RevokedToken.objects.get_or_create(
+        jti=token_id, defaults={'user': user, 'expires_at': expires_at},
+    )
+    transaction.on_commit(lambda: revoked.add(token_id, expires_at))
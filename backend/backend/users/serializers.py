@@ -1,4 +1,11 @@
 from rest_framework import serializers
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt import serializers as jwt_serializers
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from .authentication import add_user_claims
+from .revocation import SESSION_CLAIM, is_revoked
 from .models import User
 
 class UserSerializer(serializers.ModelSerializer):
@@ -11,19 +18,21 @@ class UserSerializer(serializers.ModelSerializer):
 
 class RegisterSerializer(serializers.ModelSerializer):
     """
-    Serializer for user registration.
+    Serializer for user registration. Self-registered users are always
+    staff; only user administration can change a role.
     """
     password = serializers.CharField(write_only=True)
 
     class Meta:
         model = User
         fields = ['id', 'username', 'email', 'role', 'password']
+        read_only_fields = ['role']
 
     def create(self, validated_data):
         user = User.objects.create_user(
             username=validated_data['username'],
             email=validated_data['email'],
-            role=validated_data.get('role', User.Roles.STAFF),
+            role=User.Roles.STAFF,
             password=validated_data['password']
         )
         return user
@@ -36,4 +45,55 @@ class UserAdminSerializer(serializers.ModelSerializer):
         model = User
         fields = [
             'id', 'username', 'email', 'role', 'is_active', 'is_staff', 'is_superuser', 'date_joined'
-        ] 
\ No newline at end of file
+        ]
+
+class TokenObtainPairSerializer(jwt_serializers.TokenObtainPairSerializer):
+    """
+    Login serializer that embeds the account claims used by CachedJWTAuthentication.
+    """
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        token[SESSION_CLAIM] = token[api_settings.JTI_CLAIM]
+        return add_user_claims(token, user)
+
+class TokenRefreshSerializer(jwt_serializers.TokenRefreshSerializer):
+    """
+    Refresh serializer that re-reads the account, so refreshed access tokens
+    carry the current role and flags and deactivated users can't refresh.
+    Revoked sessions and tokens issued before the user's tokens_valid_after
+    are rejected.
+    """
+    default_error_messages = {
+        'revoked': 'Token has been revoked.',
+    }
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        if is_revoked(refresh):
+            raise AuthenticationFailed(self.error_messages['revoked'], 'token_revoked')
+        user = User.objects.filter(pk=refresh.payload.get(api_settings.USER_ID_CLAIM)).first()
+        if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(self.error_messages['no_active_account'], 'no_active_account')
+        if user.tokens_valid_after and refresh['iat'] < user.tokens_valid_after.timestamp():
+            raise AuthenticationFailed(self.error_messages['revoked'], 'token_revoked')
+
+        data = {'access': str(add_user_claims(refresh.access_token, user))}
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            data['refresh'] = str(add_user_claims(refresh, user))
+        return data
+
+class TokenRevokeSerializer(serializers.Serializer):
+    """
+    Serializer for revoking a refresh token and the access tokens minted from it.
+    """
+    refresh = serializers.CharField(write_only=True)
+
+    def validate_refresh(self, value):
+        try:
+            return RefreshToken(value)
+        except TokenError as e:
+            raise serializers.ValidationError(str(e))
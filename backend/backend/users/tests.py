@@ -1,3 +1,331 @@
-from django.test import TestCase
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.core.cache import cache, caches
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.urls import reverse
+from rest_framework.test import APIClient, APITestCase, APITransactionTestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from core.models import AuditLog
+from inventory.models import InventoryItem
+from orders.models import PurchaseOrder
+from suppliers.models import Supplier
+from . import revocation
+from .authentication import version_cache_key
+from .models import RevokedToken, User
+from .permissions import role_permission
+from .throttling import TokenBucketThrottle
+
+
+class CachedJWTAuthenticationTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        caches['shared'].clear()
+        self.admin = User.objects.create_user(
+            username='tokenadmin', email='tokenadmin@example.com', password='Testpass123',
+            role=User.Roles.ADMIN, is_staff=True,
+        )
+        self.user = User.objects.create_user(
+            username='scanner', email='scanner@example.com', password='Testpass123'
+        )
+
+    def login(self, username):
+        response = self.client.post(reverse('token_obtain_pair'), {'username': username, 'password': 'Testpass123'})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def use(self, access):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+
+    def test_steady_state_requests_skip_user_query(self):
+        self.use(self.login('scanner')['access'])
+        self.client.get(reverse('user-info'))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('user-info'))
+        self.assertEqual([query['sql'] for query in queries if 'shared_cache' not in query['sql']], [])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.data,
+            {'id': self.user.pk, 'username': 'scanner', 'email': 'scanner@example.com', 'role': 'STAFF'},
+        )
+
+    def update_user(self, **changes):
+        self.use(self.login('tokenadmin')['access'])
+        response = self.client.patch(reverse('user-admin-detail', args=[self.user.pk]), changes)
+        self.assertEqual(response.status_code, 200)
+
+    def test_deactivation_rejects_issued_tokens(self):
+        tokens = self.login('scanner')
+        self.update_user(is_active=False)
+
+        self.use(tokens['access'])
+        self.assertEqual(self.client.get(reverse('user-info')).status_code, 401)
+        response = self.client.post(reverse('token_refresh'), {'refresh': tokens['refresh']})
+        self.assertEqual(response.status_code, 401)
+
+    def test_refresh_picks_up_role_change(self):
+        tokens = self.login('scanner')
+        self.update_user(role=User.Roles.MANAGER)
+
+        self.use(tokens['access'])
+        response = self.client.get(reverse('user-info'))
+        self.assertEqual((response.status_code, response.data['code']), (401, 'token_stale'))
+        access = self.client.post(reverse('token_refresh'), {'refresh': tokens['refresh']}).data['access']
+        self.use(access)
+        self.assertEqual(self.client.get(reverse('user-info')).data['role'], 'MANAGER')
+
+
+    def test_changes_clear_the_version_every_worker_reads(self):
+        self.use(self.login('scanner')['access'])
+        self.client.get(reverse('user-info'))
+        self.assertEqual(caches['shared'].get(version_cache_key(self.user.pk)), 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.update_user(role=User.Roles.MANAGER)
+        self.assertIsNone(caches['shared'].get(version_cache_key(self.user.pk)))
+
+
+class TokenRevocationTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user(
+            username='revokeadmin', email='revokeadmin@example.com', password='Testpass123',
+            role=User.Roles.ADMIN, is_staff=True,
+        )
+        self.user = User.objects.create_user(
+            username='lostdevice', email='lostdevice@example.com', password='Testpass123'
+        )
+        self.tokens = self.client.post(
+            reverse('token_obtain_pair'), {'username': 'lostdevice', 'password': 'Testpass123'}
+        ).data
+
+    def assertRevoked(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.tokens["access"]}')
+        self.assertEqual(self.client.get(reverse('user-info')).status_code, 401)
+        self.client.credentials()
+        response = self.client.post(reverse('token_refresh'), {'refresh': self.tokens['refresh']})
+        self.assertEqual(response.status_code, 401)
+
+    def test_revoking_refresh_token_revokes_its_access_tokens(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('token_revoke'), {'refresh': self.tokens['refresh']})
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(RevokedToken.objects.get().user, self.user)
+        self.assertRevoked()
+
+    def test_revocations_from_other_processes_are_synced(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.tokens["access"]}')
+        self.assertEqual(self.client.get(reverse('user-info')).status_code, 200)
+        session = revocation.session_id(RefreshToken(self.tokens['refresh']))
+        RevokedToken.objects.create(jti=session, user=self.user, expires_at=timezone.now() + timedelta(days=1))
+        revocation.revoked.next_sync = 0
+        self.assertRevoked()
+
+    def test_admin_can_revoke_all_tokens(self):
+        self.client.force_authenticate(self.admin)
+        response = self.client.post(reverse('user-admin-revoke-tokens', args=[self.user.pk]))
+        self.assertEqual(response.status_code, 204)
+        self.client.force_authenticate(None)
+        self.assertRevoked()
+
+
+class RolePermissionTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.staff = User.objects.create_user(
+            username='rolestaff', email='rolestaff@example.com', password='Testpass123'
+        )
+        self.manager = User.objects.create_user(
+            username='rolemanager', email='rolemanager@example.com', password='Testpass123',
+            role=User.Roles.MANAGER,
+        )
+        self.supplier = Supplier.objects.create(name='Acme')
+        self.item = InventoryItem.objects.create(name='Drill', sku='ROLE-DRL')
+        self.order = PurchaseOrder.objects.create(supplier=self.supplier, item=self.item, quantity=2)
+
+    def login(self, username):
+        access = self.client.post(
+            reverse('token_obtain_pair'), {'username': username, 'password': 'Testpass123'}
+        ).data['access']
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+
+    def test_only_managers_approve_orders(self):
+        url = reverse('order-approve-reject', args=[self.order.pk])
+        self.login('rolestaff')
+        self.client.get(reverse('user-info'))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(url, {'action': 'approve'})
+        self.assertEqual(response.status_code, 403)
+        # Only the auth version is looked up, in the shared cache.
+        self.assertEqual([query['sql'] for query in queries if 'shared_cache' not in query['sql']], [])
+
+        self.login('rolemanager')
+        response = self.client.post(url, {'action': 'approve'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['status'], 'APPROVED')
+
+    def test_staff_can_read_but_not_change(self):
+        self.client.force_authenticate(self.staff)
+        self.assertEqual(self.client.get(reverse('order-detail', args=[self.order.pk])).status_code, 200)
+        response = self.client.patch(reverse('order-detail', args=[self.order.pk]), {'quantity': 5})
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(self.client.post(reverse('order-list-create'), {
+            'supplier': self.supplier.pk, 'item': self.item.pk, 'quantity': 1,
+        }).status_code, 201)
+
+    def test_audit_logs_are_scoped_to_own_entries_for_staff(self):
+        AuditLog.objects.all().delete()
+        own = AuditLog.objects.create(user=self.staff, action='UPDATE', object_type='Supplier', object_id='1')
+        AuditLog.objects.create(user=self.manager, action='UPDATE', object_type='Supplier', object_id='1')
+
+        self.client.force_authenticate(self.staff)
+        response = self.client.get(reverse('auditlog-list'))
+        self.assertEqual([row['id'] for row in response.data], [own.pk])
+        self.client.force_authenticate(self.manager)
+        self.assertEqual(len(self.client.get(reverse('auditlog-list')).data), 2)
+
+    def test_user_administration_follows_the_admin_role(self):
+        admin = User.objects.create_user(
+            username='roleadmin', email='roleadmin@example.com', password='Testpass123', role=User.Roles.ADMIN,
+        )
+        self.client.force_authenticate(self.manager)
+        self.assertEqual(self.client.get(reverse('user-admin-list-create')).status_code, 403)
+        response = self.client.post(reverse('user-admin-revoke-tokens', args=[self.staff.pk]))
+        self.assertEqual(response.status_code, 403)
+
+        self.client.force_authenticate(admin)
+        self.assertEqual(self.client.get(reverse('user-admin-list-create')).status_code, 200)
+        response = self.client.patch(reverse('user-admin-detail', args=[self.staff.pk]), {'role': User.Roles.MANAGER})
+        self.assertEqual(response.status_code, 200)
+
+    def test_self_registration_cannot_choose_a_role(self):
+        response = self.client.post(reverse('register'), {
+            'username': 'climber', 'email': 'climber@example.com', 'password': 'Testpass123', 'role': User.Roles.ADMIN,
+        })
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['role'], User.Roles.STAFF)
+        self.assertEqual(User.objects.get(username='climber').role, User.Roles.STAFF)
+
+        self.login('climber')
+        self.assertEqual(self.client.get(reverse('user-admin-list-create')).status_code, 403)
+        response = self.client.post(reverse('order-approve-reject', args=[self.order.pk]), {'action': 'approve'})
+        self.assertEqual(response.status_code, 403)
+
+    def test_unknown_actions_are_rejected(self):
+        with self.assertRaises(ImproperlyConfigured):
+            role_permission(GET='orders.veiw')
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class LoginThrottleTests(APITestCase):
+    """
+    Uses the default rates: 30/min per IP and 5/min per username. The throttle
+    clock is frozen so buckets only refill when a test advances it.
+    """
+
+    def setUp(self):
+        caches['shared'].clear()
+        self.now = 1_000_000.0
+        patcher = mock.patch.object(TokenBucketThrottle, 'timer', side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def attempt(self, username, ip='10.0.0.1'):
+        return self.client.post(
+            reverse('token_obtain_pair'), {'username': username, 'password': 'wrong'}, REMOTE_ADDR=ip,
+        )
+
+    def test_username_bucket_spans_ips_and_refills(self):
+        statuses = [self.attempt('victim', ip=f'10.0.1.{i}').status_code for i in range(6)]
+        self.assertEqual(statuses, [401] * 5 + [429])
+        response = self.attempt('VICTIM', ip='10.0.2.1')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '12')
+
+        self.now += 12
+        self.assertEqual(self.attempt('victim').status_code, 401)
+        self.assertEqual(self.attempt('victim').status_code, 429)
+
+    def test_spoofed_forwarded_for_shares_the_ip_bucket(self):
+        def attempt(forwarded_for, i):
+            return self.client.post(
+                reverse('token_obtain_pair'), {'username': f'user{i}', 'password': 'wrong'},
+                REMOTE_ADDR='10.9.0.1', HTTP_X_FORWARDED_FOR=forwarded_for,
+            ).status_code
+
+        statuses = [attempt(f'198.51.100.{i}', i) for i in range(31)]
+        self.assertEqual(statuses, [401] * 30 + [429])
+
+        # Behind one proxy the client is the last address the proxy appended.
+        with override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'NUM_PROXIES': 1}):
+            statuses = [attempt(f'198.51.100.{i}, 203.0.113.7', i) for i in range(31)]
+            self.assertEqual(statuses, [401] * 30 + [429])
+            self.assertEqual(attempt('203.0.113.8', 99), 401)
+
+    def test_throttled_attempts_do_not_check_passwords(self):
+        User.objects.create_user(username='target', password='Testpass123')
+        authenticate = ModelBackend.authenticate
+        calls = []
+
+        def counting(backend, request, **credentials):
+            calls.append(credentials['username'])
+            return authenticate(backend, request, **credentials)
+
+        with mock.patch.object(ModelBackend, 'authenticate', counting):
+            statuses = Counter(self.attempt('target').status_code for _ in range(50))
+        self.assertEqual(statuses, {401: 5, 429: 45})
+        self.assertEqual(len(calls), 5)
+
+    def test_registration_shares_the_ip_bucket(self):
+        for i in range(30):
+            self.attempt(f'user{i}', ip='10.0.3.1')
+        response = self.client.post(reverse('register'), {
+            'username': 'newcomer', 'email': 'newcomer@example.com', 'password': 'Testpass123',
+        }, REMOTE_ADDR='10.0.3.1')
+        self.assertEqual(response.status_code, 429)
+        response = self.client.post(reverse('register'), {
+            'username': 'newcomer', 'email': 'newcomer@example.com', 'password': 'Testpass123',
+        }, REMOTE_ADDR='10.0.3.2')
+        self.assertEqual(response.status_code, 201)
+
+    def test_load_many_clients(self):
+        """
+        A credential-stuffing burst: 20 IPs each try 10 usernames, then one
+        IP hammers a single account. Every bucket must cap exactly at its size.
+        """
+        statuses = Counter()
+        for ip in range(20):
+            for name in range(10):
+                statuses[self.attempt(f'stuffed{ip}-{name}', ip=f'10.1.0.{ip}').status_code] += 1
+        self.assertEqual(statuses, {401: 200})
+
+        statuses = Counter(self.attempt('target', ip='10.2.0.1').status_code for _ in range(50))
+        self.assertEqual(statuses, {401: 5, 429: 45})
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Concurrent requests need a server database')
+class ConcurrentLoginThrottleTests(APITransactionTestCase):
+    """Parallel attempts on one account, as from several gunicorn workers."""
+
+    def attempt(self, index):
+        try:
+            return APIClient().post(
+                reverse('token_obtain_pair'), {'username': 'target', 'password': 'wrong'},
+                REMOTE_ADDR=f'10.3.0.{index}',
+            ).status_code
+        finally:
+            connection.close()
+
+    def test_concurrent_attempts_share_the_bucket(self):
+        caches['shared'].clear()
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            statuses = Counter(pool.map(self.attempt, range(40)))
+        self.assertEqual(statuses, {401: 5, 429: 35})
@@ -0,0 +1,92 @@
+"""
+Brute-force protection for the login and registration endpoints.
+
+Each client IP and each submitted username gets a token bucket in the Django
+cache. A bucket holds up to N requests for the scope's 'N/period' rate in
+DEFAULT_THROTTLE_RATES and refills continuously at N per period, so clients
+can burst briefly but not sustain more than the rate. Exhausted buckets make
+DRF answer 429 with a Retry-After header before the serializer runs, so
+throttled attempts never hash a password.
+
+Buckets live in the 'shared' cache, which all worker processes share.
+The cache API has no compare-and-swap, so a bucket is read and written under
+a short lock taken with cache.add(), which is atomic on the database, Redis
+and local-memory backends; otherwise parallel attempts would each spend the
+same token.
+Client IPs come from DRF's get_ident, which trusts X-Forwarded-For only as
+many hops deep as REST_FRAMEWORK['NUM_PROXIES'].
+"""
+import hashlib
+import time
+
+from django.core.cache import caches
+from django.utils.connection import ConnectionProxy
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    SimpleRateThrottle with a token bucket instead of a request history, so
+    each check reads and writes one small cache entry, under a lock.
+    """
+    cache = ConnectionProxy(caches, 'shared')
+    lock_timeout = 2
+    lock_wait = 1
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        lock = f'{self.key}:lock'
+        deadline = time.monotonic() + self.lock_wait
+        while not self.cache.add(lock, 1, self.lock_timeout):
+            if time.monotonic() >= deadline:
+                # Contended this long, the key is under attack: refuse.
+                self.wait_seconds = self.duration / self.num_requests
+                return False
+            time.sleep(0.01)
+        try:
+            return self.spend()
+        finally:
+            self.cache.delete(lock)
+
+    def spend(self):
+        now = self.timer()
+        refill_rate = self.num_requests / self.duration
+        tokens, updated = self.cache.get(self.key, (self.num_requests, now))
+        tokens = min(self.num_requests, tokens + (now - updated) * refill_rate)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+            self.wait_seconds = None
+        else:
+            self.wait_seconds = (1 - tokens) / refill_rate
+        # A bucket untouched for a whole period is full again, same as a missing one.
+        self.cache.set(self.key, (tokens, now), self.duration)
+        return allowed
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class LoginIPThrottle(TokenBucketThrottle):
+    """Limit credential attempts per client IP."""
+    scope = 'login_ip'
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
+
+
+class LoginUsernameThrottle(TokenBucketThrottle):
+    """Limit credential attempts per username, whichever IP they come from."""
+    scope = 'login_username'
+
+    def get_cache_key(self, request, view):
+        username = request.data.get('username') if hasattr(request.data, 'get') else None
+        if not username or not isinstance(username, str):
+            return None
+        ident = hashlib.sha256(username.strip().lower().encode('utf-8')).hexdigest()
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
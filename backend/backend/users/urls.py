@@ -1,9 +1,13 @@
 from django.urls import path
-from .views import RegisterView, UserInfoView, UserAdminListCreateView, UserAdminRetrieveUpdateDestroyView
+from .views import (
+    RegisterView, UserInfoView, UserAdminListCreateView, UserAdminRetrieveUpdateDestroyView,
+    UserAdminRevokeTokensView,
+)
 
 urlpatterns = [
     path('register/', RegisterView.as_view(), name='register'),
     path('me/', UserInfoView.as_view(), name='user-info'),
     path('admin/', UserAdminListCreateView.as_view(), name='user-admin-list-create'),
     path('admin/<int:pk>/', UserAdminRetrieveUpdateDestroyView.as_view(), name='user-admin-detail'),
+    path('admin/<int:pk>/revoke-tokens/', UserAdminRevokeTokensView.as_view(), name='user-admin-revoke-tokens'),
 ] 
\ No newline at end of file
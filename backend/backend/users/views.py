@@ -1,8 +1,16 @@
-from django.shortcuts import render
-from rest_framework import generics, permissions
+from django.shortcuts import get_object_or_404, render
+from django.utils import timezone
+from rest_framework import generics, permissions, status
 from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.views import TokenObtainPairView
+from .authentication import bump_version, forget_version
 from .models import User
-from .serializers import RegisterSerializer, UserSerializer, UserAdminSerializer
+from .permissions import role_permission
+from .revocation import revoke
+from .throttling import LoginIPThrottle, LoginUsernameThrottle
+from .serializers import RegisterSerializer, UserSerializer, UserAdminSerializer, TokenRevokeSerializer
 
 # Create your views here.
 
@@ -13,6 +21,13 @@ class RegisterView(generics.CreateAPIView):
     queryset = User.objects.all()
     serializer_class = RegisterSerializer
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [LoginIPThrottle, LoginUsernameThrottle]
+
+class LoginView(TokenObtainPairView):
+    """
+    Obtain a JWT pair, throttled per client IP and per username.
+    """
+    throttle_classes = [LoginIPThrottle, LoginUsernameThrottle]
 
 class UserInfoView(generics.RetrieveAPIView):
     """
@@ -30,7 +45,7 @@ class UserAdminListCreateView(generics.ListCreateAPIView):
     """
     queryset = User.objects.all().order_by('-date_joined')
     serializer_class = UserAdminSerializer
-    permission_classes = [permissions.IsAdminUser]
+    permission_classes = [role_permission(GET='users.view', POST='users.add')]
 
 class UserAdminRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
     """
@@ -38,4 +53,41 @@ class UserAdminRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
     """
     queryset = User.objects.all()
     serializer_class = UserAdminSerializer
-    permission_classes = [permissions.IsAdminUser]
+    permission_classes = [role_permission(
+        GET='users.view', PUT='users.change', PATCH='users.change', DELETE='users.delete',
+    )]
+
+    def perform_update(self, serializer):
+        user = serializer.save()
+        bump_version(user.pk)
+
+    def perform_destroy(self, instance):
+        user_id = instance.pk
+        instance.delete()
+        forget_version(user_id)
+
+class TokenRevokeView(APIView):
+    """
+    Revoke a refresh token and every access token minted from it (logout).
+    Holding the refresh token is enough to revoke it.
+    """
+    permission_classes = [permissions.AllowAny]
+
+    def post(self, request):
+        serializer = TokenRevokeSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        token = serializer.validated_data['refresh']
+        revoke(token, user=User.objects.filter(pk=token.get(api_settings.USER_ID_CLAIM)).first())
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+class UserAdminRevokeTokensView(APIView):
+    """
+    Admin: Revoke every token issued to a user so far, e.g. for a lost device.
+    """
+    permission_classes = [role_permission(POST='users.revoke_tokens')]
+
+    def post(self, request, pk):
+        user = get_object_or_404(User, pk=pk)
+        User.objects.filter(pk=user.pk).update(tokens_valid_after=timezone.now())
+        bump_version(user.pk)
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -7,3 +7,5 @@ pip install -r requirements.txt
 cd backend/backend
 python manage.py collectstatic --no-input
 python manage.py migrate
+python manage.py createcachetable
+python manage.py bootstrap
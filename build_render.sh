@@ -16,9 +16,10 @@ cd backend/backend
 
 echo "🔄 Running Django migrations..."
 python manage.py migrate --noinput
+python manage.py createcachetable
 
-echo "� Creating superuser..."
-echo "from users.models import User; User.objects.filter(username='admin').exists() or User.objects.create_superuser('admin', 'a.kasa@alustudent.com', 'admin123', role='ADMIN')" | python manage.py shell
+echo "🌱 Loading seed data and creating the admin user..."
+python manage.py bootstrap
 
 echo "�📂 Collecting static files..."
 python manage.py collectstatic --noinput
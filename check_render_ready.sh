@@ -11,7 +11,7 @@ if [ "$response" = "200" ]; then
     echo "🚀 Now you can run the data migration:"
     echo "1. Go to Render Dashboard"
     echo "2. Open your backend service shell"
-    echo "3. Run: python manage.py load_local_data"
+    echo "3. Run: python manage.py bootstrap"
     echo "4. Reset password: python manage.py reset_password aman aman@123"
     echo ""
     echo "📱 Or use the web shell at:"
@@ -31,7 +31,9 @@ def fix_deployment():
     print(f"\n📋 If you can't login, here's what to do:")
     print(f"1. Check if the deployment completed successfully")
     print(f"2. Look at the Render deployment logs for any errors")
-    print(f"3. The data loading command might have failed")
+    print(f"3. The data loading command might have failed; from a shell, run:")
+    print(f"   cd backend/backend && python manage.py bootstrap --force")
+    print(f"   (or python manage.py fast_load <fixture.json> for other data files)")
     
     print(f"\n🔧 Alternative Solutions:")
     print(f"1. **Upgrade to paid plan** to get shell access")
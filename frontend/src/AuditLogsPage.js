@@ -2,9 +2,8 @@ import React, { useEffect, useState } from 'react';
 import {
   Box, Typography, Table, TableBody, TableCell, TableContainer, TableHead, TableRow, Paper,
   CircularProgress, Alert, TextField, Stack, Chip, IconButton, Tooltip, Button, Grid,
-  FormControl, InputLabel, Select, MenuItem
+  FormControl, InputLabel, Select, MenuItem, Autocomplete
 } from '@mui/material';
-import SearchIcon from '@mui/icons-material/Search';
 import RefreshIcon from '@mui/icons-material/Refresh';
 import FilterListIcon from '@mui/icons-material/FilterList';
 import DownloadIcon from '@mui/icons-material/Download';
@@ -37,6 +36,9 @@ const ACTION_TYPES = {
   MAINTENANCE: { color: 'warning', label: 'Maintenance', icon: <SettingsIcon /> }
 };
 
+// 'INVENTORY_ITEM' -> 'Inventory Item'
+const codeLabel = (code) => code.toLowerCase().split('_').map(word => word.charAt(0).toUpperCase() + word.slice(1)).join(' ');
+
 /**
  * AuditLogsPage component
  * Fetches and displays audit logs from the backend with enhanced features.
@@ -45,7 +47,11 @@ export default function AuditLogsPage() {
   const [logs, setLogs] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
-  const [searchUser, setSearchUser] = useState('');
+  // The user filter takes a user id picked from the autocomplete endpoint.
+  const [searchUser, setSearchUser] = useState(null);
+  const [userInput, setUserInput] = useState('');
+  const [userOptions, setUserOptions] = useState([]);
+  const [objectTypes, setObjectTypes] = useState([]);
   const [searchAction, setSearchAction] = useState('');
   const [searchObjectType, setSearchObjectType] = useState('');
   const [startDate, setStartDate] = useState(null);
@@ -59,7 +65,7 @@ export default function AuditLogsPage() {
     const token = localStorage.getItem('accessToken');
     let url = `${API_URL}/api/audit-logs/`;
     const params = [];
-    if (user) params.push(`user=${encodeURIComponent(user)}`);
+    if (user) params.push(`user=${user.id}`);
     if (action) params.push(`action=${encodeURIComponent(action)}`);
     if (objectType) params.push(`object_type=${encodeURIComponent(objectType)}`);
     if (start) params.push(`start_date=${start.toISOString().split('T')[0]}`);
@@ -82,7 +88,39 @@ export default function AuditLogsPage() {
     }
   };
 
-  useEffect(() => { fetchLogs(); }, []);
+  // Object types offered in the filter come from the facet counts
+  const fetchObjectTypes = async () => {
+    const token = localStorage.getItem('accessToken');
+    try {
+      const response = await fetch(`${API_URL}/api/audit-logs/facets/`, {
+        headers: { 'Authorization': `Bearer ${token}` },
+      });
+      if (response.ok) {
+        const data = await response.json();
+        setObjectTypes(data.object_types.map(facet => facet.code).filter(Boolean));
+      }
+    } catch {
+      setObjectTypes([]);
+    }
+  };
+
+  useEffect(() => { fetchLogs(); fetchObjectTypes(); }, []);
+
+  // Debounced user suggestions by username prefix
+  useEffect(() => {
+    const token = localStorage.getItem('accessToken');
+    const timeout = setTimeout(async () => {
+      try {
+        const response = await fetch(`${API_URL}/api/audit-logs/users/?q=${encodeURIComponent(userInput)}`, {
+          headers: { 'Authorization': `Bearer ${token}` },
+        });
+        setUserOptions(response.ok ? await response.json() : []);
+      } catch {
+        setUserOptions([]);
+      }
+    }, 300);
+    return () => clearTimeout(timeout);
+  }, [userInput]);
 
   // Debounced search/filter
   useEffect(() => {
@@ -104,7 +142,8 @@ export default function AuditLogsPage() {
   };
 
   const clearFilters = () => {
-    setSearchUser('');
+    setSearchUser(null);
+    setUserInput('');
     setSearchAction('');
     setSearchObjectType('');
     setStartDate(null);
@@ -233,24 +272,32 @@ export default function AuditLogsPage() {
           
           <Grid container spacing={2}>
             <Grid item xs={12} sm={6} md={3}>
-              <TextField
-                label="User"
+              <Autocomplete
+                options={userOptions}
                 value={searchUser}
-                onChange={e => setSearchUser(e.target.value)}
-                size="medium"
-                placeholder="Search by username"
-                disabled={loading}
+                onChange={(e, user) => setSearchUser(user)}
+                inputValue={userInput}
+                onInputChange={(e, value) => setUserInput(value)}
+                getOptionLabel={user => user.username}
+                isOptionEqualToValue={(option, value) => option.id === value.id}
+                filterOptions={options => options}
+                noOptionsText="No matching users"
                 fullWidth
-                sx={{ 
-                  bgcolor: '#fff', 
-                  borderRadius: 2,
-                  '& .MuiOutlinedInput-root': {
-                    '&:hover fieldset': { borderColor: 'primary.main' }
-                  }
-                }}
-                InputProps={{
-                  startAdornment: <SearchIcon sx={{ color: 'text.secondary', mr: 1 }} />
-                }}
+                renderInput={(params) => (
+                  <TextField
+                    {...params}
+                    label="User"
+                    size="medium"
+                    placeholder="Search by username"
+                    sx={{ 
+                      bgcolor: '#fff', 
+                      borderRadius: 2,
+                      '& .MuiOutlinedInput-root': {
+                        '&:hover fieldset': { borderColor: 'primary.main' }
+                      }
+                    }}
+                  />
+                )}
               />
             </Grid>
             <Grid item xs={12} sm={6} md={3}>
@@ -279,25 +326,29 @@ export default function AuditLogsPage() {
               </FormControl>
             </Grid>
             <Grid item xs={12} sm={6} md={3}>
-              <TextField
-                label="Object Type"
-                value={searchObjectType}
-                onChange={e => setSearchObjectType(e.target.value)}
-                size="medium"
-                placeholder="Search by object type"
-                disabled={loading}
-                fullWidth
-                sx={{ 
-                  bgcolor: '#fff', 
-                  borderRadius: 2,
-                  '& .MuiOutlinedInput-root': {
-                    '&:hover fieldset': { borderColor: 'primary.main' }
-                  }
-                }}
-                InputProps={{
-                  startAdornment: <SearchIcon sx={{ color: 'text.secondary', mr: 1 }} />
-                }}
-              />
+              <FormControl fullWidth size="medium">
+                <InputLabel>Object Type</InputLabel>
+                <Select
+                  value={searchObjectType}
+                  label="Object Type"
+                  onChange={e => setSearchObjectType(e.target.value)}
+                  disabled={loading}
+                  sx={{ 
+                    bgcolor: '#fff', 
+                    borderRadius: 2,
+                    '& .MuiOutlinedInput-root': {
+                      '&:hover fieldset': { borderColor: 'primary.main' }
+                    }
+                  }}
+                >
+                  <MenuItem value="">All Object Types</MenuItem>
+                  {objectTypes.map(code => (
+                    <MenuItem key={code} value={code}>
+                      {codeLabel(code)}
+                    </MenuItem>
+                  ))}
+                </Select>
+              </FormControl>
             </Grid>
             <Grid item xs={12} sm={6} md={3}>
               <DatePicker
@@ -3,7 +3,7 @@ import {
   Box, Typography, Button, Table, TableBody, TableCell, TableContainer, TableHead, TableRow, Paper,
   CircularProgress, Alert, Dialog, DialogTitle, DialogContent, DialogActions, TextField, IconButton, MenuItem, Snackbar, Tooltip, Stack
 } from '@mui/material';
-import { Add, Edit, Delete, CheckCircle, Cancel } from '@mui/icons-material';
+import { Add, Edit, Delete, CheckCircle, Cancel, LocalShipping } from '@mui/icons-material';
 import DownloadIcon from '@mui/icons-material/Download';
 import useMediaQuery from '@mui/material/useMediaQuery';
 import { useTheme } from '@mui/material/styles';
@@ -63,7 +63,7 @@ function OrderForm({ open, onClose, onSubmit, initialData }) {
               required
             >
               {suppliers.map((s) => (
-                <MenuItem key={s.id} value={s.name}>{s.name}</MenuItem>
+                <MenuItem key={s.id} value={s.id}>{s.name}</MenuItem>
               ))}
             </TextField>
             <TextField
@@ -77,7 +77,7 @@ function OrderForm({ open, onClose, onSubmit, initialData }) {
               required
             >
               {items.map((i) => (
-                <MenuItem key={i.id} value={i.name}>{i.name}</MenuItem>
+                <MenuItem key={i.id} value={i.id}>{i.name}</MenuItem>
               ))}
             </TextField>
             <TextField margin="dense" label="Quantity" name="quantity" type="number" value={form.quantity} onChange={handleChange} fullWidth />
@@ -178,6 +178,11 @@ export default function OrdersPage() {
         setEditOrder(null);
         setSuccessMsg('Order updated successfully.');
         fetchOrders();
+      } else if (response.status === 409) {
+        const data = await response.json();
+        setEditOrder(null);
+        setError(data.error || 'The order was changed by someone else.');
+        fetchOrders();
       } else {
         setError('Failed to update order.');
       }
@@ -204,17 +209,44 @@ export default function OrdersPage() {
     }
   };
 
-  const handleAction = async (id, action) => {
+  const handleReceive = async (order) => {
+    const token = localStorage.getItem('accessToken');
+    try {
+      const response = await fetch(`${API_URL}/api/orders/${order.id}/receive/`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json', 'Authorization': `Bearer ${token}` },
+        body: JSON.stringify({ version: order.version }),
+      });
+      if (response.ok) {
+        setSuccessMsg('Order received into stock.');
+        fetchOrders();
+      } else if (response.status === 409) {
+        const data = await response.json();
+        setError(data.error || 'The order was changed by someone else.');
+        fetchOrders();
+      } else {
+        setError('Failed to receive order.');
+      }
+    } catch {
+      setError('Network error.');
+    }
+  };
+
+  const handleAction = async (order, action) => {
     const token = localStorage.getItem('accessToken');
     try {
-      const response = await fetch(`${API_URL}/api/orders/${id}/action/`, {
+      const response = await fetch(`${API_URL}/api/orders/${order.id}/action/`, {
         method: 'POST',
         headers: { 'Content-Type': 'application/json', 'Authorization': `Bearer ${token}` },
-        body: JSON.stringify({ action }),
+        body: JSON.stringify({ action, version: order.version }),
       });
       if (response.ok) {
         setSuccessMsg(`Order ${action}d successfully.`);
         fetchOrders();
+      } else if (response.status === 409) {
+        const data = await response.json();
+        setError(data.error || 'The order was changed by someone else.');
+        fetchOrders();
       } else {
         setError('Failed to update order status.');
       }
@@ -319,12 +351,15 @@ export default function OrdersPage() {
                     '&:hover': { bgcolor: '#e0f2ff' },
                   }}
                 >
-                  <TableCell>{order.supplier}</TableCell>
-                  <TableCell>{order.item}</TableCell>
+                  <TableCell>{order.supplier_name}</TableCell>
+                  <TableCell>{order.item_name}</TableCell>
                   <TableCell>{order.quantity}</TableCell>
                   <TableCell>
                     <Typography color={
                       order.status === 'APPROVED' ? 'success.main' :
+                      order.status === 'RECEIVED' ? 'info.main' :
+                      order.status === 'PARTIALLY_RECEIVED' ? 'info.light' :
+                      order.status === 'CANCELLED' ? 'text.secondary' :
                       order.status === 'REJECTED' ? 'error.main' : 'warning.main'
                     } fontWeight={700}>
                       {order.status}
@@ -345,18 +380,25 @@ export default function OrdersPage() {
                     </IconButton>
                     {order.status === 'PENDING' && (
                       <>
-                        <IconButton color="success" onClick={() => handleAction(order.id, 'approve')} disabled={loading}>
+                        <IconButton color="success" onClick={() => handleAction(order, 'approve')} disabled={loading}>
                           <Tooltip title="Approve">
                             <CheckCircle />
                           </Tooltip>
                         </IconButton>
-                        <IconButton color="error" onClick={() => handleAction(order.id, 'reject')} disabled={loading}>
+                        <IconButton color="error" onClick={() => handleAction(order, 'reject')} disabled={loading}>
                           <Tooltip title="Reject">
                             <Cancel />
                           </Tooltip>
                         </IconButton>
                       </>
                     )}
+                    {(order.status === 'APPROVED' || order.status === 'PARTIALLY_RECEIVED') && (
+                      <IconButton color="primary" onClick={() => handleReceive(order)} disabled={loading}>
+                        <Tooltip title="Receive outstanding quantity">
+                          <LocalShipping />
+                        </Tooltip>
+                      </IconButton>
+                    )}
                   </TableCell>
                 </TableRow>
               ))}
@@ -0,0 +1,59 @@
+const API_URL = process.env.REACT_APP_API_URL || 'http://127.0.0.1:8000';
+
+let refreshing = null;
+
+// Trade the stored refresh token for a new access token (and a rotated
+// refresh token if the backend sends one). Resolves to null on failure.
+async function refreshAccessToken(fetchImpl) {
+  const refresh = localStorage.getItem('refreshToken');
+  if (!refresh) return null;
+  try {
+    const response = await fetchImpl(`${API_URL}/api/token/refresh/`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ refresh }),
+    });
+    if (!response.ok) return null;
+    const data = await response.json();
+    localStorage.setItem('accessToken', data.access);
+    if (data.refresh) localStorage.setItem('refreshToken', data.refresh);
+    return data.access;
+  } catch {
+    return null;
+  }
+}
+
+/**
+ * Wrap window.fetch so API requests rejected with 401 token_stale (the
+ * account was changed after the token was issued) are retried once with a
+ * refreshed access token. Concurrent stale requests share one refresh. If
+ * the session cannot be refreshed the user is sent back to the login page.
+ */
+export function installTokenRefresh() {
+  const originalFetch = window.fetch.bind(window);
+  window.fetch = async (input, init = {}) => {
+    const response = await originalFetch(input, init);
+    const url = typeof input === 'string' ? input : input.url;
+    if (response.status !== 401 || !url.startsWith(API_URL)) return response;
+    let code;
+    try {
+      code = (await response.clone().json()).code;
+    } catch {
+      return response;
+    }
+    if (code !== 'token_stale') return response;
+
+    if (!refreshing) {
+      refreshing = refreshAccessToken(originalFetch).finally(() => { refreshing = null; });
+    }
+    const access = await refreshing;
+    if (!access) {
+      localStorage.clear();
+      window.location.assign('/login');
+      return response;
+    }
+    const headers = new Headers(init.headers);
+    headers.set('Authorization', `Bearer ${access}`);
+    return originalFetch(input, { ...init, headers });
+  };
+}
@@ -39,7 +39,7 @@ echo "   nano local_data.json"
 echo "   # Copy and paste the content from your local local_data.json"
 echo ""
 echo "5️⃣ Load the data:"
-echo "   python manage.py loaddata local_data.json"
+echo "   python manage.py fast_load local_data.json"
 echo ""
 echo "6️⃣ Reset the admin password:"
 echo "   python manage.py shell"
@@ -24,7 +24,7 @@ echo "  3. Manually recreate your data or import via Django admin"
 echo ""
 echo "Option 2 - API Upload (if you have shell access):"
 echo "  1. Upload local_data.json to the server"
-echo "  2. Run: python manage.py loaddata local_data.json"
+echo "  2. Run: python manage.py fast_load local_data.json"
 echo ""
 echo "Option 3 - Frontend Recreation:"
 echo "  1. Use your React frontend to recreate the data"